@@ -1,3 +1,5 @@
+from kittentts.cancellation import CancellationToken, SynthesisCancelled
+from kittentts.instrumentation import Instrumentation, MetricsRecorder, StructuredLogInstrumentation
 from kittentts.preprocess import NormalizedSpan, NormalizedTextResult, normalize_text, normalize_text_result
 
 __version__ = "0.1.0"
@@ -11,6 +13,11 @@ __all__ = [
     "normalize_text_result",
     "NormalizedSpan",
     "NormalizedTextResult",
+    "Instrumentation",
+    "MetricsRecorder",
+    "StructuredLogInstrumentation",
+    "CancellationToken",
+    "SynthesisCancelled",
 ]
 
 
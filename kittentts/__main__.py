@@ -0,0 +1,5 @@
+import sys
+
+from kittentts.cli import main
+
+sys.exit(main())
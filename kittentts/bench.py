@@ -0,0 +1,322 @@
+"""
+bench.py
+End-to-end synthesis benchmarks.
+
+Measures model load time, real-time factor, time-to-first-audio, throughput
+and a per-stage time breakdown over a sweep of models, voices, chunk lengths
+and ORT thread counts. Results are plain JSON so two runs can be diffed for
+regressions with ``compare_runs`` or ``kittentts bench --compare``.
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+from typing import Callable, List, Optional
+
+from .onnx_model import SAMPLE_RATE
+
+DEFAULT_MODELS = ["KittenML/kitten-tts-nano-0.8"]
+DEFAULT_VOICES = ["Jasper"]
+DEFAULT_CHUNK_LENS = [400]
+DEFAULT_THREADS = [None]
+
+DEFAULT_TEXT = (
+    "One day, a little girl named Lily found a needle in her room. "
+    "She knew it was difficult to play with it because it was sharp. "
+    "Lily wanted to use the needle to sew a button on her shirt. "
+    "She went to her mom and said, \"Mom, I found this needle. "
+    "Can you share it with me and sew my shirt?\" "
+    "Her mom smiled and said, \"Yes, Lily, we can share the needle and fix your shirt.\" "
+    "The meeting on May 5, 2026 starts at 10:30 AM and costs $12.50 per person."
+)
+
+STAGES = ["preprocess", "chunk", "phonemize", "tokenize", "inference", "trim", "concat"]
+
+# Metrics where a larger value is a regression; "chars_per_second" is the
+# only throughput-style metric and is compared the other way round.
+_LOWER_IS_BETTER = ["load_seconds", "rtf", "ttfa_seconds", "peak_rss_mb"]
+_HIGHER_IS_BETTER = ["chars_per_second"]
+# Stage timings below this many seconds are too noisy to compare.
+_MIN_STAGE_SECONDS = 1e-3
+
+
+def _default_loader(model_name: str, **model_kwargs):
+    from .get_model import KittenTTS
+
+    return KittenTTS(model_name, **model_kwargs).model
+
+
+def synthesize_with_stages(model, text: str, voice: str, speed: float = 1.0, clean_text: bool = True):
+    """Run ``model.generate`` and time each pipeline stage.
+
+    Stage times come from the instrumentation spans generate() reports, so
+    they cover exactly what the model runs, including token-budget
+    chunking, parallel lanes, front-end workers and IOBinding. Stages on
+    parallel lanes overlap, so their sum can exceed the wall time.
+
+    Args:
+        model: A loaded KittenTTS_1_Onnx instance
+        text: Input text to synthesize
+        voice: Voice to use for synthesis
+        speed: Speech speed (1.0 = normal)
+        clean_text: Run the text preprocessor first
+
+    Returns:
+        Tuple of (audio, stage_seconds) where stage_seconds maps each name in
+        STAGES to the total time spent in it.
+    """
+    from .instrumentation import MetricsRecorder, bind
+
+    recorder = MetricsRecorder()
+    with bind(recorder):
+        audio = model.generate(text, voice=voice, speed=speed, clean_text=clean_text)
+    totals = recorder.snapshot()["stages"]
+    return audio, {name: totals[name]["sum"] if name in totals else 0.0 for name in STAGES}
+
+
+def time_to_first_audio(model, text: str, voice: str, speed: float = 1.0) -> float:
+    """Seconds from calling generate_stream until the first chunk is yielded."""
+    start = time.perf_counter()
+    stream = model.generate_stream(text, voice=voice, speed=speed)
+    next(stream)
+    elapsed = time.perf_counter() - start
+    stream.close()
+    return elapsed
+
+
+def benchmark_config(model, text: str, voice: str, speed: float = 1.0, repeat: int = 3) -> dict:
+    """Benchmark one (loaded model, voice) combination.
+
+    The first synthesis is treated as warmup and excluded from the timings.
+    "peak_rss_mb" is the highest resident set size sampled after each of
+    this configuration's runs, so it follows the configuration rather than
+    the process's lifetime peak.
+    """
+    from .memory import rss_mb
+
+    synthesize_with_stages(model, text, voice, speed)
+    rss = [rss_mb()]
+
+    wall = []
+    stage_runs = []
+    audio_seconds = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        audio, stages = synthesize_with_stages(model, text, voice, speed)
+        wall.append(time.perf_counter() - start)
+        stage_runs.append(stages)
+        audio_seconds = audio.shape[-1] / SAMPLE_RATE
+        rss.append(rss_mb())
+
+    ttfa = []
+    for _ in range(repeat):
+        ttfa.append(time_to_first_audio(model, text, voice, speed))
+        rss.append(rss_mb())
+    wall_median = statistics.median(wall)
+    inference = [run["inference"] for run in stage_runs]
+    return {
+        "wall_seconds": wall_median,
+        "wall_stdev": statistics.pstdev(wall),
+        "inference_stdev": statistics.pstdev(inference),
+        "audio_seconds": audio_seconds,
+        "rtf": wall_median / audio_seconds if audio_seconds else None,
+        "chars_per_second": len(text) / wall_median if wall_median else None,
+        "ttfa_seconds": statistics.median(ttfa),
+        "stages": {
+            name: statistics.median(run[name] for run in stage_runs) for name in STAGES
+        },
+        "peak_rss_mb": max(rss) if None not in rss else None,
+    }
+
+
+def result_key(result: dict) -> str:
+    """Stable identifier for a benchmark configuration."""
+    return "|".join(
+        str(result[field]) for field in ("model", "voice", "chunk_len", "threads")
+    )
+
+
+def run_benchmark(models: Optional[List[str]] = None,
+                  voices: Optional[List[str]] = None,
+                  chunk_lens: Optional[List[int]] = None,
+                  threads: Optional[List[Optional[int]]] = None,
+                  text: str = DEFAULT_TEXT,
+                  speed: float = 1.0,
+                  repeat: int = 3,
+                  loader: Optional[Callable] = None,
+                  log: Optional[Callable[[str], None]] = None,
+                  model_kwargs: Optional[dict] = None) -> dict:
+    """Sweep models, thread counts, voices and chunk lengths.
+
+    Args:
+        models: Hugging Face repository IDs to benchmark
+        voices: Voice names or aliases
+        chunk_lens: Values for the model's chunk_chars (character chunking);
+            each loads the model again
+        threads: intra_op_num_threads values; None keeps the ORT default
+        text: Benchmark text
+        speed: Speech speed
+        repeat: Timed repetitions per configuration (medians are reported)
+        loader: Callable (model_name, **model_kwargs) -> KittenTTS_1_Onnx;
+            defaults to loading through KittenTTS
+        log: Optional callable receiving one progress line per configuration
+        model_kwargs: Extra KittenTTS keyword arguments for every model, e.g.
+            {"io_binding": True, "token_buckets": True}
+
+    Returns:
+        Dict with "meta" describing the environment and a "results" list.
+    """
+    loader = loader or _default_loader
+    results = []
+    for model_name in models or DEFAULT_MODELS:
+        for thread_count in threads or DEFAULT_THREADS:
+            session_options = {"intra_op_num_threads": thread_count} if thread_count else None
+            for chunk_len in chunk_lens or DEFAULT_CHUNK_LENS:
+                start = time.perf_counter()
+                model = loader(model_name, session_options=session_options, chunk_chars=chunk_len,
+                               **(model_kwargs or {}))
+                load_seconds = time.perf_counter() - start
+
+                for voice in voices or DEFAULT_VOICES:
+                    result = {
+                        "model": model_name,
+                        "voice": voice,
+                        "chunk_len": chunk_len,
+                        "threads": thread_count,
+                        "load_seconds": load_seconds,
+                    }
+                    result.update(benchmark_config(model, text, voice, speed, repeat))
+                    results.append(result)
+                    if log:
+                        log(f"{result_key(result)}: rtf={result['rtf']:.3f} "
+                            f"ttfa={result['ttfa_seconds'] * 1000:.1f}ms "
+                            f"chars/s={result['chars_per_second']:.0f}")
+                model.close()
+                del model
+
+    meta = _environment()
+    meta.update({"text_chars": len(text), "repeat": repeat, "model_kwargs": _jsonable(model_kwargs)})
+    return {"meta": meta, "results": results}
+
+
+def _jsonable(kwargs: Optional[dict]) -> dict:
+    return {key: value if isinstance(value, (bool, int, float, str, list, type(None))) else repr(value)
+            for key, value in (kwargs or {}).items()}
+
+
+def _environment() -> dict:
+    import onnxruntime as ort
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "onnxruntime": ort.__version__,
+    }
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """Cut text to at most ``max_chars`` characters at a word boundary."""
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars + 1)
+    return text[:cut if cut > 0 else max_chars]
+
+
+def profile_models(models: Optional[List[str]] = None,
+                   input_lens: Optional[List[int]] = None,
+                   voice: str = DEFAULT_VOICES[0],
+                   text: str = DEFAULT_TEXT,
+                   threads: Optional[int] = None,
+                   speed: float = 1.0,
+                   repeat: int = 3,
+                   loader: Optional[Callable] = None,
+                   model_kwargs: Optional[dict] = None) -> dict:
+    """Profile operator time per model and input length with the ORT profiler.
+
+    Each (model, input length) pair gets a fresh session so its trace only
+    contains that workload. Chunking is disabled by using the whole input as
+    one chunk, so input lengths above the model's limit are not meaningful.
+
+    Returns:
+        Dict with "meta" and a "profiles" list; each entry holds model,
+        input_chars and the summarize_profile output under "summary".
+    """
+    from .profiling import summarize_profile
+
+    loader = loader or _default_loader
+    session_options = {"intra_op_num_threads": threads} if threads else None
+    profiles = []
+    for model_name in models or DEFAULT_MODELS:
+        for input_len in input_lens or [len(text)]:
+            sample = truncate_text(text, input_len)
+            model = loader(model_name, session_options=session_options, enable_profiling=True,
+                           **(model_kwargs or {}))
+            for _ in range(repeat):
+                model.generate_single_chunk(sample, voice, speed)
+            trace_path = model.end_profiling()
+            summary = summarize_profile(trace_path)
+            summary["trace_path"] = trace_path
+            profiles.append({"model": model_name, "input_chars": len(sample), "summary": summary})
+            model.close()
+            del model
+
+    meta = _environment()
+    meta.update({"voice": voice, "threads": threads, "repeat": repeat, "model_kwargs": _jsonable(model_kwargs)})
+    return {"meta": meta, "profiles": profiles}
+
+
+def compare_runs(baseline: dict, current: dict, threshold: float = 0.10) -> List[dict]:
+    """Find metrics that regressed by more than ``threshold`` (a fraction).
+
+    Configurations are matched by model, voice, chunk length and thread
+    count; configurations present in only one run are ignored.
+
+    Returns:
+        List of dicts with key, metric, baseline, current and change.
+    """
+    base_by_key = {result_key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        key = result_key(result)
+        base = base_by_key.get(key)
+        if base is None:
+            continue
+
+        pairs = [(metric, base.get(metric), result.get(metric), 1) for metric in _LOWER_IS_BETTER]
+        pairs += [(metric, base.get(metric), result.get(metric), -1) for metric in _HIGHER_IS_BETTER]
+        pairs += [
+            (f"stages.{name}", base.get("stages", {}).get(name), result.get("stages", {}).get(name), 1)
+            for name in STAGES
+        ]
+        for metric, before, after, direction in pairs:
+            if not before or after is None:
+                continue
+            if metric.startswith("stages.") and max(before, after) < _MIN_STAGE_SECONDS:
+                continue
+            change = (after - before) / before
+            if change * direction > threshold:
+                regressions.append({
+                    "key": key,
+                    "metric": metric,
+                    "baseline": before,
+                    "current": after,
+                    "change": change,
+                })
+    return regressions
+
+
+def load_results(path: str) -> dict:
+    """Load a JSON file written by ``save_results``."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_results(results: dict, path: str) -> None:
+    """Write benchmark results as indented JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
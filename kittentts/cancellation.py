@@ -0,0 +1,128 @@
+"""
+cancellation.py
+Cooperative cancellation and deadlines for synthesis.
+
+Pass a ``CancellationToken`` (or a ``timeout``) to ``generate``,
+``generate_stream`` or ``generate_to_file``. The token is checked between
+chunks and pipeline stages, and an inference that is already running is
+stopped through ``onnxruntime.RunOptions.terminate``. Cancellation surfaces
+as ``SynthesisCancelled``, which reports how much audio was produced.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy as np
+
+
+class SynthesisCancelled(Exception):
+    """Synthesis stopped by a CancellationToken or deadline.
+
+    Attributes:
+        reason: "cancelled" or "deadline"
+        chunks: Number of chunks completed before cancellation
+        audio_seconds: Seconds of audio produced before cancellation
+        audio: The audio produced so far, where the call returns audio as a
+            whole (generate); None for streams, whose chunks were already
+            handed out
+    """
+
+    def __init__(self, reason: str = "cancelled", chunks: int = 0, audio_seconds: float = 0.0,
+                 audio: Optional[np.ndarray] = None):
+        super().__init__(f"Synthesis {reason} after {chunks} chunks ({audio_seconds:.2f}s of audio)")
+        self.reason = reason
+        self.chunks = chunks
+        self.audio_seconds = audio_seconds
+        self.audio = audio
+
+
+class CancellationToken:
+    """Thread-safe flag that stops synthesis, optionally at a deadline.
+
+    Args:
+        timeout: Seconds from now after which the token cancels itself
+            (reason "deadline"), interrupting a running inference
+        parent: Optional token whose cancellation also cancels this one
+
+    Call ``close()`` when a token with a timeout or parent is no longer
+    needed, to stop its timer and detach it from the parent.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, parent: Optional["CancellationToken"] = None):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._run_options = set()
+        self._children = set()
+        self._parent = parent
+        self.reason: Optional[str] = None
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self._timer = None
+        if timeout is not None:
+            self._timer = threading.Timer(max(timeout, 0.0), self.cancel, args=("deadline",))
+            self._timer.daemon = True
+            self._timer.start()
+        if parent is not None:
+            with parent._lock:
+                parent._children.add(self)
+            if parent.cancelled:
+                self.cancel(parent.reason)
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Request cancellation; running inferences are terminated."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            for run_options in self._run_options:
+                run_options.terminate = True
+            children = list(self._children)
+        for child in children:
+            child.cancel(reason)
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline")
+        return self._event.is_set()
+
+    def check(self) -> None:
+        """Raise SynthesisCancelled if the token has been cancelled."""
+        if self.cancelled:
+            raise SynthesisCancelled(self.reason)
+
+    @contextmanager
+    def run_options(self):
+        """RunOptions for one inference, terminated if the token is cancelled meanwhile."""
+        import onnxruntime as ort
+
+        run_options = ort.RunOptions()
+        with self._lock:
+            self._run_options.add(run_options)
+            run_options.terminate = self._event.is_set()
+        try:
+            yield run_options
+        finally:
+            with self._lock:
+                self._run_options.discard(run_options)
+
+    def close(self) -> None:
+        """Stop the deadline timer and detach from the parent, if any."""
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._parent is not None:
+            with self._parent._lock:
+                self._parent._children.discard(self)
+
+
+def as_token(cancel: Optional[CancellationToken], timeout: Optional[float]):
+    """Combine the ``cancel`` and ``timeout`` arguments of the generate methods.
+
+    Returns:
+        Tuple of (token or None, whether the caller owns and must close it)
+    """
+    if timeout is None:
+        return cancel, False
+    return CancellationToken(timeout, parent=cancel), True
@@ -0,0 +1,408 @@
+"""
+cli.py
+Command-line entry point: ``kittentts <command> ...``.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+
+def _optional_int(value):
+    return None if value.lower() in {"none", "default"} else int(value)
+
+
+def _add_bench_parser(subparsers):
+    parser = subparsers.add_parser("bench", help="Run end-to-end synthesis benchmarks")
+    parser.add_argument("--models", nargs="+", help="Hugging Face repository IDs")
+    parser.add_argument("--voices", nargs="+", help="Voice names or aliases")
+    parser.add_argument("--chunk-lens", nargs="+", type=int,
+                        help="chunk_chars values for character chunking; the model is loaded once per value")
+    parser.add_argument("--threads", nargs="+", type=_optional_int,
+                        help="intra-op thread counts ('default' keeps the ORT default)")
+    parser.add_argument("--text-file", help="Benchmark text (defaults to a built-in passage)")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per configuration")
+    parser.add_argument("--output", "-o", help="Write results JSON to this path")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Diff two result files instead of running")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative change reported as a regression (default: 0.10)")
+    parser.add_argument("--io-binding", action="store_true", help="Run inference through IOBinding")
+    parser.add_argument("--token-buckets", nargs="*", type=int,
+                        help="Pad token sequences to these lengths (no values: built-in buckets)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run the ORT operator profiler instead of the timing sweep")
+    parser.add_argument("--input-lens", nargs="+", type=int,
+                        help="Input lengths in characters to profile (with --profile)")
+    parser.add_argument("--by", choices=["op_types", "nodes", "scopes"], default="op_types",
+                        help="Profile table grouping (default: op_types)")
+    parser.add_argument("--top", type=int, default=20, help="Rows per profile table")
+    parser.add_argument("--frontend", action="store_true",
+                        help="Benchmark the text front end on the bundled corpus instead (no model needed)")
+    parser.add_argument("--sizes", nargs="+", type=int,
+                        help="Document sizes in characters for --frontend (default: 1000 to 1000000)")
+    parser.add_argument("--functions", nargs="+",
+                        help="Front-end functions to time with --frontend (default: all)")
+    parser.add_argument("--calibrate", metavar="PATH",
+                        help="Fit a cost model for the first model and voice and write it to PATH "
+                             "(load it with cost_model=PATH)")
+    parser.add_argument("--arena-shrinkage", action="store_true",
+                        help="Shrink the CPU arena after every inference run")
+    parser.add_argument("--arena-max-mb", type=float, help="Cap the shared CPU arena at this many MiB")
+    parser.add_argument("--max-tokens-per-run", type=int, help="Keep every chunk within this many input IDs")
+    parser.add_argument("--soak", type=int, metavar="REQUESTS",
+                        help="Run this many mixed-length requests on the first model and voice and report RSS")
+    parser.set_defaults(func=_run_bench)
+
+
+def _run_bench(args):
+    from . import bench
+
+    if args.compare:
+        from .textbench import SUITE, compare_text_runs
+
+        baseline, current = (bench.load_results(path) for path in args.compare)
+        compare = compare_text_runs if current.get("meta", {}).get("suite") == SUITE else bench.compare_runs
+        regressions = compare(baseline, current, threshold=args.threshold)
+        for reg in regressions:
+            change = f" ({reg['change']:+.1%})" if reg["change"] is not None else ""
+            print(f"REGRESSION {reg['key']} {reg['metric']}: {reg['baseline']:.4g} -> {reg['current']:.4g}{change}")
+        if not regressions:
+            print("No regressions.")
+        return 1 if regressions else 0
+
+    if args.frontend:
+        return _run_text_bench(args)
+
+    kwargs = {}
+    if args.text_file:
+        with open(args.text_file, "r", encoding="utf-8") as f:
+            kwargs["text"] = f.read()
+
+    model_kwargs = {}
+    if args.io_binding:
+        model_kwargs["io_binding"] = True
+    if args.token_buckets is not None:
+        model_kwargs["token_buckets"] = args.token_buckets or True
+    if args.arena_shrinkage:
+        model_kwargs["arena_shrinkage"] = True
+    if args.arena_max_mb is not None:
+        model_kwargs["arena_max_mb"] = args.arena_max_mb
+    if args.max_tokens_per_run is not None:
+        model_kwargs["max_tokens_per_run"] = args.max_tokens_per_run
+    kwargs["model_kwargs"] = model_kwargs
+
+    if args.profile:
+        return _run_profile(args, kwargs)
+    if args.calibrate:
+        return _run_calibrate(args, model_kwargs)
+    if args.soak:
+        return _run_soak(args, model_kwargs)
+
+    results = bench.run_benchmark(
+        models=args.models,
+        voices=args.voices,
+        chunk_lens=args.chunk_lens,
+        threads=args.threads,
+        speed=args.speed,
+        repeat=args.repeat,
+        log=lambda line: print(line, file=sys.stderr),
+        **kwargs,
+    )
+    if args.output:
+        bench.save_results(results, args.output)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+def _run_text_bench(args):
+    from . import bench
+    from .textbench import run_text_benchmark
+
+    results = run_text_benchmark(sizes=args.sizes, functions=args.functions, repeat=args.repeat,
+                                 log=lambda line: print(line, file=sys.stderr))
+    for name, exponent in results["scaling"].items():
+        if exponent is not None:
+            print(f"{name}: time grows as size^{exponent:.2f}", file=sys.stderr)
+    if args.output:
+        bench.save_results(results, args.output)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+def _run_calibrate(args, model_kwargs):
+    from . import bench
+    from .cost import calibrate
+
+    threads = args.threads[0] if args.threads else None
+    session_options = {"intra_op_num_threads": threads} if threads else None
+    model = bench._default_loader((args.models or bench.DEFAULT_MODELS)[0], session_options=session_options,
+                                  **model_kwargs)
+    try:
+        cost_model = calibrate(model, voice=(args.voices or bench.DEFAULT_VOICES)[0], repeat=args.repeat,
+                               log=lambda line: print(line, file=sys.stderr))
+    finally:
+        model.close()
+    cost_model.save(args.calibrate)
+    print(f"{cost_model.request_seconds * 1000:.2f}ms per request, {cost_model.chunk_seconds * 1000:.2f}ms per "
+          f"chunk, {cost_model.token_seconds * 1e6:.1f}us per token; wrote {args.calibrate}", file=sys.stderr)
+    return 0
+
+
+def _run_soak(args, model_kwargs):
+    from . import bench
+    from .memory import soak
+
+    threads = args.threads[0] if args.threads else None
+    session_options = {"intra_op_num_threads": threads} if threads else None
+    model = bench._default_loader((args.models or bench.DEFAULT_MODELS)[0], session_options=session_options,
+                                  **model_kwargs)
+    try:
+        results = soak(model, requests=args.soak, voice=(args.voices or bench.DEFAULT_VOICES)[0],
+                       log=lambda line: print(line, file=sys.stderr))
+    finally:
+        model.close()
+    results["meta"] = {"model_kwargs": model_kwargs}
+    if results["steady_rss_mb"] is not None:
+        print(f"steady {results['steady_rss_mb']:.1f} MiB, peak {results['peak_rss_mb']:.1f} MiB, "
+              f"growth {results['growth_mb']:+.1f} MiB over {results['requests']} requests", file=sys.stderr)
+    if args.output:
+        bench.save_results(results, args.output)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+def _run_profile(args, kwargs):
+    from . import bench
+    from .profiling import format_profile_table
+
+    if args.voices:
+        kwargs["voice"] = args.voices[0]
+    results = bench.profile_models(
+        models=args.models,
+        input_lens=args.input_lens,
+        threads=args.threads[0] if args.threads else None,
+        speed=args.speed,
+        repeat=args.repeat,
+        **kwargs,
+    )
+    for profile in results["profiles"]:
+        summary = profile["summary"]
+        print(f"== {profile['model']} | {profile['input_chars']} chars | "
+              f"{summary['total_us'] / 1000:.1f} ms kernel time over {summary['runs']} runs | "
+              f"{summary['arena_growth_events']} arena growths ({summary['arena_growth_bytes'] / 1024:.0f} KiB)")
+        print(format_profile_table(summary, by=args.by, top=args.top))
+        print()
+    if args.output:
+        bench.save_results(results, args.output)
+    return 0
+
+
+def _add_quantize_parser(subparsers):
+    parser = subparsers.add_parser("quantize", help="Quantize a model and validate it against fp32")
+    parser.add_argument("model", help="Hugging Face repository ID or local model directory")
+    parser.add_argument("--out", required=True, help="Output directory (one sub-directory per variant)")
+    parser.add_argument("--variants", nargs="+", choices=["dynamic", "static"], default=["dynamic", "static"],
+                        help="int8 variants to produce (default: dynamic static)")
+    parser.add_argument("--fp16", action="store_true", help="Also produce an fp16 variant")
+    parser.add_argument("--voice", default="Jasper", help="Voice used for calibration and validation")
+    parser.add_argument("--texts-file", help="Validation texts, one per line (defaults to a built-in set)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed validation repetitions")
+    parser.add_argument("--no-validate", action="store_true", help="Skip validation against fp32")
+    parser.add_argument("--cache-dir", help="Hugging Face cache directory")
+    parser.set_defaults(func=_run_quantize)
+
+
+def _run_quantize(args):
+    from . import quantize
+
+    texts = None
+    if args.texts_file:
+        with open(args.texts_file, "r", encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    variants = list(args.variants) + (["fp16"] if args.fp16 else [])
+    directories = quantize.quantize_model(
+        args.model, args.out, variants=variants, calibration_texts=texts,
+        calibration_voices=[args.voice], cache_dir=args.cache_dir,
+    )
+    for variant, directory in directories.items():
+        print(f"{variant}: {directory}")
+    if args.no_validate:
+        return 0
+
+    rows = quantize.validate_variants(directories, texts=texts, voice=args.voice, repeat=args.repeat)
+    print()
+    print(quantize.format_validation_table(rows))
+    report_path = os.path.join(args.out, "validation.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+    print(f"\nValidation report written to {report_path}")
+    return 0
+
+
+def _add_render_parser(subparsers):
+    parser = subparsers.add_parser("render", help="Render a long text file to audio with resumable checkpoints")
+    parser.add_argument("text_file", help="UTF-8 text file")
+    parser.add_argument("--out", "-o", required=True, help="Output audio file (WAV)")
+    parser.add_argument("--model", default="KittenML/kitten-tts-nano-0.8",
+                        help="Hugging Face repository ID or local model directory")
+    parser.add_argument("--voice", default="Jasper")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--manifest", help="Checkpoint file (default: OUT.manifest.json)")
+    parser.add_argument("--no-clean", action="store_true", help="Skip text normalization")
+    parser.add_argument("--parallel", action="store_true", help="Synthesize chunks on several session lanes")
+    parser.add_argument("--cache-dir", help="Hugging Face cache directory")
+    parser.set_defaults(func=_run_render)
+
+
+def _format_seconds(seconds):
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+def _run_render(args):
+    from .get_model import KittenTTS
+
+    def report(info):
+        share = info["bytes_done"] / info["bytes_total"] if info["bytes_total"] else 1.0
+        print(f"\r{share:6.1%}  chunk {info['chunks']}  audio {_format_seconds(info['audio_seconds'])}  "
+              f"ETA {_format_seconds(info['eta_seconds'])}", end="", file=sys.stderr, flush=True)
+
+    model = KittenTTS(args.model, cache_dir=args.cache_dir, parallel="auto" if args.parallel else None)
+    result = model.render_long(args.text_file, args.out, voice=args.voice, speed=args.speed,
+                               manifest_path=args.manifest, clean_text=not args.no_clean, progress=report)
+    print(file=sys.stderr)
+    if result["resumed_chunks"]:
+        print(f"Resumed after {result['resumed_chunks']} chunks")
+    print(f"Wrote {_format_seconds(result['audio_seconds'])} of audio to {args.out} "
+          f"in {_format_seconds(result['elapsed_seconds'])}")
+    return 0
+
+
+def _add_compile_parser(subparsers):
+    parser = subparsers.add_parser("compile", help="Precompute token IDs for a corpus (one text per line)")
+    parser.add_argument("texts_file", help="UTF-8 text file with one text per line")
+    parser.add_argument("--out", "-o", required=True, help="Output .npz file")
+    parser.add_argument("--model", default="KittenML/kitten-tts-nano-0.8",
+                        help="Hugging Face repository ID or local model directory")
+    parser.add_argument("--voice", default="Jasper")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--no-clean", action="store_true", help="Skip text normalization")
+    parser.add_argument("--cache-dir", help="Hugging Face cache directory")
+    parser.set_defaults(func=_run_compile)
+
+
+def _run_compile(args):
+    from .get_model import KittenTTS
+
+    with open(args.texts_file, "r", encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+    model = KittenTTS(args.model, cache_dir=args.cache_dir)
+    chunks = model.compile_script(texts, args.out, voices=args.voice, speeds=args.speed,
+                                  clean_text=not args.no_clean)
+    print(f"Compiled {len(texts)} texts ({chunks} chunks) to {args.out}")
+    return 0
+
+
+def _add_lexicon_parser(subparsers):
+    parser = subparsers.add_parser("lexicon", help="Build a pronunciation lexicon from a text corpus")
+    parser.add_argument("corpus", nargs="+", help="UTF-8 text files")
+    parser.add_argument("--out", "-o", required=True, help="Output lexicon JSON")
+    parser.add_argument("--top", type=int, help="Keep only the N most frequent words")
+    parser.add_argument("--min-count", type=int, default=2,
+                        help="Occurrences needed before a word is trusted (default: 2)")
+    parser.add_argument("--no-clean", action="store_true", help="Skip text normalization")
+    parser.set_defaults(func=_run_lexicon)
+
+
+def _run_lexicon(args):
+    from .lexicon import build_lexicon, lexicon_fidelity
+    from .onnx_model import espeak_backend
+    from .preprocess import TextPreprocessor, chunk_text
+
+    preprocessor = TextPreprocessor(remove_punctuation=False)
+    texts = []
+    for path in args.corpus:
+        with open(path, "r", encoding="utf-8") as f:
+            for paragraph in f.read().split("\n\n"):
+                if paragraph.strip():
+                    texts.extend(chunk_text(paragraph if args.no_clean else preprocessor(paragraph)))
+
+    backend = espeak_backend()
+    lexicon = build_lexicon(texts, backend.phonemize, top=args.top, min_count=args.min_count)
+    lexicon.save(args.out)
+    fidelity = lexicon_fidelity(texts, lexicon, backend)
+    print(f"{len(lexicon)} entries written to {args.out}; on the corpus "
+          f"{fidelity['hit_rate']:.1%} of segments come from the lexicon and "
+          f"{fidelity['exact_rate']:.1%} of chunks match espeak exactly")
+    return 0
+
+
+def _add_synth_parser(subparsers):
+    parser = subparsers.add_parser("synth", help="Synthesize a JSONL manifest into audio files")
+    parser.add_argument("--input", "-i", required=True,
+                        help="JSONL manifest; one {\"text\", \"id\", \"voice\", \"speed\"} object per line")
+    parser.add_argument("--out", "-o", required=True, help="Output directory")
+    parser.add_argument("--model", default="KittenML/kitten-tts-nano-0.8",
+                        help="Hugging Face repository ID or local model directory")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes, each loading the model once")
+    parser.add_argument("--shard", default="0/1", help="Handle shard i of n (0-based), e.g. 2/8")
+    parser.add_argument("--voice", default="Jasper", help="Voice for items that do not name one")
+    parser.add_argument("--speed", type=float, default=1.0, help="Speed for items that do not set one")
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    parser.add_argument("--format", choices=["wav", "flac"], default="wav")
+    parser.add_argument("--io-threads", type=int, default=2, help="Background threads writing audio")
+    parser.add_argument("--no-clean", action="store_true", help="Skip text normalization")
+    parser.add_argument("--cache-dir", help="Hugging Face cache directory")
+    parser.set_defaults(func=_run_synth)
+
+
+def _run_synth(args):
+    from .synth import parse_shard, synthesize_manifest
+
+    def report(record):
+        status = f"failed: {record['error']}" if "error" in record else \
+            f"{record['audio_seconds']:.2f}s audio, rtf {record['rtf']:.3f}"
+        print(f"{record['id']}: {status}", file=sys.stderr)
+
+    summary = synthesize_manifest(args.input, args.out, model=args.model, jobs=args.jobs,
+                                  shard=parse_shard(args.shard), voice=args.voice, speed=args.speed,
+                                  sample_rate=args.sample_rate, clean_text=not args.no_clean,
+                                  audio_format=args.format, io_threads=args.io_threads, cache_dir=args.cache_dir,
+                                  progress=report)
+    print(f"{summary['written']} written, {summary['skipped']} already done, {summary['failed']} failed "
+          f"of {summary['total']} items in this shard")
+    return 1 if summary["failed"] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="kittentts", description="Kitten TTS tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _add_bench_parser(subparsers)
+    _add_quantize_parser(subparsers)
+    _add_render_parser(subparsers)
+    _add_compile_parser(subparsers)
+    _add_lexicon_parser(subparsers)
+    _add_synth_parser(subparsers)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+compiled.py
+Precompiled scripts: run the text front end once, synthesize many times.
+
+``compile_script`` normalizes, chunks, phonemizes and tokenizes a corpus and
+stores the token IDs together with each text's voice, speed and the chunk
+text lengths (which select the voice style row) in a single .npz file.
+``synthesize_compiled`` feeds them straight to the model through
+``generate_from_tokens``; espeak and the normalizer are not needed at that
+point, and the audio is identical to ``generate`` on the original texts.
+"""
+
+from typing import Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+def compile_script(model, texts: Sequence[str], output_path: str,
+                   voices: Union[str, Sequence[str]] = "expr-voice-5-m",
+                   speeds: Union[float, Sequence[float]] = 1.0, clean_text: bool = True) -> int:
+    """Front-end process ``texts`` and save the token IDs to ``output_path``.
+
+    Args:
+        model: KittenTTS_1_Onnx instance
+        texts: Texts to compile
+        output_path: Destination .npz file
+        voices: One voice for all texts, or one per text
+        speeds: One speed for all texts, or one per text
+        clean_text: If true, it will cleanup the text. Eg. replace numbers with words.
+
+    Returns:
+        Number of chunks written
+    """
+    texts = list(texts)
+    voices = [voices] * len(texts) if isinstance(voices, str) else list(voices)
+    speeds = [speeds] * len(texts) if isinstance(speeds, (int, float)) else list(speeds)
+    if len(voices) != len(texts) or len(speeds) != len(texts):
+        raise ValueError("voices and speeds must be single values or match the number of texts")
+    for voice in set(voices):
+        model._resolve_voice(voice)
+
+    tokens: List[np.ndarray] = []
+    text_lengths: List[int] = []
+    item_chunks = [0]
+    for text in texts:
+        for text_chunk in model._chunks(text, clean_text):
+            tokens.append(model._encode_chunk(text_chunk)[0])
+            text_lengths.append(len(text_chunk))
+        item_chunks.append(len(tokens))
+
+    sizes = [ids.shape[0] for ids in tokens]
+    np.savez(
+        output_path,
+        format_version=np.array(FORMAT_VERSION),
+        tokens=np.concatenate(tokens) if tokens else np.zeros(0, dtype=np.int64),
+        chunk_offsets=np.concatenate(([0], np.cumsum(sizes, dtype=np.int64))),
+        chunk_text_lengths=np.array(text_lengths, dtype=np.int64),
+        item_chunks=np.array(item_chunks, dtype=np.int64),
+        voices=np.array(voices, dtype=str),
+        speeds=np.array(speeds, dtype=np.float32),
+    )
+    return len(tokens)
+
+
+class CompiledScript:
+    """A script written by compile_script.
+
+    Args:
+        path: The .npz file
+    """
+
+    def __init__(self, path: str):
+        with np.load(path) as data:
+            if int(data["format_version"]) != FORMAT_VERSION:
+                raise ValueError(f"Unsupported compiled script version {int(data['format_version'])}")
+            self.tokens = data["tokens"]
+            self.chunk_offsets = data["chunk_offsets"]
+            self.chunk_text_lengths = data["chunk_text_lengths"]
+            self.item_chunks = data["item_chunks"]
+            self.voices = [str(voice) for voice in data["voices"]]
+            self.speeds = [float(speed) for speed in data["speeds"]]
+
+    def __len__(self) -> int:
+        return len(self.voices)
+
+    def chunks(self, index: int) -> List[np.ndarray]:
+        """Token ID arrays of the chunks of text ``index``."""
+        first, last = self.item_chunks[index], self.item_chunks[index + 1]
+        return [self.tokens[self.chunk_offsets[c]:self.chunk_offsets[c + 1]] for c in range(first, last)]
+
+    def text_lengths(self, index: int) -> List[int]:
+        first, last = self.item_chunks[index], self.item_chunks[index + 1]
+        return self.chunk_text_lengths[first:last].tolist()
+
+
+def synthesize_compiled(model, script: Union[str, CompiledScript],
+                        indexes: Optional[Sequence[int]] = None) -> Iterator[np.ndarray]:
+    """Synthesize texts of a compiled script without the text front end.
+
+    Args:
+        model: KittenTTS_1_Onnx instance
+        script: CompiledScript or path to its .npz file
+        indexes: Texts to synthesize (default: all, in order)
+
+    Yields:
+        numpy.ndarray: Audio for each text
+    """
+    if isinstance(script, str):
+        script = CompiledScript(script)
+    for index in range(len(script)) if indexes is None else indexes:
+        chunks = script.chunks(index)
+        if not chunks:
+            yield np.zeros(0, dtype=np.float32)
+            continue
+        yield model.generate_from_tokens(chunks, script.voices[index], script.speeds[index],
+                                         text_lengths=script.text_lengths(index))
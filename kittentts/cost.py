@@ -0,0 +1,207 @@
+"""
+cost.py
+Predicting synthesis time and output duration before running a request.
+
+Request sizes range from two words to whole pages, so a server needs to
+know a request's cost before running it: to order its queue and to turn
+away work that can't meet a deadline. ``CostModel`` predicts from features
+that are cheap to compute up front:
+
+* chunks: chunks after normalization; each costs one session run
+* tokens: input IDs, estimated from normalized characters with a
+  calibrated tokens-per-character ratio (or counted exactly by
+  phonemizing)
+
+Wall time is ``request_seconds + chunk_seconds * chunks + token_seconds *
+tokens``. Audio duration is linear in the same features and divided by the
+resolved speed. The coefficients are fitted by least squares to timed
+``generate`` calls on the benchmark corpus (``calibrate``, or ``kittentts
+bench --calibrate``). Fitting takes seconds, so it never happens
+implicitly: a model estimates only after ``model.calibrate()`` or with a
+saved fit passed as ``cost_model``. A fit belongs to the model and machine
+it was measured on. ``scaled_to`` transfers one to a model of another size
+as a rough prior until that model has been calibrated.
+"""
+
+import json
+import logging
+import os
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .tokenizer import FRAMING_TOKENS
+
+logger = logging.getLogger(__name__)
+
+# Benchmark-corpus document sizes (characters) timed by calibrate().
+CALIBRATION_SIZES = [16, 40, 100, 250, 600, 1500]
+CALIBRATION_STYLES = ["news", "chat"]
+
+
+@dataclass
+class CostModel:
+    """Linear predictor of synthesis wall time and audio duration."""
+
+    request_seconds: float = 0.0
+    chunk_seconds: float = 0.0
+    token_seconds: float = 0.0
+    audio_seconds_per_token: float = 0.0
+    audio_seconds_per_chunk: float = 0.0
+    tokens_per_char: float = 1.0
+    model_bytes: Optional[int] = None
+
+    def estimate(self, chunks: Sequence[str], speed: float = 1.0, tokens: Optional[int] = None) -> dict:
+        """Predict the cost of synthesizing normalized ``chunks``.
+
+        Args:
+            chunks: Normalized text chunks, as synthesis would run them
+            speed: Resolved speed (including the voice's speed prior)
+            tokens: Exact token count, if known; estimated from the
+                character count otherwise
+
+        Returns:
+            dict with "seconds" (wall time), "audio_seconds", "chars",
+            "chunks" and "tokens"
+        """
+        chars = sum(len(chunk) for chunk in chunks)
+        if tokens is None:
+            tokens = round(chars * self.tokens_per_char) + FRAMING_TOKENS * len(chunks)
+        seconds = self.request_seconds + self.chunk_seconds * len(chunks) + self.token_seconds * tokens
+        audio_seconds = (self.audio_seconds_per_token * tokens + self.audio_seconds_per_chunk * len(chunks)) / speed
+        return {"seconds": seconds, "audio_seconds": max(audio_seconds, 0.0), "chars": chars,
+                "chunks": len(chunks), "tokens": tokens}
+
+    def scaled_to(self, model_bytes: int) -> "CostModel":
+        """Copy for a model of ``model_bytes``, scaling per-chunk and per-token time.
+
+        Inference time grows roughly with the parameter count, so this is a
+        usable prior for a model that has not been calibrated yet.
+        """
+        if not self.model_bytes:
+            raise ValueError("This cost model does not record the model size it was fitted for")
+        ratio = model_bytes / self.model_bytes
+        values = asdict(self)
+        values.update(chunk_seconds=self.chunk_seconds * ratio, token_seconds=self.token_seconds * ratio,
+                      model_bytes=model_bytes)
+        return CostModel(**values)
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, indent=2)
+            f.write("\n")
+
+    @classmethod
+    def load(cls, path: str) -> "CostModel":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+
+def _nonnegative_lstsq(features: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Least squares, dropping columns whose coefficient comes out negative."""
+    active = list(range(features.shape[1]))
+    coefficients = np.zeros(features.shape[1])
+    while active:
+        solution = np.linalg.lstsq(features[:, active], targets, rcond=None)[0]
+        if (solution >= 0).all():
+            coefficients[active] = solution
+            break
+        active.pop(int(np.argmin(solution)))
+    return coefficients
+
+
+def fit_cost_model(samples: Sequence[dict], model_bytes: Optional[int] = None) -> CostModel:
+    """Fit a CostModel to timed requests.
+
+    Args:
+        samples: dicts with "chars", "chunks", "tokens", "seconds" and
+            "audio_seconds" (at speed 1.0), as produced by measure()
+        model_bytes: Size of the model file the samples were timed on
+
+    Raises:
+        ValueError: With fewer than three samples.
+    """
+    if len(samples) < 3:
+        raise ValueError("At least three samples are needed to fit a cost model")
+    chunks = np.array([sample["chunks"] for sample in samples], dtype=np.float64)
+    tokens = np.array([sample["tokens"] for sample in samples], dtype=np.float64)
+    chars = sum(sample["chars"] for sample in samples)
+    seconds = np.array([sample["seconds"] for sample in samples])
+    audio = np.array([sample["audio_seconds"] for sample in samples])
+
+    request, per_chunk, per_token = _nonnegative_lstsq(np.stack([np.ones_like(chunks), chunks, tokens], 1), seconds)
+    # Trimming makes the per-chunk audio term negative, so this fit is unconstrained.
+    audio_per_token, audio_per_chunk = np.linalg.lstsq(np.stack([tokens, chunks], 1), audio, rcond=None)[0]
+    return CostModel(
+        request_seconds=float(request), chunk_seconds=float(per_chunk), token_seconds=float(per_token),
+        audio_seconds_per_token=float(audio_per_token), audio_seconds_per_chunk=float(audio_per_chunk),
+        tokens_per_char=float(max(tokens.sum() - FRAMING_TOKENS * chunks.sum(), 0.0) / max(chars, 1)),
+        model_bytes=model_bytes)
+
+
+def measure(model, texts: Sequence[str], voice: str = "expr-voice-5-m", repeat: int = 3,
+            clean_text: bool = True) -> List[dict]:
+    """Time ``model.generate`` on each text and collect cost-model features.
+
+    The runs are not reported to the model's instrumentation.
+
+    Returns:
+        One sample dict per text: "chars", "chunks" and "tokens" of the
+        normalized text, median wall "seconds" and "audio_seconds".
+    """
+    from .instrumentation import NULL_INSTRUMENTATION, bind
+    from .onnx_model import SAMPLE_RATE
+
+    samples = []
+    # Bound for this thread only: the model may be shared with other callers.
+    with bind(NULL_INSTRUMENTATION):
+        model.generate(texts[0], voice=voice, clean_text=clean_text)
+        for text in texts:
+            chunks = model._split(model.preprocessor(text) if clean_text else text)
+            tokens = sum(model._encode_chunk(chunk).shape[-1] for chunk in chunks)
+            wall = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                audio = model.generate(text, voice=voice, clean_text=clean_text)
+                wall.append(time.perf_counter() - start)
+            samples.append({"chars": sum(len(chunk) for chunk in chunks), "chunks": len(chunks), "tokens": tokens,
+                            "seconds": statistics.median(wall), "audio_seconds": audio.shape[-1] / SAMPLE_RATE})
+    return samples
+
+
+def calibrate(model, voice: Optional[str] = None, sizes: Optional[Sequence[int]] = None, repeat: int = 3,
+              log=None) -> CostModel:
+    """Fit a CostModel for ``model`` on this machine.
+
+    Times ``generate`` on benchmark-corpus documents of ``sizes`` characters
+    (default: CALIBRATION_SIZES, a few seconds with the nano models).
+
+    Args:
+        model: KittenTTS_1_Onnx
+        voice: Voice to time (default: the first voice)
+        sizes: Document sizes in characters
+        repeat: Timed runs per size (the median is used)
+        log: Optional callable receiving one line per size
+    """
+    from .textbench import corpus_text
+
+    voice = voice or (list(model.voice_aliases) or list(model.available_voices))[0]
+    texts = [corpus_text(size, CALIBRATION_STYLES) for size in sizes or CALIBRATION_SIZES]
+    samples = measure(model, texts, voice=voice, repeat=repeat)
+    if log:
+        for sample in samples:
+            log(f"{sample['chars']} chars, {sample['chunks']} chunks, {sample['tokens']} tokens: "
+                f"{sample['seconds'] * 1000:.1f}ms for {sample['audio_seconds']:.2f}s of audio")
+    cost_model = fit_cost_model(samples, model_bytes=_model_bytes(model))
+    logger.info("Calibrated cost model: %s", cost_model)
+    return cost_model
+
+
+def _model_bytes(model) -> Optional[int]:
+    try:
+        return os.path.getsize(model.model_path)
+    except (OSError, TypeError):
+        return None
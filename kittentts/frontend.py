@@ -0,0 +1,201 @@
+"""
+frontend.py
+Text front end (normalization, chunking, phonemization) in worker processes.
+
+Normalization and chunking are pure Python and espeak runs under the GIL,
+so in one process they compete with the thread that drives onnxruntime.
+``FrontendPool`` runs these stages in separate processes. Each worker keeps
+its own preprocessor, espeak backend (with lexicon, if any) and tokenizer,
+and sends the token IDs back through a ``multiprocessing.shared_memory``
+block as int16, rather than pickling arrays. Only chunk strings, block names
+and sizes travel through the pool's pipes.
+
+Front-end capacity (``workers``) is sized independently of inference
+capacity (intra-op threads, ``parallel`` lanes). The pool encodes a few
+chunks ahead of the one being synthesized, so inference does not wait on
+espeak.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Token IDs on the wire; the symbol table is far below 2**15 entries.
+_WIRE_DTYPE = np.int16
+
+# Seconds warmup() waits for every worker to start and check in.
+_WARMUP_TIMEOUT = 120.0
+
+# Per-process worker state, set by _init_worker.
+_worker = {}
+
+
+def _init_worker(preprocessor, lexicon, token_budget=None, exact_tokens=False, chunk_chars=400,
+                 barrier=None) -> None:
+    from .onnx_model import espeak_backend
+    from .tokenizer import PhonemeTokenizer
+
+    phonemizer = espeak_backend(lexicon.language if lexicon is not None else "en-us")
+    if lexicon is not None:
+        from .lexicon import LexiconPhonemizer
+
+        phonemizer = LexiconPhonemizer(lexicon, phonemizer)
+    _worker.update(preprocessor=preprocessor, phonemizer=phonemizer, tokenizer=PhonemeTokenizer(),
+                   token_budget=token_budget, exact_tokens=exact_tokens, chunk_chars=chunk_chars, barrier=barrier)
+
+
+def _warm(text: str) -> int:
+    """Run ``text`` through this worker's front end, then wait for every other worker."""
+    for chunk in _split(text, True):
+        _worker["tokenizer"].encode(_worker["phonemizer"].phonemize([chunk])[0])
+    _worker["barrier"].wait(_WARMUP_TIMEOUT)
+    return os.getpid()
+
+
+def _count_tokens(text: str) -> int:
+    from .tokenizer import FRAMING_TOKENS
+
+    return _worker["tokenizer"].encode(_worker["phonemizer"].phonemize([text])[0]).shape[-1] - FRAMING_TOKENS
+
+
+def _split(text: str, clean_text: bool) -> List[str]:
+    from .preprocess import chunk_by_tokens, chunk_text
+
+    if clean_text:
+        text = _worker["preprocessor"](text)
+    if _worker["token_budget"] is None:
+        return chunk_text(text, _worker["chunk_chars"])
+    if _worker["exact_tokens"]:
+        return chunk_by_tokens(text, _worker["token_budget"], _count_tokens, strict=True)
+    return chunk_by_tokens(text, _worker["token_budget"])
+
+
+def _encode(chunks: Sequence[str]) -> Tuple[str, List[int], int]:
+    """Phonemize and tokenize chunks; returns (block name, sizes, dropped symbols)."""
+    arrays = []
+    dropped = 0
+    for chunk in chunks:
+        phonemes = _worker["phonemizer"].phonemize([chunk])[0]
+        input_ids, chunk_dropped = _worker["tokenizer"].encode(phonemes, return_dropped=True)
+        arrays.append(input_ids.reshape(-1))
+        dropped += chunk_dropped
+    sizes = [ids.shape[0] for ids in arrays]
+    block = shared_memory.SharedMemory(create=True, size=max(sum(sizes) * np.dtype(_WIRE_DTYPE).itemsize, 1))
+    try:
+        if arrays:
+            np.ndarray((sum(sizes),), dtype=_WIRE_DTYPE, buffer=block.buf)[:] = np.concatenate(arrays)
+        return block.name, sizes, dropped
+    finally:
+        block.close()
+
+
+def _collect(name: str, sizes: Sequence[int]) -> List[np.ndarray]:
+    """Copy token IDs out of a worker's block, free it and split per chunk."""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        flat = np.ndarray((sum(sizes),), dtype=_WIRE_DTYPE, buffer=block.buf).astype(np.int64)
+    finally:
+        block.close()
+        block.unlink()
+    return [ids.reshape(1, -1) for ids in np.split(flat, np.cumsum(sizes)[:-1])] if sizes else []
+
+
+class FrontendPool:
+    """Process pool running the text front end for a model.
+
+    Args:
+        workers: Number of worker processes
+        preprocessor: TextPreprocessor applied when clean_text is true
+            (default: the model's configuration)
+        lexicon: Optional kittentts.lexicon.Lexicon consulted before espeak
+        start_method: multiprocessing start method; "spawn" keeps workers
+            clear of the parent's onnxruntime threads
+        prefetch: Chunks encoded ahead of the consumer (default: 2 per worker)
+        token_budget: Chunk by tokens with this budget (see
+            kittentts.preprocess.chunk_by_tokens) instead of by characters
+        exact_tokens: With token_budget, count tokens by phonemizing
+        chunk_chars: max_len for character chunking without token_budget
+    """
+
+    def __init__(self, workers: int, preprocessor=None, lexicon=None, start_method: str = "spawn",
+                 prefetch: Optional[int] = None, token_budget: Optional[int] = None, exact_tokens: bool = False,
+                 chunk_chars: int = 400):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if preprocessor is None:
+            from .preprocess import TextPreprocessor
+
+            preprocessor = TextPreprocessor(remove_punctuation=False)
+        self.workers = workers
+        self.prefetch = prefetch or 2 * workers
+        context = multiprocessing.get_context(start_method)
+        self._executor = ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                             initargs=(preprocessor, lexicon, token_budget, exact_tokens, chunk_chars,
+                                                       context.Barrier(workers)))
+
+    def warmup(self, text: str) -> List[int]:
+        """Start every worker and run ``text`` through its front end.
+
+        Each worker takes one warmup task and holds it until all of them
+        have one, so no worker is left cold.
+
+        Returns:
+            Process IDs of the workers
+        """
+        futures = [self._executor.submit(_warm, text) for _ in range(self.workers)]
+        return [future.result() for future in futures]
+
+    def chunks(self, text: str, clean_text: bool = True) -> List[str]:
+        """Normalize (if clean_text) and chunk a text in a worker."""
+        return self._executor.submit(_split, text, clean_text).result()
+
+    def encode(self, chunks: Sequence[str]) -> Tuple[List[np.ndarray], int]:
+        """Token IDs, shape (1, n), of chunks encoded together in one worker.
+
+        Returns:
+            Tuple of (token ID arrays, number of dropped symbols)
+        """
+        name, sizes, dropped = self._executor.submit(_encode, list(chunks)).result()
+        return _collect(name, sizes), dropped
+
+    def encode_ordered(self, chunks: Sequence[str]) -> Iterator[Tuple[np.ndarray, int]]:
+        """Yield (token IDs, dropped symbols) per chunk, in order.
+
+        Chunks are spread over the workers, keeping up to ``prefetch`` of
+        them in flight. Closing the iterator early cancels what has not
+        started and frees the blocks of what has.
+        """
+        pending = iter(chunks)
+        futures = []
+        try:
+            while True:
+                while len(futures) < self.prefetch:
+                    chunk = next(pending, None)
+                    if chunk is None:
+                        break
+                    futures.append(self._executor.submit(_encode, [chunk]))
+                if not futures:
+                    return
+                name, sizes, dropped = futures.pop(0).result()
+                yield _collect(name, sizes)[0], dropped
+        finally:
+            for future in futures:
+                if not future.cancel():
+                    try:
+                        _collect(*future.result()[:2])
+                    except Exception:  # the consumer's error matters more
+                        pass
+
+    def close(self) -> None:
+        """Shut the worker processes down."""
+        self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
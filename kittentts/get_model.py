@@ -1,56 +1,320 @@
 import json
+import logging
 import os
+from contextlib import nullcontext
 from huggingface_hub import hf_hub_download
+from .instrumentation import NULL_INSTRUMENTATION, bind, bind_iter
 from .onnx_model import KittenTTS_1_Onnx
 from .preprocess import normalize_text
 
+logger = logging.getLogger(__name__)
+
 
 class KittenTTS:
     """Main KittenTTS class for text-to-speech synthesis."""
     
-    def __init__(self, model_name="KittenML/kitten-tts-nano-0.8", cache_dir=None, backend=None):
+    def __init__(self, model_name="KittenML/kitten-tts-nano-0.8", cache_dir=None, backend=None, session_options=None,
+                 instrumentation=None, enable_profiling=False, revision=None, shared=False, prefork=False,
+                 **model_kwargs):
         """Initialize KittenTTS with a model from Hugging Face.
         
         Args:
-            model_name: Hugging Face repository ID or model name
+            model_name: Hugging Face repository ID, model name, or local model directory
             cache_dir: Directory to cache downloaded files
+            backend: Execution backend ("cpu", "cuda", "amd_gpu" or None)
+            session_options: Optional dict of onnxruntime.SessionOptions attributes,
+                e.g. {"intra_op_num_threads": 2}
+            instrumentation: Optional kittentts.instrumentation.Instrumentation
+                receiving per-stage timings and counters
+            enable_profiling: Enable the onnxruntime profiler; see end_profiling()
+            revision: Hugging Face revision (branch, tag or commit) to load
+            shared: Reuse the model already loaded in this process for the
+                same repo, revision, backend and options (see
+                kittentts.registry); call close() to release it
+            prefork: Load for a pre-fork server: weights are shared between
+                forked workers and each process creates its onnxruntime
+                session and espeak backend on first use (see kittentts.prefork)
+            **model_kwargs: Further KittenTTS_1_Onnx options, e.g. io_binding=True
+                or token_buckets=True
         """
         # Handle different model name formats
-        if "/" not in model_name:
+        if os.path.isdir(model_name):
+            repo_id = model_name
+        elif "/" not in model_name:
             # If just model name provided, assume it's from KittenML
             repo_id = f"KittenML/{model_name}"
         else:
             repo_id = model_name
             
-        self.model = download_from_huggingface(repo_id=repo_id, cache_dir=cache_dir, backend=backend)
+        self._registry_key = None
+        self._instrumentation = None
+        if prefork:
+            if shared:
+                raise ValueError("prefork and shared can't be combined")
+            from .prefork import PreforkModel
+
+            config, model_path, voices_path = resolve_model_files(repo_id, cache_dir, revision)
+            self.model = PreforkModel(model_path, voices_path, cache_dir=cache_dir, session_options=session_options,
+                                      speed_priors=config.get("speed_priors", {}),
+                                      voice_aliases=config.get("voice_aliases", {}), backend=backend,
+                                      instrumentation=instrumentation, enable_profiling=enable_profiling,
+                                      **model_kwargs)
+        elif shared:
+            from .registry import default_registry
+
+            # Handles share the model but not their metrics: each binds its own instrumentation per call.
+            self._instrumentation = instrumentation or NULL_INSTRUMENTATION
+            self._registry_key, self.model = default_registry.acquire(
+                repo_id, cache_dir=cache_dir, revision=revision, backend=backend, session_options=session_options,
+                enable_profiling=enable_profiling, **model_kwargs)
+        else:
+            self.model = download_from_huggingface(repo_id=repo_id, cache_dir=cache_dir, revision=revision,
+                                                   backend=backend, session_options=session_options,
+                                                   instrumentation=instrumentation,
+                                                   enable_profiling=enable_profiling, **model_kwargs)
+
+    def close(self):
+        """Release the model. A shared model is unloaded with its last handle.
+
+        The instance can't be used afterwards; closing twice is harmless.
+        """
+        if self.model is None:
+            return
+        if self._registry_key is not None:
+            from .registry import default_registry
+
+            default_registry.release(self._registry_key)
+            self._registry_key = None
+        else:
+            self.model.close()
+        self.model = None
+
+    def _bound(self):
+        """Context binding this handle's instrumentation, for calls into a shared model."""
+        if self._instrumentation is None:
+            return nullcontext()
+        return bind(self._instrumentation)
+
+    def _bound_iter(self, iterable):
+        if self._instrumentation is None:
+            return iterable
+        return bind_iter(iterable, self._instrumentation)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
     
     def normalize_text(self, text, locale="en-US", return_spans=False):
         """Normalize text for TTS without generating audio."""
         return normalize_text(text, locale=locale, return_spans=return_spans)
 
-    def generate(self, text, voice="expr-voice-5-m", speed=1.0, clean_text=False):
+    def generate(self, text, voice="expr-voice-5-m", speed=1.0, clean_text=False, cancel=None, timeout=None,
+                 sample_rate=24000):
         """Generate audio from text.
         
         Args:
             text: Input text to synthesize
             voice: Voice to use for synthesis
             speed: Speech speed (1.0 = normal)
+            cancel: Optional kittentts.CancellationToken to stop synthesis
+            timeout: Optional deadline in seconds
+            sample_rate: Output sample rate (e.g. 8000 or 16000); the 24 kHz
+                model output is resampled
             
         Returns:
             Audio data as numpy array
+
+        Raises:
+            SynthesisCancelled: If cancelled or past the deadline; its
+                ``audio`` holds the audio produced so far
         """
-        print(f"Generating audio for text: {text}")
-        return self.model.generate(text, voice=voice, speed=speed, clean_text=clean_text)
+        logger.debug("Generating audio for text: %s", text)
+        with self._bound():
+            return self.model.generate(text, voice=voice, speed=speed, clean_text=clean_text, cancel=cancel,
+                                       timeout=timeout, sample_rate=sample_rate)
 
-    def generate_stream(self, text, voice="expr-voice-5-m", speed=1.0, clean_text=False):
+    def generate_stream(self, text, voice="expr-voice-5-m", speed=1.0, clean_text=False, cancel=None, timeout=None,
+                        sample_rate=24000):
         """Generate audio as a stream of chunks.
 
+        Chunks are resampled to ``sample_rate`` without seams between them.
+
         Yields:
             numpy.ndarray: Audio data for each text chunk.
         """
-        yield from self.model.generate_stream(text, voice=voice, speed=speed, clean_text=clean_text)
+        yield from self._bound_iter(self.model.generate_stream(text, voice=voice, speed=speed, clean_text=clean_text,
+                                                               cancel=cancel, timeout=timeout, sample_rate=sample_rate))
+
+    def generate_from_phonemes(self, phonemes, voice="expr-voice-5-m", speed=1.0, text_lengths=None, cancel=None,
+                               timeout=None):
+        """Generate audio from precomputed phonemes (one chunk string or a list).
+
+        Args:
+            cancel: Optional kittentts.CancellationToken to stop synthesis
+            timeout: Optional deadline in seconds
+
+        Returns:
+            Audio data as numpy array
+        """
+        with self._bound():
+            return self.model.generate_from_phonemes(phonemes, voice=voice, speed=speed, text_lengths=text_lengths,
+                                                     cancel=cancel, timeout=timeout)
+
+    def generate_from_tokens(self, input_ids, voice="expr-voice-5-m", speed=1.0, text_lengths=None, cancel=None,
+                             timeout=None):
+        """Generate audio from token IDs (one chunk array or a list).
+
+        Args:
+            cancel: Optional kittentts.CancellationToken to stop synthesis
+            timeout: Optional deadline in seconds
+
+        Returns:
+            Audio data as numpy array
+        """
+        with self._bound():
+            return self.model.generate_from_tokens(input_ids, voice=voice, speed=speed, text_lengths=text_lengths,
+                                                   cancel=cancel, timeout=timeout)
+
+    def compile_script(self, texts, output_path, voices="expr-voice-5-m", speeds=1.0, clean_text=False):
+        """Run the text front end over ``texts`` once and save the token IDs
+        with their voices and speeds to an .npz file. See kittentts.compiled.
+
+        Returns:
+            Number of chunks written
+        """
+        from .compiled import compile_script
+
+        with self._bound():
+            return compile_script(self.model, texts, output_path, voices=voices, speeds=speeds, clean_text=clean_text)
+
+    def generate_compiled(self, script, indexes=None):
+        """Synthesize a script written by compile_script.
+
+        Yields:
+            numpy.ndarray: Audio for each text
+        """
+        from .compiled import synthesize_compiled
+
+        yield from self._bound_iter(synthesize_compiled(self.model, script, indexes))
+
+    def generate_paced(self, text, voice="expr-voice-5-m", speed=1.0, lookahead=2.0, clean_text=False,
+                       sample_rate=24000):
+        """Stream audio for live playback with a bounded look-ahead.
+
+        Synthesis runs on a background thread and pauses once ``lookahead``
+        seconds of audio are buffered ahead of real-time playback.
+
+        Returns:
+            kittentts.streaming.PacedStream yielding audio chunks; its
+            ``stats`` report underruns. Close it (or use ``with``) when done.
+        """
+        with self._bound():
+            return self.model.generate_paced(text, voice=voice, speed=speed, lookahead=lookahead, clean_text=clean_text,
+                                             sample_rate=sample_rate)
+
+    def estimate(self, text, voice="expr-voice-5-m", speed=1.0, clean_text=False, exact=False):
+        """Predict synthesis time and audio duration without running inference.
+
+        The prediction comes from the model's cost model (see kittentts.cost):
+        one passed as ``cost_model`` or fitted by calibrate().
+
+        Returns:
+            dict with "seconds" (wall time), "audio_seconds", "chars",
+            "chunks" and "tokens"
+
+        Raises:
+            ValueError: If there is no cost model yet.
+        """
+        with self._bound():
+            return self.model.estimate(text, voice=voice, speed=speed, clean_text=clean_text, exact=exact)
+
+    def calibrate(self, voice=None, repeat=3):
+        """Fit the cost model behind estimate() and scheduler() by timing this model.
+
+        Takes a few seconds; save the result with ``.save(path)`` and pass
+        ``cost_model=path`` next time to skip it.
+
+        Returns:
+            kittentts.cost.CostModel
+        """
+        with self._bound():
+            return self.model.calibrate(voice=voice, repeat=repeat)
+
+    def scheduler(self, policy="sjf", clean_text=False, sample_rate=24000, max_queue_seconds=None, slack=1.0):
+        """Create a kittentts.scheduler.Scheduler that queues requests for this model.
+
+        Args:
+            policy: "sjf" (shortest predicted job first), "edf" (earliest
+                deadline first) or "fifo"
+            max_queue_seconds: Reject requests once the predicted backlog
+                exceeds this
+            slack: Safety factor on predictions when checking deadlines
+
+        Returns:
+            Scheduler; submit(text, voice, speed, deadline) returns a Future
+            or raises RequestRejected. Close it when done.
 
-    def generate_to_file(self, text, output_path, voice="expr-voice-5-m", speed=1.0, sample_rate=24000):
+        Raises:
+            ValueError: If there is no cost model yet (see calibrate()).
+        """
+        from .scheduler import Scheduler
+
+        with self._bound():
+            return Scheduler(self.model, policy=policy, clean_text=clean_text, sample_rate=sample_rate,
+                             max_queue_seconds=max_queue_seconds, slack=slack)
+
+    def synthesis_session(self, voice="expr-voice-5-m", speed=1.0, clean_text=False, sample_rate=24000,
+                          cache_size=1024):
+        """Open a synthesis session for one conversation.
+
+        The session resolves ``voice`` and ``speed`` once and caches
+        normalized text and phonemes across its turns, so repeated phrases
+        only cost inference.
+
+        Returns:
+            kittentts.session.SynthesisSession with say(text) and
+            say_stream(text)
+        """
+        with self._bound():
+            return self.model.synthesis_session(voice=voice, speed=speed, clean_text=clean_text,
+                                                sample_rate=sample_rate, cache_size=cache_size)
+
+    def generate_voices(self, text, voices=None, speeds=1.0, clean_text=False):
+        """Generate the same text in several voices, sharing the text front end.
+
+        Args:
+            text: Input text to synthesize
+            voices: Voice names (default: all available voices)
+            speeds: One speed for all voices, or one per voice
+
+        Returns:
+            dict: Voice name -> audio data as numpy array
+        """
+        if voices is None:
+            voices = self.available_voices
+        with self._bound():
+            return self.model.generate_voices(text, voices=voices, speeds=speeds, clean_text=clean_text)
+
+    def render_script(self, script, pause=0.3, output_path=None, clean_text=False, sample_rate=24000):
+        """Render a multi-speaker script, batching lines across voices.
+
+        Args:
+            script: Iterable of (voice, text) or (voice, text, speed) tuples
+            pause: Seconds of silence between consecutive lines
+            output_path: If given, stream the audio to this file instead of returning it
+            sample_rate: Output sample rate
+
+        Returns:
+            Audio data as numpy array, or None when writing to output_path
+        """
+        with self._bound():
+            return self.model.render_script(script, pause=pause, output_path=output_path, clean_text=clean_text,
+                                            sample_rate=sample_rate)
+
+    def generate_to_file(self, text, output_path, voice="expr-voice-5-m", speed=1.0, sample_rate=24000,
+                         cancel=None, timeout=None):
         """Generate audio from text and save to file.
         
         Args:
@@ -58,32 +322,107 @@ class KittenTTS:
             output_path: Path to save the audio file
             voice: Voice to use for synthesis
             speed: Speech speed (1.0 = normal)
-            sample_rate: Audio sample rate
+            sample_rate: Audio sample rate; the audio is resampled to it
+            cancel: Optional kittentts.CancellationToken to stop synthesis
+            timeout: Optional deadline in seconds
         """
-        return self.model.generate_to_file(text, output_path, voice=voice, speed=speed, sample_rate=sample_rate)
+        with self._bound():
+            return self.model.generate_to_file(text, output_path, voice=voice, speed=speed, sample_rate=sample_rate,
+                                               cancel=cancel, timeout=timeout)
     
+    def render_long(self, text_path, output_path, voice="expr-voice-5-m", speed=1.0, manifest_path=None,
+                    clean_text=True, progress=None):
+        """Render a long text file to disk chunk by chunk with checkpoints.
+
+        Rerunning after an interruption resumes from the last checkpoint.
+        See kittentts.longform.render_long.
+
+        Returns:
+            dict with chunks, frames, audio_seconds, elapsed_seconds and resumed_chunks
+        """
+        from .longform import render_long
+
+        with self._bound():
+            return render_long(self.model, text_path, output_path, voice=voice, speed=speed,
+                               manifest_path=manifest_path, clean_text=clean_text, progress=progress)
+
+    def warmup(self, voices=None, token_lengths=None):
+        """Run dummy inputs so the first real request is not slowed by
+        onnxruntime and espeak initialization. Pass warmup=True to the
+        constructor to run it while loading.
+
+        Returns:
+            dict with "seconds", "runs", "token_lengths" and "voices"
+        """
+        with self._bound():
+            return self.model.warmup(voices=voices, token_lengths=token_lengths)
+
+    @property
+    def is_ready(self):
+        """True once warmup has completed; suitable for readiness checks."""
+        return self.model is not None and self.model.is_ready
+
+    @property
+    def warmup_seconds(self):
+        """Duration of the last warmup, or None if it has not run or the handle is closed."""
+        return self.model.warmup_seconds if self.model is not None else None
+
+    def end_profiling(self):
+        """Stop the onnxruntime profiler and return the per-operator summary.
+
+        Returns:
+            dict: See kittentts.profiling.summarize_profile; the raw trace
+            path is stored under "trace_path".
+        """
+        from .profiling import summarize_profile
+
+        trace_path = self.model.end_profiling()
+        summary = summarize_profile(trace_path)
+        summary["trace_path"] = trace_path
+        return summary
+
+    @property
+    def instrumentation(self):
+        """Instrumentation receiving per-stage timings and counters."""
+        if self._instrumentation is not None:
+            return self._instrumentation
+        return self.model.instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, value):
+        # A shared handle keeps its own; the model is shared with other handles.
+        if self._instrumentation is not None:
+            self._instrumentation = value or NULL_INSTRUMENTATION
+        else:
+            self.model.instrumentation = value or NULL_INSTRUMENTATION
+
     @property
     def available_voices(self):
         """Get list of available voices."""
         return self.model.all_voice_names
 
 
-def download_from_huggingface(repo_id="KittenML/kitten-tts-nano-0.1", cache_dir=None, backend=None):
-    """Download model files from Hugging Face repository.
-    
+def resolve_model_files(repo_id="KittenML/kitten-tts-nano-0.1", cache_dir=None, revision=None):
+    """Locate the config, model and voices files of a model.
+
     Args:
-        repo_id: Hugging Face repository ID
+        repo_id: Hugging Face repository ID, or a local directory laid out
+            like a model repository (config.json plus the files it names)
         cache_dir: Directory to cache downloaded files
-        
+        revision: Hugging Face revision (ignored for local directories)
+
     Returns:
-        KittenTTS_1_Onnx: Instantiated model ready for use
+        Tuple of (config dict, model_path, voices_path)
     """
+    if os.path.isdir(repo_id):
+        def fetch(filename):
+            return os.path.join(repo_id, filename)
+    else:
+        def fetch(filename):
+            return hf_hub_download(repo_id=repo_id, filename=filename, cache_dir=cache_dir, revision=revision)
+
     # Download config file first
-    config_path = hf_hub_download(
-        repo_id=repo_id,
-        filename="config.json",
-        cache_dir=cache_dir
-    )
+    config_path = fetch("config.json")
     
     # Load config
     with open(config_path, 'r') as f:
@@ -93,24 +432,33 @@ def download_from_huggingface(repo_id="KittenML/kitten-tts-nano-0.1", cache_dir=
         raise ValueError("Unsupported model type.")
 
     # Download model and voices files based on config
-    model_path = hf_hub_download(
-        repo_id=repo_id,
-        filename=config["model_file"],
-        cache_dir=cache_dir
-    )
+    model_path = fetch(config["model_file"])
+    voices_path = fetch(config["voices"])
+    return config, model_path, voices_path
+
+
+def download_from_huggingface(repo_id="KittenML/kitten-tts-nano-0.1", cache_dir=None, backend=None, revision=None,
+                              **model_kwargs):
+    """Download model files from Hugging Face repository.
     
-    voices_path = hf_hub_download(
-        repo_id=repo_id,
-        filename=config["voices"],
-        cache_dir=cache_dir
-    )
+    Args:
+        repo_id: Hugging Face repository ID or local model directory
+        cache_dir: Directory to cache downloaded files
+        revision: Hugging Face revision (branch, tag or commit)
+        **model_kwargs: Extra keyword arguments for KittenTTS_1_Onnx
+        
+    Returns:
+        KittenTTS_1_Onnx: Instantiated model ready for use
+    """
+    config, model_path, voices_path = resolve_model_files(repo_id, cache_dir, revision)
     
     # Instantiate and return model
-    model = KittenTTS_1_Onnx(model_path=model_path, voices_path=voices_path, speed_priors=config.get("speed_priors", {}) , voice_aliases=config.get("voice_aliases", {}), backend=backend)
+    model = KittenTTS_1_Onnx(model_path=model_path, voices_path=voices_path, speed_priors=config.get("speed_priors", {}) , voice_aliases=config.get("voice_aliases", {}), backend=backend, **model_kwargs)
     
     return model
 
 
-def get_model(repo_id="KittenML/kitten-tts-nano-0.1", cache_dir=None, backend=None):
+def get_model(repo_id="KittenML/kitten-tts-nano-0.1", cache_dir=None, backend=None, session_options=None,
+              shared=False):
     """Get a KittenTTS model (legacy function for backward compatibility)."""
-    return KittenTTS(repo_id, cache_dir, backend=backend)
+    return KittenTTS(repo_id, cache_dir, backend=backend, session_options=session_options, shared=shared)
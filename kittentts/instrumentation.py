@@ -0,0 +1,250 @@
+"""
+instrumentation.py
+Pluggable per-stage instrumentation for the synthesis pipeline.
+
+The pipeline wraps each stage in ``instrumentation.span(stage)`` and reports
+counters through ``instrumentation.count(name, value)``. The default
+``Instrumentation`` does nothing and hands out a shared no-op span, so the
+cost when disabled is one method call per stage.
+
+Stages: preprocess, chunk, phonemize, tokenize, inference, trim, concat.
+Counters: requests, chunks, tokens, dropped_symbols, audio_seconds.
+"""
+
+import contextvars
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_COUNTER_HELP = {
+    "requests": "Synthesis requests started.",
+    "chunks": "Text chunks synthesized.",
+    "tokens": "Phoneme tokens fed to the model.",
+    "dropped_symbols": "Phoneme symbols dropped because they are not in the vocabulary.",
+    "audio_seconds": "Seconds of audio produced.",
+}
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_owner", "_stage", "_start")
+
+    def __init__(self, owner, stage):
+        self._owner = owner
+        self._stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._owner.on_stage(self._stage, time.perf_counter() - self._start)
+        return False
+
+
+class Instrumentation:
+    """Base instrumentation; every hook is a no-op.
+
+    Subclasses set ``enabled = True`` and override ``on_stage`` and/or
+    ``count``; ``span`` then times the wrapped block and calls ``on_stage``.
+    """
+
+    enabled = False
+
+    def span(self, stage: str):
+        """Context manager timing one pipeline stage."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def on_stage(self, stage: str, seconds: float) -> None:
+        """Called with the wall time of each completed stage."""
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Increment counter ``name`` by ``value``."""
+
+
+NULL_INSTRUMENTATION = Instrumentation()
+
+_bound = contextvars.ContextVar("kittentts_instrumentation", default=None)
+
+
+def bound_instrumentation() -> Optional[Instrumentation]:
+    """Instrumentation bound to the current context by ``bind``, if any."""
+    return _bound.get()
+
+
+@contextmanager
+def bind(instrumentation: Instrumentation):
+    """Report pipeline work in this context to ``instrumentation``.
+
+    Models report to the bound instrumentation in place of their own, so
+    several handles on one shared model each keep their own metrics.
+    """
+    token = _bound.set(instrumentation)
+    try:
+        yield instrumentation
+    finally:
+        _bound.reset(token)
+
+
+def bind_iter(iterable: Iterable, instrumentation: Instrumentation) -> Iterator:
+    """Yield from ``iterable`` with ``instrumentation`` bound while each item is produced."""
+    iterator = iter(iterable)
+    try:
+        while True:
+            with bind(instrumentation):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            with bind(instrumentation):
+                close()
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRecorder(Instrumentation):
+    """Thread-safe counters and per-stage latency histograms.
+
+    Usage:
+        metrics = MetricsRecorder()
+        model = KittenTTS("KittenML/kitten-tts-nano-0.8", instrumentation=metrics)
+        model.generate("Hello there.")
+        print(metrics.to_prometheus())
+    """
+
+    enabled = True
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, namespace: str = "kittentts"):
+        self.buckets = tuple(sorted(buckets))
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, _Histogram] = {}
+
+    def on_stage(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = _Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        """Drop all recorded values."""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> dict:
+        """Return counters and per-stage totals as plain data."""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "stages": {
+                    stage: {"count": h.count, "sum": h.sum}
+                    for stage, h in self.histograms.items()
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        ns = self.namespace
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self.counters):
+                metric = f"{ns}_{name}_total"
+                lines.append(f"# HELP {metric} {_COUNTER_HELP.get(name, name)}")
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {_format_value(self.counters[name])}")
+
+            if self.histograms:
+                metric = f"{ns}_stage_seconds"
+                lines.append(f"# HELP {metric} Wall time spent in each pipeline stage.")
+                lines.append(f"# TYPE {metric} histogram")
+                for stage in sorted(self.histograms):
+                    h = self.histograms[stage]
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets, h.counts):
+                        cumulative += bucket_count
+                        lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                    lines.append(f'{metric}_sum{{stage="{stage}"}} {_format_value(h.sum)}')
+                    lines.append(f'{metric}_count{{stage="{stage}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+
+class StructuredLogInstrumentation(Instrumentation):
+    """Emit one JSON log record per stage and counter update."""
+
+    enabled = True
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.DEBUG):
+        self.logger = logger or logging.getLogger("kittentts.metrics")
+        self.level = level
+
+    def on_stage(self, stage: str, seconds: float) -> None:
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, json.dumps({"event": "stage", "stage": stage, "seconds": seconds}))
+
+    def count(self, name: str, value: float = 1) -> None:
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, json.dumps({"event": "count", "name": name, "value": value}))
+
+
+class MultiInstrumentation(Instrumentation):
+    """Fan hooks out to several instrumentations."""
+
+    enabled = True
+
+    def __init__(self, *instrumentations: Instrumentation):
+        self.instrumentations = [i for i in instrumentations if i.enabled]
+
+    def on_stage(self, stage: str, seconds: float) -> None:
+        for instrumentation in self.instrumentations:
+            instrumentation.on_stage(stage, seconds)
+
+    def count(self, name: str, value: float = 1) -> None:
+        for instrumentation in self.instrumentations:
+            instrumentation.count(name, value)
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
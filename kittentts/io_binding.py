@@ -0,0 +1,163 @@
+"""
+io_binding.py
+Inference through onnxruntime IOBinding with reusable input buffers.
+
+``session.run(None, feeds)`` converts every input into a fresh OrtValue, and
+because ``input_ids`` changes length with every chunk, ORT cannot reuse its
+memory-pattern allocation plans between runs. ``IOBindingRunner`` keeps one
+binding and preallocated input buffers per sequence length and, when token
+buckets are configured, pads ``input_ids`` up to the next bucket so only a
+handful of shapes are ever seen.
+
+Bucketing is off by default because it changes the audio. The exported
+graph has no attention mask, so the model sees the pad tokens. On the
+released checkpoints they affect prosody and duration, not only the
+trailing silence. The runner cuts trailing near-silence after a padded run
+(a heuristic threshold), but it can't undo what padding did to the speech.
+``compare_bucketing`` measures the difference for a model and texts, so
+check it on your voices before turning bucketing on.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import onnxruntime as ort
+
+DEFAULT_TOKEN_BUCKETS = (32, 64, 96, 128, 192, 256, 384, 512)
+
+# The model appends this many samples of tail after the last token; it is
+# removed by KittenTTS_1_Onnx._trim.
+_MODEL_TAIL_SAMPLES = 5000
+_SILENCE_RATIO = 1e-3
+
+
+def bucket_length(length: int, buckets: Optional[Sequence[int]]) -> int:
+    """Smallest bucket that fits ``length`` tokens, or ``length`` itself."""
+    if not buckets:
+        return length
+    index = bisect_left(buckets, length)
+    return buckets[index] if index < len(buckets) else length
+
+
+def strip_padding_silence(waveform: np.ndarray) -> np.ndarray:
+    """Cut trailing near-silence after a padded run.
+
+    Samples below ``_SILENCE_RATIO`` of the peak count as silence. Keeps the
+    model's usual tail after the last audible sample so the regular trim
+    still applies.
+    """
+    magnitude = np.abs(waveform)
+    peak = magnitude.max() if magnitude.size else 0.0
+    if not peak:
+        return waveform
+    if magnitude.ndim > 1:
+        magnitude = magnitude.reshape(-1, magnitude.shape[-1]).max(axis=0)
+    active = np.flatnonzero(magnitude > peak * _SILENCE_RATIO)
+    end = int(active[-1]) + 1 + _MODEL_TAIL_SAMPLES
+    return waveform[..., :end]
+
+
+class _Binding:
+    __slots__ = ("binding", "buffers", "values")
+
+    def __init__(self, binding, buffers, values):
+        self.binding = binding
+        self.buffers = buffers
+        # OrtValues sharing memory with ``buffers``; kept alive with the binding.
+        self.values = values
+
+
+class IOBindingRunner:
+    """Run a session through IOBinding, reusing buffers per input shape.
+
+    Args:
+        session: onnxruntime.InferenceSession
+        token_buckets: Optional sorted sequence of input_ids lengths to pad to
+
+    Runs are serialized with a lock because the bound buffers are shared.
+    """
+
+    def __init__(self, session: ort.InferenceSession, token_buckets: Optional[Sequence[int]] = None):
+        self.session = session
+        self.token_buckets = sorted(token_buckets) if token_buckets else None
+        self.output_names: List[str] = [output.name for output in session.get_outputs()]
+        self._bindings: Dict[int, _Binding] = {}
+        self._lock = threading.Lock()
+
+    def _binding_for(self, length: int, feeds: Dict[str, np.ndarray]) -> _Binding:
+        entry = self._bindings.get(length)
+        if entry is None:
+            binding = self.session.io_binding()
+            buffers = {}
+            values = {}
+            for name, value in feeds.items():
+                shape = (value.shape[0], length) if name == "input_ids" else value.shape
+                buffers[name] = np.zeros(shape, dtype=value.dtype)
+                values[name] = ort.OrtValue.ortvalue_from_numpy(buffers[name])
+                binding.bind_ortvalue_input(name, values[name])
+            for name in self.output_names:
+                binding.bind_output(name, "cpu")
+            entry = self._bindings[length] = _Binding(binding, buffers, values)
+        return entry
+
+    def run(self, feeds: Dict[str, np.ndarray], run_options: Optional[ort.RunOptions] = None) -> List[np.ndarray]:
+        """Equivalent of ``session.run(None, feeds, run_options)``."""
+        tokens = feeds["input_ids"].shape[-1]
+        length = bucket_length(tokens, self.token_buckets)
+        with self._lock:
+            entry = self._binding_for(length, feeds)
+            for name, value in feeds.items():
+                buffer = entry.buffers[name]
+                if name == "input_ids":
+                    buffer[:, :tokens] = value
+                    buffer[:, tokens:] = 0
+                else:
+                    buffer[...] = value
+            self.session.run_with_iobinding(entry.binding, run_options)
+            outputs = entry.binding.copy_outputs_to_cpu()
+
+        if length != tokens:
+            outputs[0] = strip_padding_silence(outputs[0])
+        return outputs
+
+
+def compare_bucketing(model, texts: Sequence[str], voice: str = "expr-voice-5-m",
+                      token_buckets: Sequence[int] = DEFAULT_TOKEN_BUCKETS) -> List[dict]:
+    """Synthesize each text as one chunk with and without bucket padding.
+
+    Both runs use the model's session; the model itself is not changed.
+
+    Args:
+        model: KittenTTS_1_Onnx
+        texts: Normalized single-chunk texts
+        voice: Voice name or alias
+        token_buckets: Buckets to pad to
+
+    Returns:
+        One dict per text: "tokens", "bucket", "seconds" and "padded_seconds"
+        (durations after trimming), "duration_change" (relative) and
+        "correlation" of the two waveforms over their common length.
+    """
+    from .onnx_model import SAMPLE_RATE
+
+    runner = IOBindingRunner(model.session, token_buckets)
+    voice, speed = model._resolve_voice(voice)
+    rows = []
+    for text in texts:
+        input_ids = model._encode_chunk(text)
+        feeds = model._style_inputs(text, input_ids, voice, speed)
+        plain = model._trim(model.session.run(None, feeds)).reshape(-1)
+        padded = model._trim(runner.run(feeds)).reshape(-1)
+        common = min(plain.shape[0], padded.shape[0])
+        correlation = float(np.corrcoef(plain[:common], padded[:common])[0, 1]) if common > 1 else 1.0
+        rows.append({
+            "tokens": input_ids.shape[-1],
+            "bucket": bucket_length(input_ids.shape[-1], runner.token_buckets),
+            "seconds": plain.shape[0] / SAMPLE_RATE,
+            "padded_seconds": padded.shape[0] / SAMPLE_RATE,
+            "duration_change": padded.shape[0] / max(plain.shape[0], 1) - 1,
+            "correlation": correlation,
+        })
+    return rows
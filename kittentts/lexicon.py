@@ -0,0 +1,264 @@
+"""
+lexicon.py
+Word-level pronunciation lexicon consulted before espeak.
+
+Most traffic uses a small vocabulary, yet every chunk pays for a trip
+through espeak and phonemizer's punctuation handling. ``Lexicon`` stores the
+pronunciations espeak produced for common words, and ``LexiconPhonemizer``
+looks words up there first and only calls espeak for the rest.
+
+The output matches what the current pipeline sees:
+
+* Text is split at phonemizer's punctuation marks, which phonemizer also
+  phonemizes as independent lines. The marks themselves are passed through,
+  and tokenization makes the spacing around them irrelevant.
+* espeak's stress and reductions depend on context ("the" before a vowel,
+  "on the" merged into one word, stressed citation forms for a word that
+  stands alone). ``build_lexicon`` therefore records a word only if it got
+  the same pronunciation in every phrase it was seen in, keeps words that
+  made up a whole segment apart, and remembers word pairs espeak merged. A
+  segment is served from the lexicon only if every word in it is known and
+  it contains no merged pair; otherwise the whole segment goes to espeak, so
+  its words keep their context.
+* Segments containing anything but letters, apostrophes and spaces (digits,
+  hyphens, symbols) and all-caps words (which espeak may spell out) always
+  go to espeak unchanged.
+
+The mapping is not exact for contexts the lexicon never saw;
+``lexicon_fidelity`` measures agreement with espeak on a given text set.
+"""
+
+import json
+import re
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+from phonemizer.punctuation import Punctuation
+
+
+def _mark_run_re() -> Pattern:
+    """Runs of phonemizer's punctuation marks and surrounding whitespace.
+
+    Built from the public ``Punctuation.marks`` string so segments split
+    exactly where phonemizer splits. Phonemizer versions that keep decimal
+    separators between digits (so "1,5" is read as one number) are
+    detected through ``preserve`` and followed.
+    """
+    marks = Punctuation(Punctuation.default_marks()).marks
+    alternatives = []
+    keeps_decimals = Punctuation(",").preserve("1,5")[0] == ["1,5"]
+    decimals = "".join(mark for mark in ",." if mark in marks) if keeps_decimals else ""
+    others = "".join(sorted(mark for mark in marks if mark not in decimals))
+    if others:
+        alternatives.append(f"[{re.escape(others)}]")
+    if decimals:
+        alternatives.append(f"(?<![0-9])[{re.escape(decimals)}]")
+        alternatives.append(f"[{re.escape(decimals)}](?![0-9])")
+    return re.compile(rf"(\s*(?:{'|'.join(alternatives)})+\s*)+")
+
+
+_MARK_RUN = _mark_run_re()
+_PLAIN_SEGMENT = re.compile(r"^[^\W\d_]+(?:'[^\W\d_]+)*(?:\s+[^\W\d_]+(?:'[^\W\d_]+)*)*$")
+
+FORMAT_VERSION = 1
+
+
+def _key(word: str) -> Optional[str]:
+    """Lexicon key of a word, or None for words that must go to espeak."""
+    if len(word) > 1 and word.isupper():
+        return None
+    return word.lower()
+
+
+def split_segments(text: str) -> List[Tuple[str, str]]:
+    """Split text into (segment, following punctuation marks) pairs."""
+    pieces = []
+    position = 0
+    for match in _MARK_RUN.finditer(text):
+        pieces.append((text[position:match.start()].strip(), match.group().strip()))
+        position = match.end()
+    pieces.append((text[position:].strip(), ""))
+    return [(segment, marks) for segment, marks in pieces if segment or marks]
+
+
+class Lexicon:
+    """Word -> phoneme string mapping with the espeak settings it came from.
+
+    Args:
+        entries: Dict of lower-case word to phonemes inside a phrase
+        language: espeak language the entries were produced with
+        isolated: Dict of lower-case word to phonemes when the word makes up a
+            whole segment, where espeak uses the stressed citation form
+        merged: Adjacent word pairs ("in the") that espeak pronounces as one
+            word; segments containing them go to espeak
+    """
+
+    def __init__(self, entries: Dict[str, str], language: str = "en-us", isolated: Optional[Dict[str, str]] = None,
+                 merged: Iterable[str] = ()):
+        self.entries = entries
+        self.isolated = isolated or {}
+        self.merged = set(merged)
+        self.language = language
+
+    def __len__(self) -> int:
+        return len(self.entries) + len(self.isolated)
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"version": FORMAT_VERSION, "language": self.language, "entries": self.entries,
+                       "isolated": self.isolated, "merged": sorted(self.merged)}, f, ensure_ascii=False, indent=0, sort_keys=True)
+
+    @classmethod
+    def load(cls, path: str) -> "Lexicon":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported lexicon version {data.get('version')}")
+        return cls(data["entries"], data.get("language", "en-us"), data.get("isolated"), data.get("merged", ()))
+
+
+def build_lexicon(texts: Iterable[str], phonemize: Callable[[List[str]], List[str]], top: Optional[int] = None,
+                  min_count: int = 2, language: str = "en-us") -> Lexicon:
+    """Build a lexicon from espeak's in-context output over a corpus.
+
+    Args:
+        texts: Corpus texts (normalized the way they will be at run time)
+        phonemize: Function phonemizing a list of lines, e.g.
+            EspeakBackend(...).phonemize
+        top: Keep only the N most frequent words
+        min_count: Minimum number of times a word must have been seen; with
+            fewer observations a context-dependent word may look stable
+        language: espeak language, stored with the lexicon
+
+    Only words whose pronunciation never varied across their contexts are
+    kept, separately for words inside phrases and for single-word segments.
+    Segments where espeak merged words are not used for the entries; instead
+    the merged pair is found by matching known entries against espeak's
+    output, and if none matches every pair in the segment is treated as
+    merged.
+    """
+    segments = [segment for text in texts for segment, _ in split_segments(text)
+                if segment and _PLAIN_SEGMENT.match(segment)]
+    seen = defaultdict(Counter)
+    seen_isolated = defaultdict(Counter)
+    unaligned = []
+    for segment, output in zip(segments, phonemize(segments) if segments else []):
+        words, phonemes = segment.split(), output.split()
+        if len(words) != len(phonemes):
+            unaligned.append(([_key(word) for word in words], set(phonemes)))
+            continue
+        target = seen_isolated if len(words) == 1 else seen
+        for word, pronunciation in zip(words, phonemes):
+            key = _key(word)
+            if key is not None:
+                target[key][pronunciation] += 1
+
+    def stable(counts):
+        kept = {word: variants for word, variants in counts.items()
+                if len(variants) == 1 and sum(variants.values()) >= min_count}
+        ranked = sorted(kept, key=lambda word: -sum(kept[word].values()))
+        return {word: next(iter(kept[word])) for word in ranked[:top]}
+
+    entries = stable(seen)
+    merged = set()
+    for keys, phonemes in unaligned:
+        pairs = [(first, second) for first, second in zip(keys, keys[1:]) if first and second]
+        found = {pair for pair in pairs
+                 if pair[0] in entries and pair[1] in entries and entries[pair[0]] + entries[pair[1]] in phonemes}
+        merged.update(" ".join(pair) for pair in (found or pairs))
+    return Lexicon(entries, language, stable(seen_isolated), merged)
+
+
+class LexiconPhonemizer:
+    """Drop-in for EspeakBackend.phonemize that consults a lexicon first.
+
+    A punctuation-delimited segment whose words are all in the lexicon is
+    composed from it; any other segment goes to espeak whole, so its words
+    keep their context. ``hits`` and ``misses`` count segments.
+
+    Args:
+        lexicon: Lexicon instance
+        backend: The espeak backend used for everything not in the lexicon
+    """
+
+    def __init__(self, lexicon: Lexicon, backend):
+        self.lexicon = lexicon
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, segment: str) -> Optional[str]:
+        """Phonemes of a segment composed from the lexicon, or None."""
+        words = segment.split()
+        if not _PLAIN_SEGMENT.match(segment):
+            return None
+        entries = self.lexicon.entries if len(words) > 1 else self.lexicon.isolated
+        keys = [_key(word) for word in words]
+        if any(f"{first} {second}" in self.lexicon.merged for first, second in zip(keys, keys[1:])):
+            return None
+        pronunciations = []
+        for key in keys:
+            pronunciation = entries.get(key) if key is not None else None
+            if pronunciation is None:
+                return None
+            pronunciations.append(pronunciation)
+        return " ".join(pronunciations)
+
+    def phonemize(self, texts: Sequence[str]) -> List[str]:
+        """Phonemize texts like EspeakBackend.phonemize with the pipeline's settings."""
+        plans = []
+        misses = []
+        segments = 0
+        for text in texts:
+            pieces = []
+            for segment, marks in split_segments(text):
+                if segment:
+                    segments += 1
+                    phonemes = self._lookup(segment)
+                    if phonemes is None:
+                        misses.append(" ".join(segment.split()))
+                    pieces.append(phonemes)
+                if marks:
+                    pieces.append(marks)
+            plans.append(pieces)
+        self.misses += len(misses)
+        self.hits += segments - len(misses)
+
+        # One espeak call for all segments the lexicon could not serve. espeak
+        # occasionally returns extra lines for a segment; the texts then go
+        # to espeak whole, exactly as without a lexicon.
+        results = self.backend.phonemize(misses) if misses else []
+        if len(results) != len(misses):
+            return [self.backend.phonemize([text])[0] for text in texts]
+        results = iter(results)
+        return [" ".join(piece if piece is not None else next(results).strip() for piece in pieces)
+                for pieces in plans]
+
+
+def lexicon_fidelity(texts: Iterable[str], lexicon: Lexicon, backend, tokenizer=None) -> dict:
+    """Compare lexicon-first phonemization against espeak alone.
+
+    Outputs are compared after tokenization, i.e. on the token IDs the model
+    would receive.
+
+    Returns:
+        dict with texts, exact (texts with identical token IDs), exact_rate
+        and hit_rate (share of segments served from the lexicon)
+    """
+    from .tokenizer import PhonemeTokenizer
+
+    tokenizer = tokenizer or PhonemeTokenizer()
+    texts = list(texts)
+    reference = backend.phonemize(texts)
+    fast = LexiconPhonemizer(lexicon, backend)
+    candidate = fast.phonemize(texts)
+    exact = sum(
+        tokenizer.encode(a).tolist() == tokenizer.encode(b).tolist() for a, b in zip(reference, candidate)
+    )
+    segments = fast.hits + fast.misses
+    return {
+        "texts": len(texts),
+        "exact": exact,
+        "exact_rate": exact / len(texts) if texts else 1.0,
+        "hit_rate": fast.hits / segments if segments else 0.0,
+    }
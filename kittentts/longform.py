@@ -0,0 +1,184 @@
+"""
+longform.py
+Resumable rendering of long documents (audiobooks) straight to disk.
+
+``render_long`` memory-maps the input file and walks it in blocks of about
+``block_bytes`` that end at paragraph or sentence boundaries. Each block is
+chunked as usual and every chunk's audio is appended to the output file as
+soon as it is synthesized, so memory stays bounded by one block of text and
+a few chunks of audio whatever the document size.
+
+After every chunk a small JSON manifest records the byte offset of the
+current block, the chunks completed so far and the number of audio frames
+written. Running the same command again after a crash truncates the output
+to the last checkpoint and continues from there. The output must be a format
+soundfile can reopen for writing, such as WAV.
+"""
+
+import json
+import mmap
+import os
+import time
+from typing import Callable, Iterator, Optional, Tuple
+
+import soundfile as sf
+
+DEFAULT_BLOCK_BYTES = 64 * 1024
+MANIFEST_VERSION = 1
+
+# Preferred block boundaries, best first.
+_SEPARATORS = (b"\n\n", b"\n", b". ", b" ")
+
+# Manifest fields that must match for a rerun to resume.
+_IDENTITY_FIELDS = ("source_size", "voice", "speed", "clean_text", "block_bytes", "sample_rate")
+
+
+def iter_blocks(data, start: int = 0, block_bytes: int = DEFAULT_BLOCK_BYTES) -> Iterator[Tuple[int, int, str]]:
+    """Split UTF-8 bytes (e.g. an mmap) into text blocks at natural boundaries.
+
+    Yields:
+        Tuples of (start offset, end offset, decoded text)
+    """
+    size = len(data)
+    position = start
+    while position < size:
+        end = min(position + block_bytes, size)
+        if end < size:
+            for separator in _SEPARATORS:
+                cut = data.rfind(separator, position, end)
+                if cut > position:
+                    end = cut + len(separator)
+                    break
+            else:
+                # No boundary at all: cut at a character start.
+                while end > position + 1 and data[end] & 0xC0 == 0x80:
+                    end -= 1
+        yield position, end, data[position:end].decode("utf-8", errors="replace")
+        position = end
+
+
+def _write_manifest(path: str, manifest: dict) -> None:
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temporary, path)
+
+
+def _load_manifest(path: str, identity: dict) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    mismatched = [name for name in _IDENTITY_FIELDS if manifest.get(name) != identity[name]]
+    if manifest.get("version") != MANIFEST_VERSION or mismatched:
+        raise ValueError(f"Checkpoint {path} was written for different settings ({', '.join(mismatched)}); "
+                         "delete it to start over")
+    return manifest
+
+
+def render_long(model, text_path: str, output_path: str, voice: str = "expr-voice-5-m", speed: float = 1.0,
+                manifest_path: Optional[str] = None, clean_text: bool = True,
+                block_bytes: int = DEFAULT_BLOCK_BYTES, progress: Optional[Callable[[dict], None]] = None) -> dict:
+    """Render a UTF-8 text file to an audio file, resuming from a checkpoint.
+
+    Args:
+        model: KittenTTS_1_Onnx instance
+        text_path: Input text file; it is memory-mapped, not read into memory
+        output_path: Output audio file (WAV recommended)
+        voice: Voice to use for synthesis
+        speed: Speech speed (1.0 = normal)
+        manifest_path: Checkpoint file (default: output_path + ".manifest.json")
+        clean_text: If true, it will cleanup the text. Eg. replace numbers with words.
+        block_bytes: Approximate size of the text blocks read at a time
+        progress: Called after every chunk with a dict of chunks, bytes_done,
+            bytes_total, audio_seconds, elapsed_seconds, rtf and eta_seconds
+            (estimated from the RTF and audio per byte measured in this run)
+
+    Returns:
+        dict with chunks, frames, audio_seconds, elapsed_seconds and
+        resumed_chunks (chunks skipped thanks to the checkpoint)
+    """
+    from .onnx_model import SAMPLE_RATE
+
+    manifest_path = manifest_path or output_path + ".manifest.json"
+    identity = {
+        "source_size": os.path.getsize(text_path),
+        "voice": voice,
+        "speed": speed,
+        "clean_text": clean_text,
+        "block_bytes": block_bytes,
+        "sample_rate": SAMPLE_RATE,
+    }
+    manifest = _load_manifest(manifest_path, identity) if os.path.exists(output_path) else None
+    if manifest is None:
+        manifest = dict(identity, version=MANIFEST_VERSION, source=os.path.abspath(text_path),
+                        offset=0, block_chunks=0, chunks=0, frames=0, done=False)
+    resumed_chunks = manifest["chunks"]
+    start = time.perf_counter()
+
+    def summary():
+        return {
+            "chunks": manifest["chunks"],
+            "frames": manifest["frames"],
+            "audio_seconds": manifest["frames"] / SAMPLE_RATE,
+            "elapsed_seconds": time.perf_counter() - start,
+            "resumed_chunks": resumed_chunks,
+        }
+
+    if manifest["done"]:
+        return summary()
+
+    total = identity["source_size"]
+    if resumed_chunks:
+        output = sf.SoundFile(output_path, "r+")
+        output.truncate(manifest["frames"])
+        output.seek(manifest["frames"])
+    else:
+        output = sf.SoundFile(output_path, "w", samplerate=SAMPLE_RATE, channels=1)
+
+    first_offset = manifest["offset"]
+    frames_this_run = 0
+    try:
+        with open(text_path, "rb") as f, \
+                (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if total else memoryview(b"")) as data:
+            for block_start, block_end, block in iter_blocks(data, manifest["offset"], block_bytes):
+                chunks = model._chunks(block, clean_text)
+                skip = manifest["block_chunks"] if block_start == manifest["offset"] else 0
+                manifest.update(offset=block_start, block_chunks=skip)
+                chunk_chars = [len(chunk) for chunk in chunks]
+                block_chars = max(sum(chunk_chars), 1)
+                chars_done = sum(chunk_chars[:skip])
+
+                for index, audio in enumerate(model._synthesize_chunks(chunks[skip:], voice, speed), skip):
+                    audio = audio.reshape(-1)
+                    output.write(audio)
+                    output.flush()
+                    frames_this_run += audio.shape[0]
+                    manifest["block_chunks"] = index + 1
+                    manifest["chunks"] += 1
+                    manifest["frames"] += audio.shape[0]
+                    _write_manifest(manifest_path, manifest)
+                    chars_done += chunk_chars[index]
+
+                    if progress is not None:
+                        done_fraction = chars_done / block_chars
+                        bytes_done = block_start + done_fraction * (block_end - block_start)
+                        elapsed = time.perf_counter() - start
+                        audio_this_run = frames_this_run / SAMPLE_RATE
+                        bytes_this_run = max(bytes_done - first_offset, 1)
+                        rtf = elapsed / audio_this_run if audio_this_run else None
+                        eta = ((total - bytes_done) * audio_this_run / bytes_this_run * rtf) if rtf else None
+                        progress({
+                            "chunks": manifest["chunks"],
+                            "bytes_done": int(bytes_done),
+                            "bytes_total": total,
+                            "audio_seconds": manifest["frames"] / SAMPLE_RATE,
+                            "elapsed_seconds": elapsed,
+                            "rtf": rtf,
+                            "eta_seconds": eta,
+                        })
+            manifest.update(offset=total, block_chunks=0, done=True)
+            _write_manifest(manifest_path, manifest)
+    finally:
+        output.close()
+    return summary()
@@ -0,0 +1,156 @@
+"""
+memory.py
+Bounded memory for long-running synthesis processes.
+
+onnxruntime's CPU arena grows to fit the largest run it has seen and keeps
+that memory for the life of the session. One long chunk can therefore
+permanently raise a server worker's RSS. KittenTTS_1_Onnx exposes three
+controls:
+
+* ``arena_shrinkage=True`` passes the ``memory.enable_memory_arena_shrinkage``
+  run option, so the arena returns what a run allocated beyond its initial
+  region when the run ends. The arena frees into the C heap, which keeps
+  the pages, so each request also ends with ``trim_heap``.
+* ``arena_max_mb=N`` backs the session with a shared CPU arena capped at N
+  MiB (``register_arena``). The arena grows only by what each allocation
+  needs. A run that needs more memory fails instead of growing the process.
+  onnxruntime registers such an arena once per process, so every model
+  using it shares the one cap.
+* ``max_tokens_per_run=N`` makes the chunker keep every chunk within N
+  input IDs, counted exactly (kittentts.preprocess.chunk_by_tokens). This
+  bounds the memory a single run can ask for.
+
+``soak`` runs thousands of mixed-length requests and samples RSS to check
+that memory reaches a steady state (``kittentts bench --soak``).
+"""
+
+import logging
+import os
+import random
+import statistics
+import threading
+import time
+from typing import Callable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+SHRINKAGE_CONFIG_KEY = "memory.enable_memory_arena_shrinkage"
+SHRINKAGE_DEVICES = "cpu:0"
+ENV_ALLOCATORS_CONFIG_KEY = "session.use_env_allocators"
+
+# Request sizes (characters) drawn by soak(): mostly chat turns, some pages.
+SOAK_SIZES = (20, 60, 150, 400, 1200, 3000)
+SOAK_WEIGHTS = (30, 30, 20, 10, 7, 3)
+
+_arena_lock = threading.Lock()
+_arena_max_bytes = None
+_malloc_trim = None
+
+
+def register_arena(max_mb: float) -> None:
+    """Register the process-wide CPU arena capped at ``max_mb`` MiB.
+
+    Sessions opt in with the ``session.use_env_allocators`` config entry.
+    Registering the same cap again is a no-op.
+
+    Raises:
+        ValueError: If a different cap was registered earlier in this process.
+    """
+    import onnxruntime as ort
+
+    global _arena_max_bytes
+    max_bytes = int(max_mb * 1024 * 1024)
+    with _arena_lock:
+        if _arena_max_bytes is not None:
+            if _arena_max_bytes != max_bytes:
+                raise ValueError(f"A CPU arena capped at {_arena_max_bytes / 2 ** 20:g} MiB is already "
+                                 f"registered in this process; it can't be changed to {max_mb:g} MiB")
+            return
+        memory_info = ort.OrtMemoryInfo("Cpu", ort.OrtAllocatorType.ORT_ARENA_ALLOCATOR, 0, ort.OrtMemType.DEFAULT)
+        # Strategy 1 (kSameAsRequested) grows by what each allocation needs, not in doubling steps.
+        ort.create_and_register_allocator(memory_info, ort.OrtArenaCfg({"max_mem": max_bytes,
+                                                                         "arena_extend_strategy": 1}))
+        _arena_max_bytes = max_bytes
+        logger.info("Registered a shared CPU arena capped at %g MiB", max_mb)
+
+
+def trim_heap() -> bool:
+    """Return free C heap pages to the OS (glibc ``malloc_trim``).
+
+    Returns:
+        False where the C library has no malloc_trim, True otherwise.
+    """
+    global _malloc_trim
+    if _malloc_trim is None:
+        import ctypes
+
+        try:
+            _malloc_trim = ctypes.CDLL(None).malloc_trim
+        except (AttributeError, OSError):
+            _malloc_trim = False
+    if not _malloc_trim:
+        return False
+    _malloc_trim(0)
+    return True
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident set size of this process in MiB, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def soak(model, requests: int = 2000, voice: Optional[str] = None, sizes: Sequence[int] = SOAK_SIZES,
+         weights: Sequence[float] = SOAK_WEIGHTS, sample_every: int = 50, seed: int = 0,
+         log: Optional[Callable[[str], None]] = None) -> dict:
+    """Run mixed-length requests through ``model.generate`` and sample RSS.
+
+    Request texts are benchmark-corpus documents whose sizes are drawn from
+    ``sizes`` with ``weights``, in a fixed pseudo-random order.
+
+    Args:
+        model: KittenTTS_1_Onnx
+        requests: Number of requests
+        voice: Voice to use (default: the first voice)
+        sample_every: Requests between RSS samples
+        seed: Seed of the size sequence
+        log: Optional callable receiving one line per sample
+
+    Returns:
+        dict with "requests", "seconds", "samples" (list of [request, rss_mb]),
+        "start_rss_mb", "peak_rss_mb", "steady_rss_mb" (median of the second
+        half of the samples) and "growth_mb" (last sample minus the median of
+        the first half; near zero once memory is steady).
+    """
+    from .textbench import corpus_text
+
+    voice = voice or (list(model.voice_aliases) or list(model.available_voices))[0]
+    texts = {size: corpus_text(size) for size in sizes}
+    order = random.Random(seed).choices(list(sizes), weights=weights, k=requests)
+
+    samples = []
+    start_rss = rss_mb()
+    start = time.perf_counter()
+    for index, size in enumerate(order, 1):
+        model.generate(texts[size], voice=voice)
+        if index % sample_every == 0 or index == requests:
+            current = rss_mb()
+            samples.append([index, current])
+            if log:
+                log(f"{index}/{requests} requests: rss=" + ("unavailable" if current is None else f"{current:.1f} MiB"))
+
+    rss = [value for _, value in samples if value is not None]
+    first, second = rss[:len(rss) // 2] or rss, rss[len(rss) // 2:]
+    return {
+        "requests": requests,
+        "seconds": time.perf_counter() - start,
+        "samples": samples,
+        "start_rss_mb": start_rss,
+        "peak_rss_mb": max(rss) if rss else None,
+        "steady_rss_mb": statistics.median(second) if second else None,
+        "growth_mb": rss[-1] - statistics.median(first) if rss else None,
+    }
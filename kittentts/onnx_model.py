@@ -1,4 +1,7 @@
+import logging
 import os
+import tempfile
+import time
 import espeakng_loader
 from phonemizer.backend.espeak.wrapper import EspeakWrapper
 EspeakWrapper.set_library(espeakng_loader.get_library_path())
@@ -7,49 +10,101 @@ import numpy as np
 import phonemizer
 import soundfile as sf
 import onnxruntime as ort
-from .preprocess import TextPreprocessor, chunk_text, normalize_text
-
-def basic_english_tokenize(text):
-    """Basic English tokenizer that splits on whitespace and punctuation."""
-    import re
-    tokens = re.findall(r"\w+|[^\w\s]", text)
-    return tokens
-
-class TextCleaner:
-    def __init__(self, dummy=None):
-        _pad = "$"
-        _punctuation = ';:,.!?¡¿—…"«»"" '
-        _letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
-        _letters_ipa = "ɑɐɒæɓʙβɔɕçɗɖðʤəɘɚɛɜɝɞɟʄɡɠɢʛɦɧħɥʜɨɪʝɭɬɫɮʟɱɯɰŋɳɲɴøɵɸθœɶʘɹɺɾɻʀʁɽʂʃʈʧʉʊʋⱱʌɣɤʍχʎʏʑʐʒʔʡʕʢǀǁǂǃˈˌːˑʼʴʰʱʲʷˠˤ˞↓↑→↗↘'̩'ᵻ"
-
-        symbols = [_pad] + list(_punctuation) + list(_letters) + list(_letters_ipa)
-        
-        dicts = {}
-        for i in range(len(symbols)):
-            dicts[symbols[i]] = i
+from onnxruntime.capi.onnxruntime_pybind11_state import Fail, InvalidArgument, RuntimeException
+from .cancellation import SynthesisCancelled, as_token
+from .instrumentation import NULL_INSTRUMENTATION, bind, bind_iter, bound_instrumentation
+from .io_binding import DEFAULT_TOKEN_BUCKETS, IOBindingRunner
+from .tokenizer import END_ID, FRAMING_TOKENS, PAD_ID, PhonemeTokenizer
+from .preprocess import (DEFAULT_TOKEN_BUDGET, MIN_TOKEN_BUDGET, TextPreprocessor, chunk_by_tokens, chunk_text,
+                         normalize_text)
 
-        self.word_index_dictionary = dicts
+logger = logging.getLogger(__name__)
 
-    def __call__(self, text):
-        indexes = []
-        for char in text:
-            try:
-                indexes.append(self.word_index_dictionary[char])
-            except KeyError:
-                pass
-        return indexes
+SAMPLE_RATE = 24000
+AVAILABLE_VOICES = [
+    'expr-voice-2-m', 'expr-voice-2-f', 'expr-voice-3-m', 'expr-voice-3-f',
+    'expr-voice-4-m', 'expr-voice-4-f', 'expr-voice-5-m', 'expr-voice-5-f'
+]
+VOICE_NAMES = ['Bella', 'Jasper', 'Luna', 'Bruno', 'Rosie', 'Hugo', 'Kiki', 'Leo']
+
+# Token lengths warmed up when the model is not bucketed: short, typical and
+# close to the longest chunk chunk_text produces.
+WARMUP_TOKEN_LENGTHS = (32, 128, 384)
+_WARMUP_TEXT = "The quick brown fox jumps over the lazy dog, and then it runs away."
+
+# Errors raised by session.run for inputs the graph cannot handle.
+_ORT_RUN_ERRORS = (RuntimeError, ValueError, Fail, InvalidArgument, RuntimeException)
+
+
+def espeak_backend(language: str = "en-us"):
+    """The espeak phonemizer backend with the settings the models were trained with."""
+    return phonemizer.backend.EspeakBackend(language=language, preserve_punctuation=True, with_stress=True)
+
+
+def _audio_seconds(chunks) -> float:
+    return sum(chunk.shape[-1] for chunk in chunks) / SAMPLE_RATE
 
 
 class KittenTTS_1_Onnx:
-    def __init__(self, model_path="kitten_tts_nano_preview.onnx", voices_path="voices.npz", speed_priors={}, voice_aliases={}, backend=None):
+    def __init__(self, model_path="kitten_tts_nano_preview.onnx", voices_path="voices.npz", speed_priors={}, voice_aliases={}, backend=None,
+                 session_options=None, instrumentation=None, enable_profiling=False,
+                 io_binding=False, token_buckets=None, parallel=None, warmup=False, lexicon=None,
+                 frontend_workers=None, session_config=None, cost_model=None, token_budget=None,
+                 exact_tokens=False, arena_shrinkage=False, arena_max_mb=None, max_tokens_per_run=None,
+                 chunk_chars=400):
         """Initialize KittenTTS with model and voice data.
         
         Args:
             model_path: Path to the ONNX model file
-            voices_path: Path to the voices NPZ file
+            voices_path: Path to the voices NPZ file, or a dict of voice arrays
+            session_options: Optional dict of onnxruntime.SessionOptions attributes,
+                e.g. {"intra_op_num_threads": 2}
+            instrumentation: Optional kittentts.instrumentation.Instrumentation
+                receiving per-stage timings and counters
+            enable_profiling: Enable the onnxruntime profiler for this session;
+                call end_profiling() to write the trace
+            io_binding: Run inference through IOBinding with reusable input buffers
+            token_buckets: Pad input_ids up to these lengths so ORT can reuse
+                allocation plans (True selects DEFAULT_TOKEN_BUCKETS); implies
+                io_binding. Off by default: the model sees the pad tokens, which
+                can change prosody and duration (see
+                kittentts.io_binding.compare_bucketing)
+            parallel: Synthesize the chunks of one text concurrently on several
+                sessions: "auto" (lanes and threads from the core count), a
+                number of lanes, or a (lanes, threads) tuple such as
+                kittentts.parallel.plan_lanes(results=benchmark_results)
+            warmup: Run warmup() before returning
+            lexicon: kittentts.lexicon.Lexicon, or a path to one, consulted
+                before espeak
+            frontend_workers: Run normalization, chunking and phonemization
+                in this many worker processes (kittentts.frontend.FrontendPool),
+                started on first use
+            session_config: Optional dict of onnxruntime session config
+                entries, e.g. {"session.disable_prepacking": "1"}
+            cost_model: kittentts.cost.CostModel, or a path to one, used by
+                estimate() and the scheduler; without one, call calibrate()
+            token_budget: Chunk by phoneme tokens instead of characters:
+                pack sentences into chunks of at most this many input IDs
+                (True selects DEFAULT_TOKEN_BUDGET); see chunk_by_tokens
+            exact_tokens: With token_budget, count tokens by phonemizing
+                candidate segments instead of estimating them, and recount
+                packed chunks so none exceeds the budget
+            arena_shrinkage: Return CPU arena memory grown during a run
+                when the run ends, and trim the C heap after each request
+                (see kittentts.memory)
+            arena_max_mb: Back the session with the process-wide CPU arena
+                capped at this many MiB; runs needing more fail
+            max_tokens_per_run: Hard cap on input IDs per inference run,
+                enforced by exact token-budget chunking
+            chunk_chars: Longest sentence kept whole by character chunking
+                (without token_budget); longer ones are split between words
+
+        Raises:
+            ValueError: If token_budget or max_tokens_per_run is below
+                MIN_TOKEN_BUDGET.
         """
         self.model_path = model_path
-        self.voices = np.load(voices_path) 
+        self.voices = voices_path if isinstance(voices_path, dict) else np.load(voices_path)
         providers = []
         if backend == "cuda":
             providers = ["CUDAExecutionProvider"]
@@ -62,26 +117,85 @@ class KittenTTS_1_Onnx:
         else:
             raise ValueError("Unsupported backend")
         
-        self.session = ort.InferenceSession(model_path, providers=providers)
+        sess_options = ort.SessionOptions()
+        for name, value in (session_options or {}).items():
+            if not hasattr(sess_options, name):
+                raise ValueError(f"Unknown session option '{name}'")
+            setattr(sess_options, name, value)
+        session_config = dict(session_config or {})
+        if arena_max_mb is not None:
+            from .memory import ENV_ALLOCATORS_CONFIG_KEY, register_arena
+
+            register_arena(arena_max_mb)
+            session_config[ENV_ALLOCATORS_CONFIG_KEY] = "1"
+        for key, value in session_config.items():
+            sess_options.add_session_config_entry(key, str(value))
+        if enable_profiling:
+            sess_options.enable_profiling = True
+            if "profile_file_prefix" not in (session_options or {}):
+                sess_options.profile_file_prefix = os.path.join(tempfile.gettempdir(), "kittentts_profile")
+
+        self.session = ort.InferenceSession(model_path, sess_options=sess_options, providers=providers)
+        self._providers = providers
+        self._session_options = dict(session_options or {})
+        self._session_config = session_config
+        self._parallel = parallel
+        self._lanes = None
+        if token_buckets is True:
+            token_buckets = DEFAULT_TOKEN_BUCKETS
+        self._runner = IOBindingRunner(self.session, token_buckets) if io_binding or token_buckets else None
         
-        self.phonemizer = phonemizer.backend.EspeakBackend(
-            language="en-us", preserve_punctuation=True, with_stress=True
-        )
-        self.text_cleaner = TextCleaner()
+        self.phonemizer = espeak_backend()
+        if lexicon is not None:
+            from .lexicon import Lexicon, LexiconPhonemizer
+
+            if isinstance(lexicon, str):
+                lexicon = Lexicon.load(lexicon)
+            self.phonemizer = LexiconPhonemizer(lexicon, self.phonemizer)
+        self.lexicon = lexicon
+        self._frontend_workers = frontend_workers
+        self._frontend = None
+        if token_budget is True:
+            token_budget = DEFAULT_TOKEN_BUDGET
+        for name, value in (("token_budget", token_budget), ("max_tokens_per_run", max_tokens_per_run)):
+            if value is not None and value < MIN_TOKEN_BUDGET:
+                raise ValueError(f"{name} must be at least {MIN_TOKEN_BUDGET} input IDs, got {value}: a single "
+                                 f"spelled-out character can take that many")
+        if max_tokens_per_run is not None:
+            token_budget = min(token_budget or max_tokens_per_run, max_tokens_per_run)
+            exact_tokens = True
+        self.token_budget = token_budget
+        self.exact_tokens = exact_tokens
+        self.chunk_chars = chunk_chars
+        self._run_options = None
+        if arena_shrinkage:
+            from .memory import SHRINKAGE_CONFIG_KEY, SHRINKAGE_DEVICES
+
+            self._run_options = ort.RunOptions()
+            self._run_options.add_run_config_entry(SHRINKAGE_CONFIG_KEY, SHRINKAGE_DEVICES)
+        if isinstance(cost_model, str):
+            from .cost import CostModel
+
+            cost_model = CostModel.load(cost_model)
+        self._cost_model = cost_model
+        self.tokenizer = PhonemeTokenizer()
         self.speed_priors = speed_priors
         
         # Available voices
-        self.available_voices = [
-            'expr-voice-2-m', 'expr-voice-2-f', 'expr-voice-3-m', 'expr-voice-3-f', 
-            'expr-voice-4-m', 'expr-voice-4-f', 'expr-voice-5-m', 'expr-voice-5-f'
-        ]
-        self.all_voice_names = ['Bella', 'Jasper', 'Luna', 'Bruno', 'Rosie', 'Hugo', 'Kiki', 'Leo']
+        self.available_voices = list(AVAILABLE_VOICES)
+        self.all_voice_names = list(VOICE_NAMES)
         self.voice_aliases = voice_aliases
 
         self.preprocessor = TextPreprocessor(remove_punctuation=False)
+        self.instrumentation = instrumentation or NULL_INSTRUMENTATION
+        self._supports_batching = None
+        self.is_ready = False
+        self.warmup_seconds = None
+        if warmup:
+            self.warmup()
     
-    def _prepare_inputs(self, text: str, voice: str, speed: float = 1.0) -> dict:
-        """Prepare ONNX model inputs from text and voice parameters."""
+    def _resolve_voice(self, voice: str, speed: float = 1.0):
+        """Resolve a voice alias and apply its speed prior."""
         if voice in self.voice_aliases:
             voice = self.voice_aliases[voice]
 
@@ -90,22 +204,85 @@ class KittenTTS_1_Onnx:
         
         if voice in self.speed_priors:
             speed = speed * self.speed_priors[voice]
-        
-        # Phonemize the input text
-        phonemes_list = self.phonemizer.phonemize([text])
-        
-        # Process phonemes to get token IDs
-        phonemes = basic_english_tokenize(phonemes_list[0])
-        phonemes = ' '.join(phonemes)
-        tokens = self.text_cleaner(phonemes)
-        
-        # Add start and end tokens
-        tokens.insert(0, 0)
-        tokens.append(10)
-        tokens.append(0)
-        
-        input_ids = np.array([tokens], dtype=np.int64)
-        ref_id =  min(len(text), self.voices[voice].shape[0] - 1)
+        return voice, speed
+
+    def warmup(self, voices=None, token_lengths=None) -> dict:
+        """Run dummy inputs through the pipeline so real requests start fast.
+
+        Initializes espeak (in every front-end worker too, with
+        frontend_workers), then runs inference at every token length (the
+        configured token buckets, else WARMUP_TOKEN_LENGTHS) so ORT grows its
+        arena and selects kernels for those shapes, and runs every voice once
+        at the shortest length. In parallel mode every lane is created and
+        run at each length as well. Warmup runs are not reported to the
+        instrumentation. Sets ``is_ready`` and ``warmup_seconds``.
+
+        Args:
+            voices: Voices to warm (default: every voice alias, else every voice)
+            token_lengths: input_ids lengths to run
+
+        Returns:
+            dict with "seconds", "runs", "token_lengths", "voices" and
+            "frontend_workers" (workers started and warmed)
+        """
+        start = time.perf_counter()
+        if voices is None:
+            voices = list(self.voice_aliases) or list(self.available_voices)
+        if token_lengths is None:
+            buckets = self._runner.token_buckets if self._runner is not None else None
+            token_lengths = buckets or WARMUP_TOKEN_LENGTHS
+            if not buckets and self.token_budget:
+                token_lengths = [length for length in token_lengths if length < self.token_budget]
+                token_lengths.append(self.token_budget)
+        token_lengths = sorted(token_lengths)
+        resolved = [self._resolve_voice(voice) for voice in voices]
+
+        lanes = self._lane_pool()
+        if lanes is not None and lanes.lanes < 2:
+            lanes = None
+        frontend = self._frontend_pool()
+        frontend_workers = len(frontend.warmup(_WARMUP_TEXT)) if frontend is not None else 0
+        body = self.tokenizer.encode(self._phonemize(_WARMUP_TEXT))[0, 1:-2]
+        runs = 0
+        with bind(NULL_INSTRUMENTATION):
+            for index, length in enumerate(token_lengths):
+                input_ids = np.full((1, max(length, 3)), PAD_ID, dtype=np.int64)
+                input_ids[0, 1:-2] = np.resize(body, input_ids.shape[1] - 3)
+                input_ids[0, -2] = END_ID
+                text = _WARMUP_TEXT * (length // len(_WARMUP_TEXT) + 1)
+                for voice, speed in (resolved if index == 0 else resolved[:1]):
+                    self._synthesize(text[:length], input_ids, voice, speed)
+                    runs += 1
+                if lanes is not None:
+                    voice, speed = resolved[0]
+                    runs += lanes.run_each(self._style_inputs(text[:length], input_ids, voice, speed),
+                                           self._run_options)
+
+        self.warmup_seconds = time.perf_counter() - start
+        self.is_ready = True
+        logger.info("Warmup finished in %.2fs (%d runs)", self.warmup_seconds, runs)
+        return {"seconds": self.warmup_seconds, "runs": runs, "token_lengths": token_lengths, "voices": voices,
+                "frontend_workers": frontend_workers}
+
+    def _phonemize(self, text: str) -> str:
+        """Phonemize a text chunk with espeak (and the lexicon, if any)."""
+        return self.phonemizer.phonemize([text])[0]
+
+    def _tokenize(self, phonemes: str) -> np.ndarray:
+        """Convert a phoneme string to a batch of one token ID sequence."""
+        input_ids, dropped = self.tokenizer.encode(phonemes, return_dropped=True)
+        if dropped:
+            self.instrumentation.count("dropped_symbols", dropped)
+        return input_ids
+
+    def _style_inputs(self, text, input_ids: np.ndarray, voice: str, speed: float) -> dict:
+        """Assemble the ONNX input feed for a resolved voice.
+
+        The style row is picked by the length of ``text``; an int is taken
+        as that length directly.
+        """
+        text_length = text if isinstance(text, int) else len(text)
+        ref_id =  min(text_length, self.voices[voice].shape[0] - 1)
         ref_s = self.voices[voice][ref_id:ref_id+1]
         
         return {
@@ -113,28 +290,459 @@ class KittenTTS_1_Onnx:
             "style": ref_s,
             "speed": np.array([speed], dtype=np.float32),
         }
+
+    def _prepare_inputs(self, text: str, voice: str, speed: float = 1.0) -> dict:
+        """Prepare ONNX model inputs from text and voice parameters."""
+        voice, speed = self._resolve_voice(voice, speed)
+        input_ids = self._tokenize(self._phonemize(text))
+        return self._style_inputs(text, input_ids, voice, speed)
+
+    def _run(self, onnx_inputs: dict, run_options=None):
+        """Run the ONNX session on one input feed."""
+        if self._runner is not None:
+            return self._runner.run(onnx_inputs, run_options)
+        return self.session.run(None, onnx_inputs, run_options)
+
+    def _run_cancellable(self, run, onnx_inputs: dict, cancel):
+        """Call ``run`` with RunOptions that ``cancel`` can terminate, plus arena shrinkage if enabled."""
+        if cancel is None:
+            return run(onnx_inputs, self._run_options)
+        cancel.check()
+        with cancel.run_options() as run_options:
+            if self._run_options is not None:
+                from .memory import SHRINKAGE_CONFIG_KEY, SHRINKAGE_DEVICES
+
+                run_options.add_run_config_entry(SHRINKAGE_CONFIG_KEY, SHRINKAGE_DEVICES)
+            try:
+                return run(onnx_inputs, run_options)
+            except _ORT_RUN_ERRORS:
+                if cancel.cancelled:
+                    raise SynthesisCancelled(cancel.reason) from None
+                raise
+
+    def _lane_pool(self):
+        """The LanePool for parallel mode, created on first use; None when off."""
+        if not self._parallel:
+            return None
+        if self._lanes is None:
+            from .parallel import LanePool, plan_lanes
+
+            if self._parallel == "auto":
+                lanes, threads = plan_lanes()
+            elif isinstance(self._parallel, int):
+                lanes = self._parallel
+                threads = max(1, (os.cpu_count() or 1) // lanes)
+            else:
+                lanes, threads = self._parallel
+            self._lanes = LanePool(self.model_path, lanes, threads, providers=self._providers,
+                                   session_options=self._session_options, session_config=self._session_config)
+        return self._lanes
+
+    def _frontend_pool(self):
+        """The FrontendPool for frontend_workers, created on first use; None when off."""
+        if not self._frontend_workers:
+            return None
+        if self._frontend is None:
+            from .frontend import FrontendPool
+
+            self._frontend = FrontendPool(self._frontend_workers, self.preprocessor, self.lexicon,
+                                          token_budget=self.token_budget, exact_tokens=self.exact_tokens,
+                                          chunk_chars=self.chunk_chars)
+        return self._frontend
+
+    @property
+    def instrumentation(self):
+        """Instrumentation receiving per-stage timings and counters.
+
+        One bound with kittentts.instrumentation.bind (e.g. by a shared
+        model handle) takes precedence over the model's own.
+        """
+        return bound_instrumentation() or self._instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, value):
+        self._instrumentation = value or NULL_INSTRUMENTATION
+
+    def close(self) -> None:
+        """Stop the parallel-mode worker threads and front-end processes, if any were started."""
+        if self._lanes is not None:
+            self._lanes.close()
+            self._lanes = None
+        if self._frontend is not None:
+            self._frontend.close()
+            self._frontend = None
+
+    def _synthesize_chunks(self, chunks, voice: str, speed: float, cancel=None):
+        """Yield audio for each text chunk in order, on lanes when enabled.
+
+        ``cancel`` is checked before every chunk and stage and terminates a
+        running inference.
+        """
+        voice, speed = self._resolve_voice(voice, speed)
+        yield from self._synthesize_encoded(self._encode_chunks(chunks, cancel), len(chunks), voice, speed, cancel)
+
+    def _synthesize_encoded(self, encoded, count: int, voice: str, speed: float, cancel=None):
+        """Yield audio for ``count`` (chunk, token IDs) pairs with an already resolved voice."""
+        lanes = self._lane_pool() if count > 1 else None
+        if lanes is None or lanes.lanes < 2:
+            for text_chunk, input_ids in encoded:
+                yield self._synthesize(text_chunk, input_ids, voice, speed, cancel=cancel)
+            return
+
+        instrumentation = self.instrumentation
+
+        def synthesize(item):
+            # Lane threads don't inherit the caller's bound instrumentation.
+            with bind(instrumentation):
+                return self._synthesize(item[0], item[1], voice, speed, run=lanes.run, cancel=cancel)
+
+        yield from lanes.map_ordered(synthesize, encoded)
+
+    def _encode_chunks(self, chunks, cancel=None):
+        """Yield (chunk, token IDs) in order, from the front-end workers when enabled."""
+        frontend = self._frontend_pool()
+        if frontend is None:
+            for text_chunk in chunks:
+                if cancel is not None:
+                    cancel.check()
+                yield text_chunk, self._encode_chunk(text_chunk)
+            return
+
+        encoded = frontend.encode_ordered(chunks)
+        try:
+            for text_chunk in chunks:
+                if cancel is not None:
+                    cancel.check()
+                with self.instrumentation.span("phonemize"):
+                    input_ids, dropped = next(encoded)
+                if dropped:
+                    self.instrumentation.count("dropped_symbols", dropped)
+                yield text_chunk, input_ids
+        finally:
+            encoded.close()
+
+    def _trim(self, outputs) -> np.ndarray:
+        """Trim the trailing padding the model appends to every waveform."""
+        return outputs[0][..., :-5000]
     
+    def end_profiling(self) -> str:
+        """Stop the onnxruntime profiler and return the trace JSON path.
+
+        Only meaningful when the model was created with enable_profiling=True;
+        summarize the trace with kittentts.profiling.summarize_profile.
+        """
+        return self.session.end_profiling()
+
     def normalize_text(self, text: str, locale: str = "en-US", return_spans: bool = False):
         return normalize_text(text, locale=locale, return_spans=return_spans)
 
-    def generate(self, text: str, voice: str = "expr-voice-5-m", speed: float = 1.0, clean_text: bool=True) -> np.ndarray:
-        out_chunks = []
+    def _chunks(self, text: str, clean_text: bool, count_request: bool = True):
+        """Preprocess and chunk text, reporting both stages.
+
+        ``count_request=False`` leaves the "requests" counter to the caller,
+        for requests that may still be turned away.
+        """
+        instrumentation = self.instrumentation
+        if count_request:
+            instrumentation.count("requests")
+        frontend = self._frontend_pool()
+        if frontend is not None:
+            with instrumentation.span("preprocess"):
+                return frontend.chunks(text, clean_text)
         if clean_text:
-            text = self.preprocessor(text)
-        for text_chunk in chunk_text(text):
-            out_chunks.append(self.generate_single_chunk(text_chunk, voice, speed))
-        return np.concatenate(out_chunks, axis=-1)
+            with instrumentation.span("preprocess"):
+                text = self.preprocessor(text)
+        with instrumentation.span("chunk"):
+            return self._split(text)
+
+    def _split(self, text: str) -> list:
+        """Chunk normalized text by characters, or by tokens when token_budget is set."""
+        if self.token_budget is None:
+            return chunk_text(text, self.chunk_chars)
+        if self.exact_tokens:
+            return chunk_by_tokens(text, self.token_budget, self._count_tokens, strict=True)
+        return chunk_by_tokens(text, self.token_budget)
 
-    def generate_stream(self, text: str, voice: str = "expr-voice-5-m", speed: float = 1.0, clean_text: bool = True):
+    def _estimated_split(self, text: str) -> list:
+        """Chunk normalized text like ``_split`` but estimate tokens instead of phonemizing.
+
+        Never calls espeak, so it is safe on a thread other than the one
+        synthesizing.
+        """
+        if self.token_budget is None:
+            return chunk_text(text, self.chunk_chars)
+        return chunk_by_tokens(text, self.token_budget)
+
+    def _count_tokens(self, text: str) -> int:
+        """Phoneme tokens espeak (and the lexicon) produce for ``text``."""
+        return self.tokenizer.encode(self._phonemize(text)).shape[-1] - FRAMING_TOKENS
+
+    def generate(self, text: str, voice: str = "expr-voice-5-m", speed: float = 1.0, clean_text: bool=True,
+                 cancel=None, timeout: float = None, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+        """Synthesize a whole text.
+
+        Args:
+            cancel: Optional kittentts.cancellation.CancellationToken
+            timeout: Optional deadline in seconds from now
+            sample_rate: Output sample rate; anything but 24000 is resampled
+
+        Raises:
+            SynthesisCancelled: When cancelled or past the deadline; carries
+                the audio of the chunks completed so far.
+        """
+        token, owned = as_token(cancel, timeout)
+        try:
+            return self._collect(self._synthesize_chunks(self._chunks(text, clean_text), voice, speed, cancel=token),
+                                 sample_rate)
+        finally:
+            if owned:
+                token.close()
+
+    def _collect(self, audio_chunks, sample_rate: int) -> np.ndarray:
+        """Concatenate and resample chunk audio; a cancellation carries the partial audio."""
+        out_chunks = []
+        try:
+            for audio in audio_chunks:
+                out_chunks.append(audio)
+        except SynthesisCancelled as exc:
+            partial = self._resample(np.concatenate(out_chunks, axis=-1), sample_rate) if out_chunks else None
+            raise SynthesisCancelled(exc.reason, len(out_chunks), _audio_seconds(out_chunks), partial) from None
+        with self.instrumentation.span("concat"):
+            audio = np.concatenate(out_chunks, axis=-1)
+        del out_chunks
+        self._release_memory()
+        return self._resample(audio, sample_rate)
+
+    def _release_memory(self) -> None:
+        """With arena shrinkage, hand the heap pages freed by a request back to the OS."""
+        if self._run_options is not None:
+            from .memory import trim_heap
+
+            trim_heap()
+
+    def _resample(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Convert model output to ``sample_rate``."""
+        if sample_rate == SAMPLE_RATE:
+            return audio
+        from .resample import resample
+
+        with self.instrumentation.span("resample"):
+            return resample(audio, SAMPLE_RATE, sample_rate)
+
+    def generate_stream(self, text: str, voice: str = "expr-voice-5-m", speed: float = 1.0, clean_text: bool = True,
+                        cancel=None, timeout: float = None, sample_rate: int = SAMPLE_RATE):
         """Generate audio chunk-by-chunk as a generator.
 
+        Args:
+            cancel: Optional kittentts.cancellation.CancellationToken
+            timeout: Optional deadline in seconds from now
+            sample_rate: Output sample rate; anything but 24000 is resampled
+                continuously across chunks, and the filter's last few samples
+                follow as one extra short array
+
         Yields:
             numpy.ndarray: Audio data for each text chunk.
+
+        Raises:
+            SynthesisCancelled: When cancelled or past the deadline; reports
+                the chunks and audio yielded so far.
         """
-        if clean_text:
-            text = self.preprocessor(text)
-        for text_chunk in chunk_text(text):
-            yield self.generate_single_chunk(text_chunk, voice, speed)
+        token, owned = as_token(cancel, timeout)
+        try:
+            yield from self._stream(
+                self._synthesize_chunks(self._chunks(text, clean_text), voice, speed, cancel=token), sample_rate)
+        finally:
+            if owned:
+                token.close()
+
+    def _stream(self, audio_chunks, sample_rate: int):
+        """Yield chunk audio resampled without seams, then the resampler's tail."""
+        resampler = None
+        if sample_rate != SAMPLE_RATE:
+            from .resample import Resampler
+
+            resampler = Resampler(SAMPLE_RATE, sample_rate)
+        chunks = 0
+        seconds = 0.0
+        try:
+            for audio in audio_chunks:
+                chunks += 1
+                seconds += audio.shape[-1] / SAMPLE_RATE
+                if resampler is not None:
+                    with self.instrumentation.span("resample"):
+                        audio = resampler.process(audio)
+                yield audio
+            if resampler is not None:
+                tail = resampler.flush()
+                if tail.size:
+                    yield tail
+        except SynthesisCancelled as exc:
+            raise SynthesisCancelled(exc.reason, chunks, seconds) from None
+        finally:
+            self._release_memory()
+
+    def generate_from_phonemes(self, phonemes, voice: str = "expr-voice-5-m", speed: float = 1.0,
+                               text_lengths=None, cancel=None, timeout: float = None) -> np.ndarray:
+        """Synthesize precomputed phonemes, skipping normalization and espeak.
+
+        Args:
+            phonemes: espeak-style phoneme string of one chunk, or a list of
+                chunk strings (each must fit the model like a chunk_text chunk)
+            voice: Voice to use for synthesis
+            speed: Speech speed (1.0 = normal)
+            text_lengths: Length of each chunk's source text, which selects the
+                voice style row as in generate (default: the phoneme length)
+            cancel: Optional kittentts.cancellation.CancellationToken
+            timeout: Optional deadline in seconds from now
+
+        Returns:
+            Audio data as numpy array
+
+        Raises:
+            SynthesisCancelled: When cancelled or past the deadline; carries
+                the audio of the chunks completed so far.
+        """
+        if isinstance(phonemes, str):
+            phonemes = [phonemes]
+        token, owned = as_token(cancel, timeout)
+        try:
+            with self.instrumentation.span("tokenize"):
+                input_ids = [self._tokenize(chunk) for chunk in phonemes]
+            if text_lengths is None:
+                text_lengths = [len(chunk) for chunk in phonemes]
+            return self.generate_from_tokens(input_ids, voice, speed, text_lengths=text_lengths, cancel=token)
+        finally:
+            if owned:
+                token.close()
+
+    def generate_from_tokens(self, input_ids, voice: str = "expr-voice-5-m", speed: float = 1.0,
+                             text_lengths=None, cancel=None, timeout: float = None) -> np.ndarray:
+        """Synthesize token IDs directly, skipping the whole text front end.
+
+        Args:
+            input_ids: Token IDs of one chunk as produced by PhonemeTokenizer
+                (including the pad/end tokens), shape (n,) or (1, n), or a
+                list of such arrays, one per chunk
+            voice: Voice to use for synthesis
+            speed: Speech speed (1.0 = normal)
+            text_lengths: Length of each chunk's source text, which selects the
+                voice style row as in generate (default: the token count)
+            cancel: Optional kittentts.cancellation.CancellationToken
+            timeout: Optional deadline in seconds from now
+
+        Returns:
+            Audio data as numpy array
+
+        Raises:
+            SynthesisCancelled: When cancelled or past the deadline; carries
+                the audio of the chunks completed so far.
+        """
+        if isinstance(input_ids, np.ndarray):
+            input_ids = [input_ids]
+        chunks = [np.asarray(ids, dtype=np.int64).reshape(1, -1) for ids in input_ids]
+        if text_lengths is None:
+            text_lengths = [ids.shape[-1] for ids in chunks]
+        if len(text_lengths) != len(chunks):
+            raise ValueError("text_lengths must match the number of chunks")
+
+        self.instrumentation.count("requests")
+        voice, speed = self._resolve_voice(voice, speed)
+        token, owned = as_token(cancel, timeout)
+        audio = []
+        try:
+            for ids, text_length in zip(chunks, text_lengths):
+                if token is not None:
+                    token.check()
+                audio.append(self._synthesize(int(text_length), ids, voice, speed, cancel=token))
+        except SynthesisCancelled as exc:
+            partial = np.concatenate(audio, axis=-1) if audio else None
+            raise SynthesisCancelled(exc.reason, len(audio), _audio_seconds(audio), partial) from None
+        finally:
+            if owned:
+                token.close()
+        with self.instrumentation.span("concat"):
+            return np.concatenate(audio, axis=-1)
+
+    def generate_paced(self, text: str, voice: str = "expr-voice-5-m", speed: float = 1.0,
+                       lookahead: float = 2.0, clean_text: bool = True, sample_rate: int = SAMPLE_RATE):
+        """Stream audio for live playback, synthesizing at most ``lookahead``
+        seconds ahead of the consumer's playback clock.
+
+        Returns:
+            kittentts.streaming.PacedStream; iterate it for audio chunks and
+            read its ``stats`` for underruns. Closing or dropping it cancels
+            the synthesis, including a running inference.
+        """
+        from .cancellation import CancellationToken
+        from .streaming import PacedStream
+
+        instrumentation = self.instrumentation
+        token = CancellationToken()
+        source = self.generate_stream(text, voice, speed, clean_text=clean_text, cancel=token, sample_rate=sample_rate)
+        # The stream is produced on a background thread, outside the caller's bound instrumentation.
+        return PacedStream(bind_iter(source, instrumentation), lookahead=lookahead, sample_rate=sample_rate,
+                           instrumentation=instrumentation, cancel=token)
+
+    @property
+    def cost_model(self):
+        """The kittentts.cost.CostModel behind estimate().
+
+        Raises:
+            ValueError: If no cost model was given and calibrate() has not run.
+        """
+        if self._cost_model is None:
+            raise ValueError("No cost model: call calibrate() or load one with cost_model=PATH "
+                             "(kittentts bench --calibrate PATH)")
+        return self._cost_model
+
+    @cost_model.setter
+    def cost_model(self, value):
+        self._cost_model = value
+
+    def calibrate(self, voice: str = None, sizes=None, repeat: int = 3, log=None):
+        """Fit the cost model behind estimate() by timing this model (see kittentts.cost.calibrate).
+
+        Takes a few seconds with the nano models and replaces any loaded
+        cost model.
+
+        Returns:
+            kittentts.cost.CostModel
+        """
+        from .cost import calibrate
+
+        self._cost_model = calibrate(self, voice=voice, sizes=sizes, repeat=repeat, log=log)
+        return self._cost_model
+
+    def estimate(self, text: str, voice: str = "expr-voice-5-m", speed: float = 1.0, clean_text: bool = True,
+                 exact: bool = False) -> dict:
+        """Predict synthesis time and audio duration without running inference.
+
+        Needs a cost model: call calibrate() first or pass ``cost_model``.
+
+        Args:
+            exact: Phonemize the chunks to count tokens instead of
+                estimating them from the character count
+
+        Returns:
+            dict with "seconds" (wall time), "audio_seconds", "chars",
+            "chunks" and "tokens"
+        """
+        voice, speed = self._resolve_voice(voice, speed)
+        chunks = self._split(self.preprocessor(text) if clean_text else text)
+        tokens = sum(self.tokenizer.encode(self._phonemize(chunk)).shape[-1] for chunk in chunks) if exact else None
+        return self.cost_model.estimate(chunks, speed, tokens=tokens)
+
+    def synthesis_session(self, voice: str = "expr-voice-5-m", speed: float = 1.0, clean_text: bool = True,
+                sample_rate: int = SAMPLE_RATE, cache_size: int = 1024):
+        """Open a kittentts.session.SynthesisSession for a conversation in one voice.
+
+        The voice and speed are resolved once and normalized text and
+        phonemes are cached between its ``say``/``say_stream`` calls.
+        """
+        from .session import SynthesisSession
+
+        return SynthesisSession(self, voice, speed, clean_text=clean_text, sample_rate=sample_rate,
+                                cache_size=cache_size)
 
     def generate_single_chunk(self, text: str, voice: str = "expr-voice-5-m", speed: float = 1.0) -> np.ndarray:
         """Synthesize speech from text.
@@ -147,17 +755,246 @@ class KittenTTS_1_Onnx:
         Returns:
             Audio data as numpy array
         """
-        onnx_inputs = self._prepare_inputs(text, voice, speed)
-        
-        outputs = self.session.run(None, onnx_inputs)
-        
-        # Trim audio
-        audio = outputs[0][..., :-5000]
+        resolved_voice, resolved_speed = self._resolve_voice(voice, speed)
+        input_ids = self._encode_chunk(text)
+        return self._synthesize(text, input_ids, resolved_voice, resolved_speed)
+
+    def _encode_chunk(self, text: str) -> np.ndarray:
+        """Phonemize and tokenize one chunk of text."""
+        instrumentation = self.instrumentation
+        with instrumentation.span("phonemize"):
+            phonemes = self._phonemize(text)
+        with instrumentation.span("tokenize"):
+            return self._tokenize(phonemes)
+
+    def _encode_batch(self, chunks: list) -> list:
+        """Phonemize chunks in one espeak call and tokenize them in one pass.
+
+        Returns:
+            list: One (1, n) token ID array per chunk, as _encode_chunk gives.
+        """
+        if not chunks:
+            return []
+        instrumentation = self.instrumentation
+        with instrumentation.span("phonemize"):
+            phonemes = self.phonemizer.phonemize(chunks)
+        with instrumentation.span("tokenize"):
+            input_ids, lengths, dropped = self.tokenizer.encode_batch(phonemes, return_dropped=True)
+        if dropped.any():
+            instrumentation.count("dropped_symbols", int(dropped.sum()))
+        return [input_ids[row:row + 1, :length].copy() for row, length in enumerate(lengths)]
 
+    def _synthesize(self, text: str, input_ids: np.ndarray, voice: str, speed: float, run=None,
+                    cancel=None) -> np.ndarray:
+        """Run inference for tokenized text with an already resolved voice and speed.
+
+        ``run`` replaces ``self._run`` as the inference call, e.g. a lane of a
+        LanePool; ``cancel`` is a CancellationToken that can terminate it.
+        """
+        instrumentation = self.instrumentation
+        onnx_inputs = self._style_inputs(text, input_ids, voice, speed)
+
+        with instrumentation.span("inference"):
+            outputs = self._run_cancellable(run or self._run, onnx_inputs, cancel)
+
+        with instrumentation.span("trim"):
+            audio = self._trim(outputs)
+
+        if instrumentation.enabled:
+            instrumentation.count("chunks")
+            instrumentation.count("tokens", input_ids.shape[-1])
+            instrumentation.count("audio_seconds", audio.shape[-1] / SAMPLE_RATE)
         return audio
+
+    @property
+    def supports_batching(self) -> bool:
+        """Whether the exported graph accepts more than one row per run."""
+        if self._supports_batching is None:
+            inputs = {i.name: i.shape for i in self.session.get_inputs()}
+            output_shape = self.session.get_outputs()[0].shape
+            batch_dim = (inputs.get("input_ids") or [1])[0]
+            self._supports_batching = batch_dim != 1 and len(output_shape) >= 2
+        return self._supports_batching
+
+    def _synthesize_items(self, items) -> list:
+        """Synthesize many (text, input_ids, voice, speed) items.
+
+        Items with the same speed and token count go through the model as one
+        batch when the graph supports it; otherwise, or if a batched run
+        fails, each item runs alone. Voices and speeds must be resolved.
+
+        Returns:
+            list: Audio for each item, in input order.
+        """
+        results = [None] * len(items)
+        groups = {}
+        for index, (_, input_ids, voice, speed) in enumerate(items):
+            groups.setdefault((speed, input_ids.shape[-1]), []).append(index)
+
+        for (speed, _), indexes in groups.items():
+            audio_rows = None
+            if len(indexes) > 1 and self.supports_batching:
+                audio_rows = self._run_batch([items[i] for i in indexes], speed)
+            if audio_rows is None:
+                audio_rows = [self._synthesize(*items[i]) for i in indexes]
+            for index, audio in zip(indexes, audio_rows):
+                results[index] = audio
+        return results
+
+    def _run_batch(self, items, speed: float):
+        """Run equally long items as one batch; None if the graph refuses."""
+        instrumentation = self.instrumentation
+        feeds = [self._style_inputs(text, input_ids, voice, speed) for text, input_ids, voice, _ in items]
+        batched = {
+            "input_ids": np.concatenate([feed["input_ids"] for feed in feeds], axis=0),
+            "style": np.concatenate([feed["style"] for feed in feeds], axis=0),
+            "speed": np.full(len(items), speed, dtype=np.float32),
+        }
+        try:
+            with instrumentation.span("inference"):
+                outputs = self.session.run(None, batched, self._run_options)
+        except _ORT_RUN_ERRORS as exc:
+            logger.debug("Batched inference failed, running items one by one: %s", exc)
+            self._supports_batching = False
+            return None
+        if outputs[0].shape[0] != len(items):
+            self._supports_batching = False
+            return None
+
+        with instrumentation.span("trim"):
+            audio_rows = list(self._trim(outputs))
+        if instrumentation.enabled:
+            instrumentation.count("chunks", len(items))
+            instrumentation.count("tokens", batched["input_ids"].size)
+            instrumentation.count("audio_seconds", sum(a.shape[-1] for a in audio_rows) / SAMPLE_RATE)
+        return audio_rows
+
+    def generate_voices(self, text: str, voices=None, speeds=1.0, clean_text: bool = True) -> dict:
+        """Synthesize the same text in several voices.
+
+        Text is normalized, chunked and phonemized once; only inference runs
+        per voice, batched across voices when the model supports it.
+
+        Args:
+            text: Input text to synthesize
+            voices: Voice names or aliases (default: every voice)
+            speeds: One speed for all voices, or a list matching ``voices``
+            clean_text: If true, it will cleanup the text. Eg. replace numbers with words.
+
+        Returns:
+            dict: Voice name -> audio data as numpy array
+        """
+        if voices is None:
+            voices = list(self.voice_aliases) or list(self.available_voices)
+        if isinstance(speeds, (int, float)):
+            speeds = [speeds] * len(voices)
+        if len(speeds) != len(voices):
+            raise ValueError("speeds must be a single value or match the number of voices")
+
+        voices_speeds = [self._resolve_voice(voice, speed) for voice, speed in zip(voices, speeds)]
+        per_voice = [[] for _ in voices]
+        chunks = self._chunks(text, clean_text)
+        for text_chunk, input_ids in zip(chunks, self._encode_batch(chunks)):
+            items = [(text_chunk, input_ids, voice, speed) for voice, speed in voices_speeds]
+            for index, audio in enumerate(self._synthesize_items(items)):
+                per_voice[index].append(audio)
+
+        with self.instrumentation.span("concat"):
+            return {voice: np.concatenate(chunks, axis=-1) for voice, chunks in zip(voices, per_voice)}
     
+    def render_script(self, script, pause: float = 0.3, output_path: str = None, clean_text: bool = True,
+                      window: int = 64, sample_rate: int = SAMPLE_RATE):
+        """Render a multi-speaker script in order.
+
+        Lines are processed in windows of ``window`` lines: every line of a
+        window is normalized, chunked and phonemized first, then the chunks
+        of all lines are synthesized together, so chunks with the same speed
+        and token count batch across lines and voices, and finally the audio
+        is stitched back in script order.
+
+        Args:
+            script: Iterable of (voice, text) or (voice, text, speed) tuples
+            pause: Seconds of silence between consecutive lines
+            output_path: If given, audio is written to this file window by
+                window instead of being returned
+            clean_text: If true, it will cleanup the text. Eg. replace numbers with words.
+            window: Number of lines held in memory at once
+            sample_rate: Output sample rate; anything but 24000 is resampled
+
+        Returns:
+            numpy.ndarray with the whole script, or None when writing to output_path.
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        silence = np.zeros(int(round(pause * SAMPLE_RATE)), dtype=np.float32)
+        writer = sf.SoundFile(output_path, "w", samplerate=sample_rate, channels=1) if output_path else None
+        resampler = None
+        if writer is not None and sample_rate != SAMPLE_RATE:
+            from .resample import Resampler
+
+            resampler = Resampler(SAMPLE_RATE, sample_rate)
+        pieces = []
+        first = True
+        try:
+            lines = iter(script)
+            while True:
+                batch = [line for _, line in zip(range(window), lines)]
+                if not batch:
+                    break
+                for audio in self._render_lines(batch, clean_text):
+                    if not first and silence.size:
+                        pieces.append(silence)
+                    first = False
+                    pieces.append(audio)
+                if writer is not None:
+                    for piece in pieces:
+                        writer.write(resampler.process(piece) if resampler is not None else piece)
+                    pieces = []
+            if resampler is not None:
+                writer.write(resampler.flush())
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if writer is not None:
+            logger.info("Audio saved to %s", output_path)
+            return None
+        with self.instrumentation.span("concat"):
+            audio = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+        return self._resample(audio, sample_rate)
+
+    def _render_lines(self, lines, clean_text: bool) -> list:
+        """Synthesize a list of script lines, returning one array per line."""
+        chunks = []
+        resolved = []
+        owners = []
+        for line_index, line in enumerate(lines):
+            if len(line) == 2:
+                (voice, text), speed = line, 1.0
+            elif len(line) == 3:
+                voice, text, speed = line
+            else:
+                raise ValueError("script lines must be (voice, text) or (voice, text, speed)")
+            voice, speed = self._resolve_voice(voice, speed)
+            for text_chunk in self._chunks(text, clean_text):
+                chunks.append(text_chunk)
+                resolved.append((voice, speed))
+                owners.append(line_index)
+        items = [(text_chunk, input_ids, voice, speed)
+                 for text_chunk, input_ids, (voice, speed) in zip(chunks, self._encode_batch(chunks), resolved)]
+
+        # Run voice by voice and shortest first so equal shapes sit together.
+        order = sorted(range(len(items)), key=lambda i: (items[i][2], items[i][1].shape[-1]))
+        audio = self._synthesize_items([items[i] for i in order])
+        per_line = [[] for _ in lines]
+        for position in sorted(range(len(order)), key=lambda p: order[p]):
+            per_line[owners[order[position]]].append(audio[position])
+        return [np.concatenate([np.ravel(chunk) for chunk in chunks]) if chunks else np.zeros(0, dtype=np.float32)
+                for chunks in per_line]
+
     def generate_to_file(self, text: str, output_path: str, voice: str = "expr-voice-5-m", 
-                          speed: float = 1.0, sample_rate: int = 24000, clean_text: bool=True) -> None:
+                          speed: float = 1.0, sample_rate: int = SAMPLE_RATE, clean_text: bool=True,
+                          cancel=None, timeout: float = None) -> None:
         """Synthesize speech and save to file.
         
         Args:
@@ -165,9 +1002,15 @@ class KittenTTS_1_Onnx:
             output_path: Path to save the audio file
             voice: Voice to use for synthesis
             speed: Speech speed (1.0 = normal)
-            sample_rate: Audio sample rate
+            sample_rate: Audio sample rate; the audio is resampled from 24000
             clean_text: If true, it will cleanup the text. Eg. replace numbers with words.
+            cancel: Optional kittentts.cancellation.CancellationToken
+            timeout: Optional deadline in seconds from now
+
+        Raises:
+            SynthesisCancelled: When cancelled; nothing is written.
         """
-        audio = self.generate(text, voice, speed, clean_text=clean_text)
+        audio = self.generate(text, voice, speed, clean_text=clean_text, cancel=cancel, timeout=timeout,
+                              sample_rate=sample_rate)
         sf.write(output_path, audio, sample_rate)
-        print(f"Audio saved to {output_path}")
+        logger.info("Audio saved to %s", output_path)
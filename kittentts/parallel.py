@@ -0,0 +1,117 @@
+"""
+parallel.py
+Concurrent chunk synthesis over several onnxruntime sessions ("lanes").
+
+A small model gains little from more intra-op threads, so a long text with
+one session spends most of its time on a couple of busy cores. ``LanePool``
+splits the CPU into K lanes, each its own ``InferenceSession`` with N
+intra-op threads, and runs chunks on them concurrently (onnxruntime releases
+the GIL while it runs). The text front end stays on the calling thread, since
+espeak is not thread-safe, and results are always returned in chunk order.
+
+Every lane holds its own copy of the weights, so memory grows with K.
+"""
+
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import onnxruntime as ort
+
+# Without benchmark data: threads per lane once there are enough cores. The
+# nano/micro models stop scaling at around two intra-op threads.
+_DEFAULT_LANE_THREADS = 2
+
+
+def plan_lanes(cores: Optional[int] = None, results: Optional[Sequence[dict]] = None) -> Tuple[int, int]:
+    """Pick (lanes, threads per lane) so that lanes * threads <= cores.
+
+    Args:
+        cores: Available CPU cores (default: os.cpu_count())
+        results: Optional kittentts.bench.run_benchmark results; the thread
+            count N maximizing (cores // N) / rtf(N) is chosen, i.e. the best
+            aggregate throughput of cores // N independent lanes
+
+    Returns:
+        Tuple of (lanes, threads)
+    """
+    cores = max(1, cores or os.cpu_count() or 1)
+    best_rtf = {}
+    for result in results or ():
+        threads, rtf = result.get("threads"), result.get("rtf")
+        if threads and rtf and threads <= cores:
+            best_rtf[threads] = min(rtf, best_rtf.get(threads, rtf))
+    if best_rtf:
+        threads = max(best_rtf, key=lambda n: ((cores // n) / best_rtf[n], -n))
+    else:
+        threads = _DEFAULT_LANE_THREADS if cores >= 2 * _DEFAULT_LANE_THREADS else 1
+    return cores // threads, threads
+
+
+class LanePool:
+    """K sessions of one model, each with N intra-op threads.
+
+    Args:
+        model_path: Path to the ONNX model
+        lanes: Number of concurrent sessions
+        threads: intra_op_num_threads of every session
+        providers: Execution providers, as for InferenceSession
+        session_options: Optional dict of further SessionOptions attributes
+        session_config: Optional dict of session config entries
+    """
+
+    def __init__(self, model_path: str, lanes: int, threads: int, providers: Optional[List[str]] = None,
+                 session_options: Optional[dict] = None, session_config: Optional[dict] = None):
+        if lanes < 1 or threads < 1:
+            raise ValueError("lanes and threads must be at least 1")
+        self.lanes = lanes
+        self.threads = threads
+        self._sessions = queue.SimpleQueue()
+        for _ in range(lanes):
+            options = ort.SessionOptions()
+            for name, value in (session_options or {}).items():
+                setattr(options, name, value)
+            for key, value in (session_config or {}).items():
+                options.add_session_config_entry(key, str(value))
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+            self._sessions.put(ort.InferenceSession(model_path, sess_options=options, providers=providers or []))
+        self._executor = ThreadPoolExecutor(max_workers=lanes, thread_name_prefix="kittentts-lane")
+
+    def run(self, feeds: dict, run_options=None):
+        """``session.run(None, feeds, run_options)`` on whichever lane is free."""
+        session = self._sessions.get()
+        try:
+            return session.run(None, feeds, run_options)
+        finally:
+            self._sessions.put(session)
+
+    def run_each(self, feeds: dict, run_options=None) -> int:
+        """Run ``feeds`` once on every lane, e.g. to warm them; returns the number of lanes run."""
+        sessions = [self._sessions.get() for _ in range(self.lanes)]
+        try:
+            for session in sessions:
+                session.run(None, feeds, run_options)
+        finally:
+            for session in sessions:
+                self._sessions.put(session)
+        return len(sessions)
+
+    def map_ordered(self, func, items: Iterable):
+        """Yield ``func(item)`` in order, keeping at most ``lanes`` items in flight.
+
+        ``items`` is consumed lazily on the calling thread, so producing an
+        item (e.g. phonemizing the next chunk) overlaps with inference.
+        """
+        pending = []
+        for item in items:
+            pending.append(self._executor.submit(func, item))
+            if len(pending) >= self.lanes:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+    def close(self) -> None:
+        """Shut the worker threads down."""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,191 @@
+"""
+prefork.py
+Sharing one model load between the workers of a pre-fork server.
+
+Servers like gunicorn import the application in a parent process and fork
+workers from it. Each worker that loads the model keeps its own copy of the
+weights and voices. An onnxruntime session or espeak backend created
+before the fork is also unusable in the children: ORT's thread pools and
+espeak's state do not survive ``fork``.
+
+``PreforkModel`` (``KittenTTS(..., prefork=True)``) does the expensive,
+fork-safe part in the parent:
+
+* The model is rewritten once with its weights in a separate, page-aligned
+  external-data file. onnxruntime memory-maps that file instead of copying
+  the weights, so every worker reads the same page-cache pages.
+* The voices are loaded into plain arrays that the children share
+  copy-on-write.
+
+The onnxruntime session and the espeak backend are created in each process
+the first time it synthesizes. A hook registered with
+``os.register_at_fork`` discards engines inherited from the parent. They
+are kept alive but never used or torn down, because their threads no
+longer exist in the child.
+
+Weight prepacking is off by default: prepacked weights are private copies
+in every worker. Pass ``prepack=True`` to trade that memory for faster
+matrix multiplications.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from typing import Optional
+
+import numpy as np
+
+# Initializers at least this large go to the shared external-data file.
+_EXTERNAL_THRESHOLD = 1024
+
+_instances = weakref.WeakSet()
+# Engines inherited through fork; never used again, never destroyed.
+_orphans = []
+
+
+def externalize_weights(model_path: str, directory: Optional[str] = None) -> str:
+    """Copy of a model with its weights in an external-data file, made once.
+
+    Args:
+        model_path: Self-contained .onnx model
+        directory: Where to keep the copy (default: the temp directory);
+            it is reused as long as the source file is unchanged
+
+    Returns:
+        Path of the rewritten .onnx file
+    """
+    stat = os.stat(model_path)
+    key = hashlib.sha1(f"{os.path.realpath(model_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()
+    root = os.path.join(directory or tempfile.gettempdir(), "kittentts-prefork")
+    target_dir = os.path.join(root, key[:16])
+    target = os.path.join(target_dir, "model.onnx")
+    if os.path.exists(target):
+        return target
+
+    import onnx
+
+    os.makedirs(root, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=root)
+    try:
+        onnx.save_model(onnx.load(model_path), os.path.join(staging, "model.onnx"), save_as_external_data=True,
+                        all_tensors_to_one_file=True, location="model.weights",
+                        size_threshold=_EXTERNAL_THRESHOLD)
+        os.rename(staging, target_dir)
+    except OSError:
+        # Another process finished first.
+        if not os.path.exists(target):
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return target
+
+
+def _after_fork_in_child() -> None:
+    for instance in list(_instances):
+        instance._lock = threading.Lock()
+        if instance._engine is not None:
+            _orphans.append(instance._engine)
+            instance._engine = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class PreforkModel:
+    """KittenTTS_1_Onnx stand-in that loads its engine lazily in every process.
+
+    Metadata (available_voices, voice_aliases, speed_priors, is_ready,
+    warmup_seconds and instrumentation) is answered without an engine, so
+    a parent can serve health checks before forking. Any other attribute
+    access (generate, warmup, ...) is forwarded to the current process's
+    engine, which is created on first use.
+
+    Args:
+        model_path: Self-contained .onnx model
+        voices_path: Voices .npz file
+        prepack: Let onnxruntime prepack weights (faster, but private per worker)
+        cache_dir: Directory for the externalized model copy
+        session_options: Dict of onnxruntime.SessionOptions attributes
+        **model_kwargs: Further KittenTTS_1_Onnx options; a ``session_config``
+            is merged over the prepacking entry
+    """
+
+    def __init__(self, model_path: str, voices_path: str, prepack: bool = False, cache_dir: Optional[str] = None,
+                 session_options: Optional[dict] = None, **model_kwargs):
+        self.model_path = externalize_weights(model_path, cache_dir)
+        with np.load(voices_path) as voices:
+            self.voices = {name: voices[name] for name in voices.files}
+        self._config_entries = {} if prepack else {"session.disable_prepacking": "1"}
+        self._config_entries.update(model_kwargs.pop("session_config", None) or {})
+        self._session_options = session_options
+        self.speed_priors = model_kwargs.get("speed_priors", {})
+        self.voice_aliases = model_kwargs.get("voice_aliases", {})
+        self._model_kwargs = model_kwargs
+        self._engine = None
+        self._lock = threading.Lock()
+        _instances.add(self)
+
+    @property
+    def engine(self):
+        """This process's KittenTTS_1_Onnx, created on first use."""
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    from .onnx_model import KittenTTS_1_Onnx
+
+                    self._engine = KittenTTS_1_Onnx(
+                        model_path=self.model_path, voices_path=self.voices, session_options=self._session_options,
+                        session_config=self._config_entries, **self._model_kwargs)
+        return self._engine
+
+    @property
+    def available_voices(self):
+        from .onnx_model import AVAILABLE_VOICES
+
+        return list(AVAILABLE_VOICES)
+
+    @property
+    def all_voice_names(self):
+        from .onnx_model import VOICE_NAMES
+
+        return list(VOICE_NAMES)
+
+    @property
+    def is_ready(self) -> bool:
+        """True once this process's engine has been warmed up."""
+        return self._engine is not None and self._engine.is_ready
+
+    @property
+    def warmup_seconds(self):
+        return self._engine.warmup_seconds if self._engine is not None else None
+
+    @property
+    def instrumentation(self):
+        if self._engine is not None:
+            return self._engine.instrumentation
+        from .instrumentation import NULL_INSTRUMENTATION, bound_instrumentation
+
+        return bound_instrumentation() or self._model_kwargs.get("instrumentation") or NULL_INSTRUMENTATION
+
+    @instrumentation.setter
+    def instrumentation(self, value):
+        # Kept for the engines created later, in this process or in forked ones.
+        self._model_kwargs["instrumentation"] = value
+        if self._engine is not None:
+            self._engine.instrumentation = value
+
+    def close(self) -> None:
+        """Release this process's engine; the next call creates a new one."""
+        engine, self._engine = self._engine, None
+        if engine is not None:
+            engine.close()
+
+    def __getattr__(self, name):
+        # Only reached for attributes PreforkModel does not define itself.
+        if name.startswith("__") or name in ("_engine", "_lock"):
+            raise AttributeError(name)
+        return getattr(self.engine, name)
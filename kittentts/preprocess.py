@@ -779,6 +779,12 @@ _NON_BOUNDARY_ABBREVIATIONS = {
 }
 
 
+_SENTENCE_END_RE = re.compile(r"[.!?]")
+_TRAILING_MERIDIEM_RE = re.compile(r"\b[ap]\.m$", re.IGNORECASE)
+_NON_SPACE_RE = re.compile(r"\S")
+_ASCII_LETTERS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")
+
+
 def ensure_punctuation(text: str) -> str:
     """Ensure a chunk ends with prosodic punctuation."""
     text = text.strip()
@@ -796,37 +802,42 @@ def _is_sentence_boundary(text: str, index: int) -> bool:
     if char == ".":
         if 0 < index < len(text) - 1 and text[index - 1].isdigit() and text[index + 1].isdigit():
             return False
-        before = text[:index]
-        token_match = re.search(r"([A-Za-z]+)$", before)
-        token = token_match.group(1).lower() if token_match else ""
+        # Scan outward from the period instead of slicing the rest of the
+        # text, so splitting a document stays linear in its length. Like
+        # the regex "$" this replaced, the word may end before one newline.
+        end = index - 1 if index and text[index - 1] == "\n" else index
+        start = end
+        while start > 0 and text[start - 1] in _ASCII_LETTERS:
+            start -= 1
+        token = text[start:end].lower()
         if token in _NON_BOUNDARY_ABBREVIATIONS:
             return False
         if token in {"a", "p"} and index + 1 < len(text) and text[index + 1].lower() == "m":
             return False
-        if token == "m" and re.search(r"\b[ap]\.m$", before, re.IGNORECASE):
-            next_text = text[index + 1:].strip()
-            return not next_text or next_text[:1].isupper()
-    next_text = text[index + 1:]
-    return not next_text or next_text[:1].isspace()
+        if token == "m" and _TRAILING_MERIDIEM_RE.search(text[max(0, end - 4):end]):
+            next_char = _NON_SPACE_RE.search(text, index + 1)
+            return next_char is None or next_char.group().isupper()
+    return index + 1 == len(text) or text[index + 1].isspace()
 
 
-def chunk_text(text: str, max_len: int = 400) -> List[str]:
-    """Split text into chunks without treating common abbreviations as sentences."""
+def split_sentences(text: str) -> List[str]:
+    """Split text at sentence ends, keeping abbreviations and decimals intact."""
     sentences = []
     start = 0
-    for index, _ in enumerate(text):
+    for match in _SENTENCE_END_RE.finditer(text):
+        index = match.start()
         if _is_sentence_boundary(text, index):
             sentences.append(text[start:index + 1])
             start = index + 1
     if start < len(text):
         sentences.append(text[start:])
+    return [sentence.strip() for sentence in sentences if sentence.strip()]
 
-    chunks = []
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
 
+def chunk_text(text: str, max_len: int = 400) -> List[str]:
+    """Split text into chunks without treating common abbreviations as sentences."""
+    chunks = []
+    for sentence in split_sentences(text):
         if len(sentence) <= max_len:
             chunks.append(ensure_punctuation(sentence))
         else:
@@ -845,6 +856,142 @@ def chunk_text(text: str, max_len: int = 400) -> List[str]:
     return chunks
 
 
+# Phoneme tokens per feature of normalized text, fitted against espeak output
+# on the textbench corpus (mean error about 8%, 95th percentile about 20%).
+_TOKENS_PER_LETTER = 0.65
+_TOKENS_PER_DIGIT = 5.2
+_TOKENS_PER_WORD = 3.1
+_TOKENS_PER_PUNCTUATION = 3.1
+_TOKENS_PER_SYMBOL = 2.1
+_ESTIMATE_RE = re.compile(r"([^\W\d_]+|')|(\d+)|([,.;:!?])|(\S)")
+_CLAUSE_END_RE = re.compile(r"(?<=[,;:])\s+")
+# A space joins packed pieces; ensure_punctuation may append a comma.
+_JOIN_TOKENS = 1
+_CLOSING_TOKENS = 1
+
+DEFAULT_TOKEN_BUDGET = 400
+# Smallest budget any single character fits in: a spelled-out letter ("w")
+# takes up to 10 phoneme tokens, plus framing and a closing comma.
+MIN_TOKEN_BUDGET = 16
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the phoneme tokens espeak produces for normalized ``text``.
+
+    Cheap enough to run on every candidate segment; excludes the framing
+    tokens (tokenizer.FRAMING_TOKENS) every chunk carries.
+    """
+    letters = digits = words = punctuation = symbols = 0
+    for match in _ESTIMATE_RE.finditer(text):
+        word, number, mark, _ = match.groups()
+        if word:
+            letters += len(word)
+            words += 1
+        elif number:
+            digits += len(number)
+            words += 1
+        elif mark:
+            punctuation += 1
+        else:
+            symbols += 1
+    estimate = (_TOKENS_PER_LETTER * letters + _TOKENS_PER_DIGIT * digits + _TOKENS_PER_WORD * words
+                + _TOKENS_PER_PUNCTUATION * punctuation + _TOKENS_PER_SYMBOL * symbols)
+    return max(1, round(estimate)) if text.strip() else 0
+
+
+def _split_word(word: str, tokens: int, budget: int, count_tokens: Callable[[str], int]) -> List[Tuple[str, int]]:
+    """Cut ``word`` into equal parts, recounting each and cutting again any still over budget."""
+    if len(word) == 1:
+        return [(word, tokens)]
+    pieces = min(-(-tokens // budget), len(word))
+    size = -(-len(word) // pieces)
+    return [piece for start in range(0, len(word), size)
+            for piece in _fit_segment(word[start:start + size], budget, count_tokens)]
+
+
+def _fit_segment(segment: str, budget: int, count_tokens: Callable[[str], int],
+                 tokens: Optional[int] = None) -> List[Tuple[str, int]]:
+    """(piece, tokens) pairs of ``segment``, each within ``budget``.
+
+    Oversized text is split at clause punctuation first, then between
+    words; a single word over budget is cut into equal parts, down to
+    single characters.
+    """
+    tokens = count_tokens(segment) if tokens is None else tokens
+    if tokens <= budget:
+        return [(segment, tokens)]
+    clauses = _CLAUSE_END_RE.split(segment)
+    if len(clauses) > 1:
+        return [piece for clause in clauses for piece in _fit_segment(clause, budget, count_tokens)]
+    words = segment.split()
+    if len(words) == 1:
+        return _split_word(segment, tokens, budget, count_tokens)
+    return [piece for word in words for piece in _fit_segment(word, budget, count_tokens)]
+
+
+def chunk_by_tokens(text: str, max_tokens: int = DEFAULT_TOKEN_BUDGET,
+                    count_tokens: Optional[Callable[[str], int]] = None, strict: bool = False) -> List[str]:
+    """Split text into chunks of at most ``max_tokens`` model input IDs.
+
+    Sentences are packed into each chunk until the next one would exceed
+    the budget. A sentence over budget is split at commas, semicolons and
+    colons, and a clause still over budget between words; the pieces are
+    packed the same way.
+
+    Args:
+        text: Normalized text
+        max_tokens: Budget per chunk, including the framing tokens
+        count_tokens: Phoneme-token count of a text; estimate_tokens by
+            default, or an exact count from phonemizing
+        strict: Recount every packed chunk and split again any that came
+            out over budget (phonemizing joined text can differ from the
+            sum of its parts by a token or two)
+
+    Raises:
+        ValueError: If max_tokens leaves no room for phonemes.
+    """
+    from .tokenizer import FRAMING_TOKENS
+
+    budget = max_tokens - FRAMING_TOKENS - _CLOSING_TOKENS
+    if budget < 1:
+        raise ValueError(f"max_tokens must be at least {FRAMING_TOKENS + _CLOSING_TOKENS + 1}")
+    count_tokens = count_tokens or estimate_tokens
+
+    chunks = []
+    current = []
+    used = 0
+    for sentence in split_sentences(text):
+        for piece, tokens in _fit_segment(sentence, budget, count_tokens):
+            if current and used + _JOIN_TOKENS + tokens > budget:
+                chunks.append(ensure_punctuation(" ".join(current)))
+                current = []
+                used = 0
+            used += tokens + (_JOIN_TOKENS if current else 0)
+            current.append(piece)
+    if current:
+        chunks.append(ensure_punctuation(" ".join(current)))
+    if strict:
+        chunks = [piece for chunk in chunks for piece in _enforce_budget(chunk, max_tokens, count_tokens)]
+    return chunks
+
+
+def _enforce_budget(chunk: str, max_tokens: int, count_tokens: Callable[[str], int]) -> List[str]:
+    """``chunk``, or its re-chunking with a budget lowered by the overshoot.
+
+    The lowered budget is clamped to the smallest one chunk_by_tokens
+    accepts, and a chunk that can't be split any further is kept as it is.
+    """
+    from .tokenizer import FRAMING_TOKENS
+
+    over = count_tokens(chunk) + FRAMING_TOKENS - max_tokens
+    if over <= 0:
+        return [chunk]
+    pieces = chunk_by_tokens(chunk, max(max_tokens - over, FRAMING_TOKENS + _CLOSING_TOKENS + 1), count_tokens)
+    if len(pieces) == 1 or chunk in pieces:
+        return [chunk]
+    return [piece for part in pieces for piece in _enforce_budget(part, max_tokens, count_tokens)]
+
+
 def _sub_with_spans(
     text: str,
     origins: List[Optional[int]],
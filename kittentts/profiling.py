@@ -0,0 +1,118 @@
+"""
+profiling.py
+Summaries of onnxruntime profiler traces.
+
+Load a model with ``enable_profiling=True``, run a workload, then call
+``model.end_profiling()`` to get the trace path and ``summarize_profile`` to
+turn it into per-operator, per-op-type and per-scope tables. The scope is the
+first component of an exported node name (e.g. ``/decoder/...`` -> ``decoder``),
+which separates the acoustic model from the vocoder in exported graphs.
+"""
+
+import json
+from typing import Dict, List, Optional
+
+_KERNEL_SUFFIX = "_kernel_time"
+
+
+def _scope(node_name: str) -> str:
+    parts = [part for part in node_name.split("/") if part]
+    return parts[0] if len(parts) > 1 else "(root)"
+
+
+def _table(totals: Dict[str, dict], grand_total: float) -> List[dict]:
+    rows = []
+    for name, entry in totals.items():
+        row = {"name": name}
+        row.update(entry)
+        row["share"] = entry["total_us"] / grand_total if grand_total else 0.0
+        row["mean_us"] = entry["total_us"] / entry["calls"]
+        rows.append(row)
+    rows.sort(key=lambda row: row["total_us"], reverse=True)
+    return rows
+
+
+def summarize_profile(path_or_events) -> dict:
+    """Aggregate kernel times from an onnxruntime profile trace.
+
+    Args:
+        path_or_events: Path to the trace JSON written by onnxruntime, or the
+            already-parsed list of trace events
+
+    Returns:
+        Dict with "total_us", "runs", "arena_growth_events" and
+        "arena_growth_bytes" (how often and by how much the CPU arena had to
+        grow, i.e. fresh allocations from the system), and the lists "nodes",
+        "op_types" and "scopes". Each row has name, calls, total_us, mean_us
+        and share (fraction of total kernel time); node rows also carry
+        op_type and provider. Rows are sorted by total time, largest first.
+    """
+    if isinstance(path_or_events, str):
+        with open(path_or_events, "r", encoding="utf-8") as f:
+            events = json.load(f)
+    else:
+        events = path_or_events
+
+    nodes: Dict[str, dict] = {}
+    op_types: Dict[str, dict] = {}
+    scopes: Dict[str, dict] = {}
+    total = 0.0
+    runs = 0
+    arena_growth_events = 0
+    arena_growth_bytes = 0
+    for event in events:
+        name = event.get("name", "")
+        if event.get("cat") == "Session" and name == "model_run":
+            runs += 1
+            continue
+        if event.get("cat") != "Node" or not name.endswith(_KERNEL_SUFFIX):
+            continue
+
+        node_name = name[:-len(_KERNEL_SUFFIX)]
+        args = event.get("args", {})
+        op_type = args.get("op_name", "?")
+        duration = float(event.get("dur", 0))
+        total += duration
+        arena_delta = int(args.get("mem_arena_held_delta", 0) or 0)
+        if arena_delta > 0:
+            arena_growth_events += 1
+            arena_growth_bytes += arena_delta
+
+        node = nodes.setdefault(node_name, {
+            "op_type": op_type, "provider": args.get("provider", "?"), "calls": 0, "total_us": 0.0,
+        })
+        for entry in (node, op_types.setdefault(op_type, {"calls": 0, "total_us": 0.0}),
+                      scopes.setdefault(_scope(node_name), {"calls": 0, "total_us": 0.0})):
+            entry["calls"] += 1
+            entry["total_us"] += duration
+
+    return {
+        "total_us": total,
+        "runs": runs,
+        "arena_growth_events": arena_growth_events,
+        "arena_growth_bytes": arena_growth_bytes,
+        "nodes": _table(nodes, total),
+        "op_types": _table(op_types, total),
+        "scopes": _table(scopes, total),
+    }
+
+
+def format_profile_table(summary: dict, by: str = "op_types", top: Optional[int] = 20) -> str:
+    """Render one table of a ``summarize_profile`` result as text.
+
+    Args:
+        summary: Output of summarize_profile
+        by: "op_types", "nodes" or "scopes"
+        top: Number of rows to show (None shows all)
+    """
+    rows = summary[by][:top] if top else summary[by]
+    width = max([len("name")] + [len(row["name"]) for row in rows])
+    width = min(width, 60)
+    lines = [f"{'name':<{width}}  {'calls':>7}  {'total ms':>10}  {'mean us':>9}  {'share':>6}"]
+    for row in rows:
+        name = row["name"] if len(row["name"]) <= width else "..." + row["name"][-(width - 3):]
+        lines.append(
+            f"{name:<{width}}  {row['calls']:>7}  {row['total_us'] / 1000:>10.2f}  "
+            f"{row['mean_us']:>9.1f}  {row['share']:>6.1%}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,203 @@
+"""
+quantize.py
+Offline quantization of KittenTTS models with validation against fp32.
+
+``quantize_model`` writes int8 (dynamic and/or static) and optionally fp16
+variants of a downloaded model using onnxruntime's quantization tooling.
+Each variant is a self-contained model directory (config.json, model and
+voices) that ``KittenTTS`` can load directly. ``validate_variants`` then
+synthesizes a fixed text set with every variant and reports speedup, size
+and waveform/spectral distance to the fp32 output.
+
+Requires the optional ``onnx`` package.
+"""
+
+import json
+import os
+import shutil
+import statistics
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+VARIANTS = ("dynamic", "static", "fp16")
+
+VALIDATION_TEXTS = [
+    "The quick brown fox jumps over the lazy dog.",
+    "One day, a little girl named Lily found a needle in her room.",
+    "Dr. Rivera paid $12.50 at 3:05 p.m. on May 5, 2026.",
+    "Is it raining outside? I think we should bring an umbrella, just in case!",
+    "Kitten TTS is an open-source, lightweight text-to-speech library built on ONNX.",
+]
+
+
+def waveform_distance(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Relative L2 distance over the overlapping samples (0 = identical)."""
+    n = min(reference.shape[-1], candidate.shape[-1])
+    ref = reference[..., :n].astype(np.float64)
+    diff = candidate[..., :n].astype(np.float64) - ref
+    norm = np.linalg.norm(ref)
+    return float(np.linalg.norm(diff) / norm) if norm else float(np.linalg.norm(diff))
+
+
+def _power_spectrogram(audio: np.ndarray, n_fft: int, hop: int) -> np.ndarray:
+    audio = np.ravel(audio).astype(np.float64)
+    if audio.shape[0] < n_fft:
+        audio = np.pad(audio, (0, n_fft - audio.shape[0]))
+    frames = np.lib.stride_tricks.sliding_window_view(audio, n_fft)[::hop]
+    return np.abs(np.fft.rfft(frames * np.hanning(n_fft), axis=-1)) ** 2
+
+
+def log_spectral_distance(reference: np.ndarray, candidate: np.ndarray,
+                          n_fft: int = 1024, hop: int = 256) -> float:
+    """Mean log-spectral distance in dB over the overlapping frames."""
+    ref = _power_spectrogram(reference, n_fft, hop)
+    cand = _power_spectrogram(candidate, n_fft, hop)
+    n = min(ref.shape[0], cand.shape[0])
+    eps = 1e-10
+    diff = 10 * np.log10(ref[:n] + eps) - 10 * np.log10(cand[:n] + eps)
+    return float(np.mean(np.sqrt(np.mean(diff ** 2, axis=-1))))
+
+
+class _CalibrationReader:
+    """Feeds model inputs for a set of texts to onnxruntime's static quantizer."""
+
+    def __init__(self, model, texts: Iterable[str], voices: Sequence[str]):
+        self._feeds = iter([
+            model._prepare_inputs(chunk, voice)
+            for text in texts
+            for chunk in model._chunks(text, clean_text=True)
+            for voice in voices
+        ])
+
+    def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+        return next(self._feeds, None)
+
+
+def _write_variant_dir(directory: str, config: dict, model_file: str, voices_path: str) -> None:
+    config = dict(config, model_file=os.path.basename(model_file))
+    shutil.copyfile(voices_path, os.path.join(directory, config["voices"]))
+    with open(os.path.join(directory, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+
+def quantize_model(model: str, output_dir: str, variants: Sequence[str] = ("dynamic", "static"),
+                   calibration_texts: Optional[List[str]] = None, calibration_voices: Sequence[str] = ("Jasper",),
+                   cache_dir: Optional[str] = None) -> Dict[str, str]:
+    """Produce quantized variants of a model.
+
+    Args:
+        model: Hugging Face repository ID or local model directory
+        output_dir: Directory receiving one sub-directory per variant
+        variants: Any of "dynamic" (int8 weights), "static" (int8 weights and
+            activations, calibrated on calibration_texts) and "fp16"
+        calibration_texts: Texts for static calibration (default: VALIDATION_TEXTS)
+        calibration_voices: Voices used to produce calibration inputs
+        cache_dir: Hugging Face cache directory
+
+    Returns:
+        Dict mapping "fp32" and every variant name to its model directory.
+    """
+    from onnxruntime import quantization as ortq
+
+    from .get_model import resolve_model_files
+    from .onnx_model import KittenTTS_1_Onnx
+
+    unknown = set(variants) - set(VARIANTS)
+    if unknown:
+        raise ValueError(f"Unknown variants {sorted(unknown)}. Choose from: {list(VARIANTS)}")
+
+    config, model_path, voices_path = resolve_model_files(model, cache_dir)
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    directories = {}
+
+    fp32_dir = os.path.join(output_dir, "fp32")
+    os.makedirs(fp32_dir, exist_ok=True)
+    shutil.copyfile(model_path, os.path.join(fp32_dir, os.path.basename(model_path)))
+    _write_variant_dir(fp32_dir, config, model_path, voices_path)
+    directories["fp32"] = fp32_dir
+
+    for variant in variants:
+        directory = os.path.join(output_dir, variant)
+        os.makedirs(directory, exist_ok=True)
+        suffix = "fp16" if variant == "fp16" else f"int8-{variant}"
+        target = os.path.join(directory, f"{name}-{suffix}.onnx")
+
+        if variant == "dynamic":
+            ortq.quantize_dynamic(model_path, target, weight_type=ortq.QuantType.QInt8)
+        elif variant == "static":
+            reference = KittenTTS_1_Onnx(model_path=model_path, voices_path=voices_path,
+                                         speed_priors=config.get("speed_priors", {}),
+                                         voice_aliases=config.get("voice_aliases", {}))
+            reader = _CalibrationReader(reference, calibration_texts or VALIDATION_TEXTS, calibration_voices)
+            ortq.quantize_static(model_path, target, reader, quant_format=ortq.QuantFormat.QDQ,
+                                 activation_type=ortq.QuantType.QUInt8, weight_type=ortq.QuantType.QInt8)
+        else:
+            import onnx
+            from onnxruntime.transformers.float16 import convert_float_to_float16
+
+            converted = convert_float_to_float16(onnx.load(model_path), keep_io_types=True)
+            onnx.save(converted, target)
+
+        _write_variant_dir(directory, config, target, voices_path)
+        directories[variant] = directory
+    return directories
+
+
+def _time_synthesis(model, texts: List[str], voice: str, repeat: int):
+    outputs = [model.generate(text, voice=voice) for text in texts]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            model.generate(text, voice=voice)
+        timings.append(time.perf_counter() - start)
+    return outputs, statistics.median(timings)
+
+
+def validate_variants(directories: Dict[str, str], texts: Optional[List[str]] = None,
+                      voice: str = "Jasper", repeat: int = 3) -> List[dict]:
+    """Compare every variant against the "fp32" entry of ``directories``.
+
+    Returns:
+        One dict per variant (fp32 first) with size_mb, seconds, speedup,
+        waveform_distance, log_spectral_distance_db and duration_ratio.
+    """
+    from .get_model import download_from_huggingface, resolve_model_files
+
+    texts = texts or VALIDATION_TEXTS
+    rows = []
+    reference_outputs = None
+    reference_seconds = None
+    for variant in ["fp32"] + [v for v in directories if v != "fp32"]:
+        _, model_path, _ = resolve_model_files(directories[variant])
+        model = download_from_huggingface(directories[variant])
+        outputs, seconds = _time_synthesis(model, texts, voice, repeat)
+        if reference_outputs is None:
+            reference_outputs, reference_seconds = outputs, seconds
+
+        pairs = list(zip(reference_outputs, outputs))
+        rows.append({
+            "variant": variant,
+            "path": model_path,
+            "size_mb": os.path.getsize(model_path) / (1024 * 1024),
+            "seconds": seconds,
+            "speedup": reference_seconds / seconds if seconds else None,
+            "waveform_distance": statistics.mean(waveform_distance(r, c) for r, c in pairs),
+            "log_spectral_distance_db": statistics.mean(log_spectral_distance(r, c) for r, c in pairs),
+            "duration_ratio": sum(c.shape[-1] for _, c in pairs) / sum(r.shape[-1] for r, _ in pairs),
+        })
+    return rows
+
+
+def format_validation_table(rows: List[dict]) -> str:
+    """Render validate_variants output as a text table."""
+    lines = [f"{'variant':<10} {'size MB':>8} {'speedup':>8} {'wave dist':>10} {'LSD dB':>8} {'dur ratio':>10}"]
+    for row in rows:
+        lines.append(
+            f"{row['variant']:<10} {row['size_mb']:>8.1f} {row['speedup']:>7.2f}x "
+            f"{row['waveform_distance']:>10.4f} {row['log_spectral_distance_db']:>8.2f} "
+            f"{row['duration_ratio']:>10.3f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,129 @@
+"""
+registry.py
+Process-wide, reference-counted sharing of loaded models.
+
+Loading a model builds an InferenceSession, an espeak backend, a text
+preprocessor and the voices table. ``ModelRegistry.acquire`` returns the
+already loaded ``KittenTTS_1_Onnx`` for an identical configuration and counts
+the reference; ``release`` drops it again once the last user is done.
+``KittenTTS(..., shared=True)`` uses the default registry and releases its
+reference in ``close()``.
+
+Instrumentation is not part of a configuration: it belongs to each handle,
+which binds it around its calls (kittentts.instrumentation.bind).
+"""
+
+import os
+import threading
+from concurrent.futures import Future
+from typing import Dict, Hashable, Optional
+
+
+def _freeze(value) -> Hashable:
+    """Hashable stand-in for option values (dicts, lists, sets)."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(item) for item in value))
+    try:
+        hash(value)
+    except TypeError:
+        return ("id", id(value))
+    return value
+
+
+def registry_key(repo_id: str, revision: Optional[str] = None, backend: Optional[str] = None,
+                 session_options: Optional[dict] = None, **model_kwargs) -> tuple:
+    """Key identifying one model configuration.
+
+    Local directories are keyed by their absolute path. Options that are not
+    plain values (e.g. a lexicon object) are keyed by identity.
+
+    Raises:
+        ValueError: If ``instrumentation`` is passed; it is set per handle.
+    """
+    if "instrumentation" in model_kwargs:
+        raise ValueError("instrumentation is not part of a shared model's configuration; set it on the handle")
+    if os.path.isdir(repo_id):
+        repo_id = os.path.abspath(repo_id)
+    return (repo_id, revision, backend, _freeze(session_options or {}), _freeze(model_kwargs))
+
+
+class _Entry:
+    __slots__ = ("future", "refs")
+
+    def __init__(self):
+        self.future = Future()
+        self.refs = 0
+
+    @property
+    def model(self):
+        return self.future.result()
+
+
+class ModelRegistry:
+    """Loaded models shared by configuration, with reference counting."""
+
+    def __init__(self):
+        self._entries: Dict[tuple, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, repo_id: str, cache_dir: Optional[str] = None, revision: Optional[str] = None,
+                backend: Optional[str] = None, session_options: Optional[dict] = None, **model_kwargs):
+        """Return the shared model for this configuration, loading it if needed.
+
+        Every call must be paired with a ``release`` of the returned key.
+
+        Returns:
+            Tuple of (registry key, KittenTTS_1_Onnx)
+        """
+        from .get_model import download_from_huggingface
+
+        key = registry_key(repo_id, revision, backend, session_options, **model_kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            loading = entry is None
+            if loading:
+                entry = self._entries[key] = _Entry()
+            entry.refs += 1
+
+        # Load outside the lock so unrelated models load concurrently; later
+        # users of the same key wait on the entry's future.
+        if loading:
+            try:
+                entry.future.set_result(download_from_huggingface(
+                    repo_id=repo_id, cache_dir=cache_dir, revision=revision, backend=backend,
+                    session_options=session_options, **model_kwargs))
+            except BaseException as exc:
+                with self._lock:
+                    del self._entries[key]
+                entry.future.set_exception(exc)
+                raise
+        return key, entry.model
+
+    def release(self, key: tuple) -> None:
+        """Drop one reference; the model is closed when none remain."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                raise ValueError("Model is not held by this registry")
+            entry.refs -= 1
+            if entry.refs:
+                return
+            del self._entries[key]
+        entry.model.close()
+
+    def refcount(self, key: tuple) -> int:
+        """Number of live references to the model under ``key``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.refs if entry else 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+default_registry = ModelRegistry()
@@ -0,0 +1,130 @@
+"""
+resample.py
+Polyphase resampling of model output to other sample rates.
+
+The models produce 24 kHz audio. ``Resampler`` converts it by the rational
+factor up/down (8 kHz is 1/3, 16 kHz is 2/3, 22.05 kHz is 147/160) with a
+Kaiser-windowed sinc low-pass split into ``up`` polyphase branches. Only the
+outputs that are kept are computed: each output sample is one dot product of
+a phase's taps with a strided window of the input, done for all outputs of
+a phase at once as a single matrix-vector product.
+
+The filter history and output position carry over between ``process``
+calls, so a stream resampled chunk by chunk is identical to resampling the
+concatenated audio, with no clicks at chunk boundaries. ``flush`` returns
+the last few samples still inside the filter. The filter is linear-phase and
+its delay is compensated, so the output is time-aligned with the input.
+"""
+
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Filter half-width in zero crossings of the lower of the two rates.
+DEFAULT_ZERO_CROSSINGS = 16
+# Passband edge relative to the lower Nyquist frequency.
+DEFAULT_ROLLOFF = 0.94
+DEFAULT_KAISER_BETA = 8.6
+
+
+class Resampler:
+    """Stateful polyphase resampler for mono float audio.
+
+    Args:
+        source_rate: Input sample rate in Hz
+        target_rate: Output sample rate in Hz
+        zero_crossings: Filter half-width; longer filters give a sharper
+            cutoff at more cost per sample
+        rolloff: Passband edge as a fraction of the lower Nyquist frequency
+        beta: Kaiser window shape (stopband attenuation)
+
+    Usage:
+        resampler = Resampler(24000, 8000)
+        for chunk in chunks:
+            send(resampler.process(chunk))
+        send(resampler.flush())
+    """
+
+    def __init__(self, source_rate: int, target_rate: int, zero_crossings: int = DEFAULT_ZERO_CROSSINGS,
+                 rolloff: float = DEFAULT_ROLLOFF, beta: float = DEFAULT_KAISER_BETA):
+        if source_rate <= 0 or target_rate <= 0:
+            raise ValueError("Sample rates must be positive")
+        divisor = math.gcd(int(source_rate), int(target_rate))
+        self.source_rate = int(source_rate)
+        self.target_rate = int(target_rate)
+        self.up = self.target_rate // divisor
+        self.down = self.source_rate // divisor
+
+        # Low-pass at the lower Nyquist frequency, in the upsampled domain,
+        # with gain ``up`` to make up for the inserted zeros.
+        width = max(self.up, self.down)
+        half = zero_crossings * width
+        offsets = np.arange(-half, half + 1)
+        cutoff = rolloff / (2 * width)
+        taps = 2 * cutoff * np.sinc(2 * cutoff * offsets) * np.kaiser(offsets.size, beta) * self.up
+        self._taps = -(-taps.size // self.up)
+        taps = np.concatenate([taps, np.zeros(self._taps * self.up - taps.size)])
+        # bank[p, j] multiplies x[i - j] for outputs at phase p; reversed so it
+        # lines up with a forward window of the input.
+        self._bank = np.ascontiguousarray(taps.reshape(self._taps, self.up).T[:, ::-1], dtype=np.float32)
+        self._delay = half
+        self.reset()
+
+    @property
+    def identity(self) -> bool:
+        return self.up == self.down
+
+    def reset(self) -> None:
+        """Forget the stream so far."""
+        self._history = np.zeros(self._taps - 1, dtype=np.float32)
+        self._received = 0
+        self._emitted = 0
+
+    def _emit(self, buffer: np.ndarray, start: int, end: int) -> np.ndarray:
+        """Outputs ``self._emitted`` to ``end``; buffer[0] is input sample ``start``."""
+        count = end - self._emitted
+        if count <= 0:
+            return np.zeros(0, dtype=np.float32)
+        out = np.empty(count, dtype=np.float32)
+        windows = sliding_window_view(buffer, self._taps)
+        for offset in range(min(self.up, count)):
+            index, phase = divmod((self._emitted + offset) * self.down + self._delay, self.up)
+            first = index - start - (self._taps - 1)
+            rows = len(range(offset, count, self.up))
+            out[offset::self.up] = windows[first:first + (rows - 1) * self.down + 1:self.down] @ self._bank[phase]
+        self._emitted = end
+        return out
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """Resample the next piece of a stream."""
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        if self.identity:
+            return audio
+        start = self._received - (self._taps - 1)
+        buffer = np.concatenate([self._history, audio])
+        self._received += audio.size
+        # Outputs whose newest input sample has arrived.
+        end = max(-(-(self._received * self.up - self._delay) // self.down), self._emitted)
+        out = self._emit(buffer, start, end)
+        self._history = buffer[buffer.size - (self._taps - 1):]
+        return out
+
+    def flush(self) -> np.ndarray:
+        """Return the samples still in the filter and reset for a new stream."""
+        if self.identity:
+            return np.zeros(0, dtype=np.float32)
+        total = -(-self._received * self.up // self.down)
+        padding = np.zeros(self._delay // self.up + 2, dtype=np.float32)
+        start = self._received - (self._taps - 1)
+        out = self._emit(np.concatenate([self._history, padding]), start, total)
+        self.reset()
+        return out
+
+
+def resample(audio: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Resample a whole mono signal; returns float32 audio at ``target_rate``."""
+    resampler = Resampler(source_rate, target_rate)
+    if resampler.identity:
+        return audio
+    return np.concatenate([resampler.process(audio), resampler.flush()])
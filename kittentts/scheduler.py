@@ -0,0 +1,248 @@
+"""
+scheduler.py
+Cost-aware request queue with deadline admission control.
+
+With request sizes from two words to whole pages, a FIFO queue lets one
+long page hold up every short reply behind it. ``Scheduler`` runs requests
+on one dispatcher thread and orders its queue by their predicted cost
+(kittentts.cost):
+
+* ``"sjf"``: shortest predicted job first, which minimizes mean latency
+* ``"edf"``: earliest deadline first; requests without a deadline go last
+* ``"fifo"``: arrival order
+
+A request may carry a deadline in seconds. At submission the scheduler
+simulates the queue in policy order with the new request in it. It rejects
+the request with ``RequestRejected`` when the request would finish late,
+or when the request would push a queued request past a deadline that it
+could otherwise meet. A request that still overruns its deadline once
+running is cancelled at the deadline (``SynthesisCancelled``).
+
+The scheduler tracks how its predictions compare with the measured run
+times and corrects later predictions by that ratio. A cost model fitted on
+a quieter machine, or for another model, therefore adapts to the actual
+throughput.
+"""
+
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+from .cancellation import CancellationToken
+from .instrumentation import bind
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("sjf", "edf", "fifo")
+# Weight of the newest measurement in the running prediction correction.
+_CORRECTION_WEIGHT = 0.2
+
+
+class RequestRejected(Exception):
+    """A request the scheduler predicts can't be served in time.
+
+    Attributes:
+        estimate: The request's cost estimate (see CostModel.estimate)
+        finish_seconds: Predicted seconds from submission to completion
+    """
+
+    def __init__(self, message: str, estimate: dict, finish_seconds: float):
+        super().__init__(message)
+        self.estimate = estimate
+        self.finish_seconds = finish_seconds
+
+
+class _Job:
+    __slots__ = ("text", "voice", "speed", "estimate", "seconds", "deadline", "future")
+
+    def __init__(self, text, voice, speed, estimate, seconds, deadline):
+        self.text = text
+        self.voice = voice
+        self.speed = speed
+        self.estimate = estimate
+        self.seconds = seconds
+        self.deadline = deadline
+        self.future = Future()
+
+
+class Scheduler:
+    """Run synthesis requests one at a time in cost- or deadline-aware order.
+
+    Args:
+        model: KittenTTS_1_Onnx; its cost_model predicts request cost, so
+            it must have been calibrated or given one
+        policy: "sjf", "edf" or "fifo"
+        clean_text: Normalize request text before synthesis
+        sample_rate: Output sample rate of every request
+        max_queue_seconds: Reject any request once the predicted backlog
+            (including it) exceeds this many seconds
+        slack: Factor applied to predictions in admission checks; above 1.0
+            leaves headroom for misprediction
+
+    Raises:
+        ValueError: If the policy is unknown or the model has no cost model.
+    """
+
+    def __init__(self, model, policy: str = "sjf", clean_text: bool = True, sample_rate: int = 24000,
+                 max_queue_seconds: Optional[float] = None, slack: float = 1.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}'. Choose from: {', '.join(POLICIES)}")
+        model.cost_model  # Raises now, rather than on the first submit, if there is none.
+        self.model = model
+        self.policy = policy
+        self.clean_text = clean_text
+        self.sample_rate = sample_rate
+        self.max_queue_seconds = max_queue_seconds
+        self.slack = slack
+        self.correction = 1.0
+        # Captured here: the dispatcher thread doesn't inherit the caller's bound instrumentation.
+        self.instrumentation = model.instrumentation
+        self._heap = []
+        self._sequence = itertools.count()
+        self._running = None
+        self._running_since = 0.0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._dispatch, name="kittentts-scheduler", daemon=True)
+        self._thread.start()
+
+    def _key(self, job: _Job):
+        if self.policy == "sjf":
+            return job.seconds
+        if self.policy == "edf":
+            return job.deadline if job.deadline is not None else math.inf
+        return 0
+
+    def _running_remaining(self, now: float) -> float:
+        if self._running is None:
+            return 0.0
+        return max(self._running.seconds - (now - self._running_since), 0.0)
+
+    def _late(self, entries, now: float) -> set:
+        """Sequence numbers of queued jobs predicted to finish after their deadline."""
+        finish = now + self._running_remaining(now)
+        late = set()
+        for _, sequence, job in sorted(entries):
+            finish += job.seconds * self.slack
+            if job.deadline is not None and finish > job.deadline:
+                late.add(sequence)
+        return late
+
+    def submit(self, text: str, voice: str = "expr-voice-5-m", speed: float = 1.0,
+               deadline: Optional[float] = None) -> Future:
+        """Queue a request.
+
+        Args:
+            text: Input text to synthesize
+            voice: Voice name or alias
+            speed: Speech speed
+            deadline: Seconds from now by which the audio must be complete
+
+        Returns:
+            concurrent.futures.Future resolving to the audio array
+
+        Raises:
+            RequestRejected: If the request is predicted to miss its deadline,
+                to make a queued request miss its own, or to overflow
+                max_queue_seconds.
+            ValueError: If the voice is not available or the scheduler is closed.
+        """
+        _, resolved_speed = self.model._resolve_voice(voice, speed)
+        if self.clean_text:
+            with self.instrumentation.span("preprocess"):
+                text = self.model.preprocessor(text)
+        # Estimate from chunks split without espeak: phonemizing here would run
+        # it on the caller's thread next to the dispatcher's synthesis, and
+        # espeak is not thread-safe. The dispatcher does the exact chunking.
+        estimate = self.model.cost_model.estimate(self.model._estimated_split(text), resolved_speed)
+        now = time.monotonic()
+        with self._condition:
+            if self._closed:
+                raise ValueError("Scheduler is closed")
+            job = _Job(text, voice, speed, estimate, estimate["seconds"] * self.correction,
+                       now + deadline if deadline is not None else None)
+            entry = (self._key(job), next(self._sequence), job)
+
+            if self.max_queue_seconds is not None:
+                backlog = self._running_remaining(now) + sum(queued.seconds for _, _, queued in self._heap)
+                if backlog + job.seconds > self.max_queue_seconds:
+                    raise RequestRejected(f"Queue is full ({backlog:.2f}s of predicted work)", estimate,
+                                          backlog + job.seconds)
+            if deadline is not None or any(queued.deadline is not None for _, _, queued in self._heap):
+                before = self._late(self._heap, now)
+                after = self._late(self._heap + [entry], now)
+                if after - before:
+                    finish = sum(queued.seconds for key, sequence, queued in self._heap + [entry]
+                                 if (key, sequence) <= entry[:2]) * self.slack + self._running_remaining(now)
+                    reason = ("would miss its deadline" if entry[1] in after
+                              else "would push a queued request past its deadline")
+                    raise RequestRejected(f"Request {reason} (predicted to finish in {finish:.2f}s)", estimate,
+                                          finish)
+
+            heapq.heappush(self._heap, entry)
+            self._condition.notify()
+        self.instrumentation.count("requests")
+        return job.future
+
+    @property
+    def queued_seconds(self) -> float:
+        """Predicted seconds of work queued or running."""
+        with self._condition:
+            return self._running_remaining(time.monotonic()) + sum(job.seconds for _, _, job in self._heap)
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._condition:
+                while not self._heap and not self._closed:
+                    self._condition.wait()
+                if not self._heap:
+                    return
+                _, _, job = heapq.heappop(self._heap)
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                self._running = job
+                self._running_since = time.monotonic()
+            try:
+                with bind(self.instrumentation):
+                    job.future.set_result(self._run(job))
+            except BaseException as exc:
+                job.future.set_exception(exc)
+            finally:
+                with self._condition:
+                    self._running = None
+
+    def _run(self, job: _Job):
+        model = self.model
+        token = None
+        if job.deadline is not None:
+            token = CancellationToken(max(job.deadline - time.monotonic(), 0.0))
+        start = time.perf_counter()
+        try:
+            chunks = model._chunks(job.text, False, count_request=False)
+            audio = model._collect(model._synthesize_chunks(chunks, job.voice, job.speed, cancel=token),
+                                   self.sample_rate)
+        finally:
+            if token is not None:
+                token.close()
+        if job.estimate["seconds"] > 0:
+            ratio = (time.perf_counter() - start) / job.estimate["seconds"]
+            self.correction += _CORRECTION_WEIGHT * (ratio - self.correction)
+        return audio
+
+    def close(self) -> None:
+        """Stop accepting requests, finish the queued ones and stop the dispatcher."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,157 @@
+"""
+session.py
+Per-conversation synthesis handles with warm text caches.
+
+A chatbot speaks thousands of short turns in one voice. Every ``generate``
+call resolves the voice alias and speed prior, then normalizes, chunks and
+phonemizes text it has often seen before ("Sure!", "Let me check.").
+``SynthesisSession`` (``model.synthesis_session(voice, speed)``) resolves
+the voice once and keeps two LRU caches for the session's lifetime:
+
+* text -> normalized chunks, which skips the preprocessor and chunker
+* chunk -> token IDs, which skips espeak and the tokenizer, also for a
+  repeated sentence inside a new turn
+
+Only inference runs for cached text. A session belongs to one conversation
+and is not thread-safe; create one per conversation (and, with a pre-fork
+model, inside the worker process).
+"""
+
+from collections import OrderedDict
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from .cancellation import as_token
+from .instrumentation import bind, bind_iter
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class _LRU:
+    """Minimal bounded mapping that forgets the least recently used entry."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value) -> None:
+        if self.size <= 0:
+            return
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.size:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class SynthesisSession:
+    """Fixed voice and speed for a conversation, with warm text caches.
+
+    Args:
+        model: KittenTTS_1_Onnx (or a stand-in forwarding to one)
+        voice: Voice name or alias, resolved once
+        speed: Speech speed; the voice's speed prior is applied once
+        clean_text: Normalize text (numbers, abbreviations, ...) before synthesis
+        sample_rate: Output sample rate; anything but 24000 is resampled
+        cache_size: Entries kept in each cache; 0 disables caching
+
+    Raises:
+        ValueError: If the voice is not available.
+    """
+
+    def __init__(self, model, voice: str = "expr-voice-5-m", speed: float = 1.0, clean_text: bool = True,
+                 sample_rate: int = 24000, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.model = model
+        self.voice, self.speed = model._resolve_voice(voice, speed)
+        self.clean_text = clean_text
+        self.sample_rate = sample_rate
+        self.instrumentation = model.instrumentation
+        self._texts = _LRU(cache_size)
+        self._tokens = _LRU(cache_size)
+
+    def _chunks(self, text: str) -> List[str]:
+        chunks = self._texts.get(text)
+        if chunks is None:
+            chunks = self.model._chunks(text, self.clean_text)
+            self._texts.put(text, chunks)
+        else:
+            self.instrumentation.count("requests")
+        return chunks
+
+    def _encode(self, chunks: List[str], cancel) -> Iterator[tuple]:
+        """Yield (chunk, token IDs) in order, encoding only the uncached chunks."""
+        cached = [self._tokens.get(chunk) for chunk in chunks]
+        missing = [chunk for chunk, input_ids in zip(chunks, cached) if input_ids is None]
+        encoded = self.model._encode_chunks(missing, cancel)
+        try:
+            for chunk, input_ids in zip(chunks, cached):
+                if input_ids is None:
+                    _, input_ids = next(encoded)
+                    self._tokens.put(chunk, input_ids)
+                elif cancel is not None:
+                    cancel.check()
+                yield chunk, input_ids
+        finally:
+            encoded.close()
+
+    def _audio(self, text: str, cancel) -> Iterator[np.ndarray]:
+        chunks = self._chunks(text)
+        return self.model._synthesize_encoded(self._encode(chunks, cancel), len(chunks), self.voice, self.speed,
+                                              cancel)
+
+    def say(self, text: str, cancel=None, timeout: Optional[float] = None) -> np.ndarray:
+        """Synthesize one turn.
+
+        Args:
+            text: Input text to synthesize
+            cancel: Optional kittentts.cancellation.CancellationToken
+            timeout: Optional deadline in seconds from now
+
+        Raises:
+            SynthesisCancelled: When cancelled or past the deadline; carries
+                the audio of the chunks completed so far.
+        """
+        token, owned = as_token(cancel, timeout)
+        try:
+            with bind(self.instrumentation):
+                return self.model._collect(self._audio(text, token), self.sample_rate)
+        finally:
+            if owned:
+                token.close()
+
+    def say_stream(self, text: str, cancel=None, timeout: Optional[float] = None) -> Iterator[np.ndarray]:
+        """Synthesize one turn chunk by chunk, like generate_stream.
+
+        Yields:
+            numpy.ndarray: Audio data for each text chunk.
+        """
+        token, owned = as_token(cancel, timeout)
+        try:
+            yield from bind_iter(self.model._stream(self._audio(text, token), self.sample_rate), self.instrumentation)
+        finally:
+            if owned:
+                token.close()
+
+    def cache_info(self) -> dict:
+        """Hits, misses and entries of the text and token caches."""
+        return {name: {"hits": cache.hits, "misses": cache.misses, "entries": len(cache)}
+                for name, cache in (("text", self._texts), ("tokens", self._tokens))}
+
+    def clear(self) -> None:
+        """Drop cached text and tokens, e.g. after the lexicon changed."""
+        self._texts = _LRU(self._texts.size)
+        self._tokens = _LRU(self._tokens.size)
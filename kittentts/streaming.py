@@ -0,0 +1,190 @@
+"""
+streaming.py
+Real-time paced streaming with bounded look-ahead.
+
+``PacedStream`` synthesizes on a background thread and hands audio to the
+consumer in order. It assumes the consumer plays audio in real time from
+the moment it receives the first chunk, and keeps synthesis at most
+``lookahead`` seconds of audio ahead of that playback clock. When the buffer
+is full the producer waits (backpressure), so a live stream costs CPU and
+memory in proportion to real time, not to the length of the text.
+
+If the consumer asks for audio after the playback clock has passed the end
+of everything it was given, the device would have run dry: that is counted
+as an underrun. The playback clock is then restarted from when audio
+arrived again.
+
+The background thread holds only the stream's buffer, not the stream. A
+stream dropped without ``close()`` is therefore still garbage collected,
+and that stops its producer and cancels the synthesis in progress.
+"""
+
+import collections
+import threading
+import time
+import weakref
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from .instrumentation import NULL_INSTRUMENTATION
+
+# Shortest producer wait while playback catches up, in seconds.
+_MIN_WAIT = 0.005
+
+
+class _Buffer:
+    """State shared by a PacedStream and its producer thread."""
+
+    def __init__(self, lookahead: float, sample_rate: int, clock: Callable[[], float], cancel):
+        self.lookahead = lookahead
+        self.sample_rate = sample_rate
+        self.clock = clock
+        self.cancel = cancel
+        self.queue = collections.deque()
+        self.cond = threading.Condition()
+        self.produced = 0
+        self.consumed = 0
+        self.start: Optional[float] = None
+        self.done = False
+        self.closed = False
+        self.error: Optional[BaseException] = None
+        self.max_buffered_seconds = 0.0
+
+    def played_seconds(self) -> float:
+        consumed = self.consumed / self.sample_rate
+        if self.start is None:
+            return 0.0
+        return min(consumed, self.clock() - self.start)
+
+    def ahead_seconds(self) -> float:
+        return self.produced / self.sample_rate - self.played_seconds()
+
+    def close(self) -> None:
+        """Stop the producer and cancel the synthesis it is waiting on."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        if self.cancel is not None:
+            self.cancel.cancel()
+
+
+def _produce(buffer: _Buffer, source: Iterable[np.ndarray]) -> None:
+    iterator = iter(source)
+    try:
+        for audio in iterator:
+            with buffer.cond:
+                buffer.queue.append(audio)
+                buffer.produced += audio.shape[-1]
+                buffer.max_buffered_seconds = max(buffer.max_buffered_seconds, buffer.ahead_seconds())
+                buffer.cond.notify_all()
+                while not buffer.closed and buffer.ahead_seconds() >= buffer.lookahead:
+                    buffer.cond.wait(max(buffer.ahead_seconds() - buffer.lookahead, _MIN_WAIT))
+                if buffer.closed:
+                    break
+    except BaseException as exc:  # handed to the consumer
+        with buffer.cond:
+            if not buffer.closed:
+                buffer.error = exc
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+        with buffer.cond:
+            buffer.done = True
+            buffer.cond.notify_all()
+
+
+class PacedStream:
+    """Iterate over audio produced ahead of a real-time playback clock.
+
+    Args:
+        source: Iterable of audio arrays, e.g. model.generate_stream(...);
+            it is consumed on a background thread
+        lookahead: Seconds of audio to keep ready ahead of playback
+        sample_rate: Sample rate of the audio
+        clock: Monotonic clock in seconds (for tests)
+        instrumentation: Optional Instrumentation receiving an "underruns" count
+        cancel: Optional kittentts.cancellation.CancellationToken driving
+            ``source``; closing or dropping the stream cancels it, which
+            also stops a running inference
+
+    Usage:
+        with model.generate_paced(text, lookahead=2.0) as stream:
+            for audio in stream:
+                device.write(audio)
+        print(stream.stats)
+    """
+
+    def __init__(self, source: Iterable[np.ndarray], lookahead: float = 2.0, sample_rate: int = 24000,
+                 clock: Callable[[], float] = time.monotonic, instrumentation=None, cancel=None):
+        if lookahead <= 0:
+            raise ValueError("lookahead must be positive")
+        self.lookahead = lookahead
+        self.sample_rate = sample_rate
+        self.instrumentation = instrumentation or NULL_INSTRUMENTATION
+        self._clock = clock
+        self._buffer = _Buffer(lookahead, sample_rate, clock, cancel)
+        self.underruns = 0
+        self.underrun_seconds = 0.0
+        self._thread = threading.Thread(target=_produce, args=(self._buffer, source), name="kittentts-paced",
+                                        daemon=True)
+        # Runs on close() or when the stream is garbage collected; must not reference self.
+        self._finalizer = weakref.finalize(self, self._buffer.close)
+        self._thread.start()
+
+    @property
+    def max_buffered_seconds(self) -> float:
+        return self._buffer.max_buffered_seconds
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> np.ndarray:
+        buffer = self._buffer
+        with buffer.cond:
+            while not buffer.queue and not buffer.done:
+                buffer.cond.wait()
+            if not buffer.queue:
+                if buffer.error is not None:
+                    raise buffer.error
+                raise StopIteration
+
+            now = self._clock()
+            if buffer.start is None:
+                buffer.start = now
+            else:
+                stall = now - (buffer.start + buffer.consumed / self.sample_rate)
+                if stall > 0:
+                    self.underruns += 1
+                    self.underrun_seconds += stall
+                    buffer.start += stall
+                    self.instrumentation.count("underruns")
+            audio = buffer.queue.popleft()
+            buffer.consumed += audio.shape[-1]
+            buffer.cond.notify_all()
+            return audio
+
+    @property
+    def stats(self) -> dict:
+        """Underruns, underrun_seconds, produced/consumed seconds and max_buffered_seconds."""
+        buffer = self._buffer
+        with buffer.cond:
+            return {
+                "underruns": self.underruns,
+                "underrun_seconds": self.underrun_seconds,
+                "produced_seconds": buffer.produced / self.sample_rate,
+                "consumed_seconds": buffer.consumed / self.sample_rate,
+                "max_buffered_seconds": buffer.max_buffered_seconds,
+            }
+
+    def close(self) -> None:
+        """Stop synthesis and wait for the producer thread to exit."""
+        self._finalizer()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,244 @@
+"""
+synth.py
+Bulk synthesis of a JSONL manifest into audio files (``kittentts synth``).
+
+Every manifest line is an object with a ``text`` and optionally an ``id``
+(default: the line number), a ``voice`` and a ``speed``. Each item is written
+to ``<out>/<id>.<format>``.
+
+* Items are assigned to shards by a hash of their ID, so several machines
+  can run ``--shard 0/4`` ... ``--shard 3/4`` over the same manifest and
+  output directory on a shared filesystem without coordination.
+* With ``jobs`` > 1 each worker process loads the model once and the CPU
+  cores are divided between their sessions.
+* Encoding and writing audio happens on background I/O threads while the
+  next items are synthesized.
+* Every finished file gets a line in ``<out>/results[-<i>-of-<n>].jsonl``
+  with its duration and timings. Audio is written to a temporary name and
+  renamed before that line is appended, so a rerun skips exactly the items
+  recorded there and redoes anything that was interrupted.
+"""
+
+import glob
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+_ITEM_ID = re.compile(r"^[\w.-]+$")
+AUDIO_FORMATS = {"wav": "WAV", "flac": "FLAC"}
+
+# Per-process model for worker processes, set by _init_worker.
+_worker = {}
+
+
+def read_manifest(path: str) -> List[dict]:
+    """Read and validate a JSONL manifest."""
+    items = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if not isinstance(item.get("text"), str):
+                raise ValueError(f"{path}:{line_number}: item has no text")
+            item["id"] = str(item.get("id", f"{line_number:08d}"))
+            if not _ITEM_ID.match(item["id"]):
+                raise ValueError(f"{path}:{line_number}: id {item['id']!r} is not usable as a file name")
+            if item["id"] in seen:
+                raise ValueError(f"{path}:{line_number}: duplicate id {item['id']!r}")
+            seen.add(item["id"])
+            items.append(item)
+    return items
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse "i/n" (0 <= i < n) into (i, n)."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/n, got {value!r}") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be in [0, {count}), got {value!r}")
+    return index, count
+
+
+def shard_of(item_id: str, count: int) -> int:
+    """Deterministic shard of an item, the same on every machine."""
+    return zlib.crc32(item_id.encode("utf-8")) % count
+
+
+def results_path(out_dir: str, shard: Tuple[int, int] = (0, 1)) -> str:
+    index, count = shard
+    suffix = f"-{index}-of-{count}" if count > 1 else ""
+    return os.path.join(out_dir, f"results{suffix}.jsonl")
+
+
+def completed_ids(out_dir: str) -> set:
+    """IDs recorded as written in any results file of ``out_dir``."""
+    done = set()
+    for path in glob.glob(os.path.join(out_dir, "results*.jsonl")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:  # line cut short by a crash
+                    continue
+                if "error" not in record and os.path.exists(os.path.join(out_dir, record["path"])):
+                    done.add(record["id"])
+    return done
+
+
+def _load_model(model_name: str, cache_dir: Optional[str], threads: Optional[int]):
+    from .get_model import KittenTTS
+
+    session_options = {"intra_op_num_threads": threads} if threads else None
+    return KittenTTS(model_name, cache_dir=cache_dir, session_options=session_options)
+
+
+def _init_worker(model_name, cache_dir, threads, options) -> None:
+    _worker.update(model=_load_model(model_name, cache_dir, threads), options=options)
+
+
+def _synthesize_item(model, item: dict, options: dict):
+    """Synthesize one item; returns (record, audio or None)."""
+    start = time.perf_counter()
+    record = {"id": item["id"], "voice": item.get("voice", options["voice"]),
+              "speed": item.get("speed", options["speed"]), "text_chars": len(item["text"]), "pid": os.getpid()}
+    try:
+        audio = model.generate(item["text"], voice=record["voice"], speed=record["speed"],
+                               clean_text=options["clean_text"], sample_rate=options["sample_rate"])
+    except Exception as exc:  # reported per item; the run goes on
+        record.update(error=f"{type(exc).__name__}: {exc}")
+        return record, None
+    audio = audio.reshape(-1)
+    record.update(synth_seconds=time.perf_counter() - start, audio_seconds=audio.shape[0] / options["sample_rate"])
+    record["rtf"] = record["synth_seconds"] / record["audio_seconds"] if record["audio_seconds"] else None
+    return record, audio
+
+
+def _worker_item(item: dict):
+    return _synthesize_item(_worker["model"], item, _worker["options"])
+
+
+class _BackgroundWriter:
+    """Write audio files on I/O threads and append their result records."""
+
+    def __init__(self, out_dir: str, results_file: str, audio_format: str, sample_rate: int, threads: int):
+        self.out_dir = out_dir
+        self.audio_format = audio_format
+        self.sample_rate = sample_rate
+        self._executor = ThreadPoolExecutor(threads, thread_name_prefix="kittentts-writer")
+        # Bounds the audio waiting to be written.
+        self._slots = threading.BoundedSemaphore(2 * threads)
+        self._lock = threading.Lock()
+        self._results = open(results_file, "a", encoding="utf-8")
+        self._futures = []
+
+    def _record(self, record: dict) -> None:
+        with self._lock:
+            self._results.write(json.dumps(record) + "\n")
+            self._results.flush()
+
+    def _write(self, record: dict, audio) -> None:
+        import soundfile as sf
+
+        try:
+            start = time.perf_counter()
+            path = os.path.join(self.out_dir, record["path"])
+            temporary = path + ".tmp"
+            sf.write(temporary, audio, self.sample_rate, format=AUDIO_FORMATS[self.audio_format])
+            os.replace(temporary, path)
+            record["write_seconds"] = time.perf_counter() - start
+            self._record(record)
+        finally:
+            self._slots.release()
+
+    def submit(self, record: dict, audio) -> None:
+        if audio is None:
+            self._record(record)
+            return
+        record["path"] = f"{record['id']}.{self.audio_format}"
+        self._slots.acquire()
+        self._futures.append(self._executor.submit(self._write, record, audio))
+
+    def close(self) -> None:
+        """Wait for pending writes, re-raising the first write error."""
+        try:
+            self._executor.shutdown(wait=True)
+            for future in self._futures:
+                future.result()
+        finally:
+            self._results.close()
+
+
+def synthesize_manifest(input_path: str, out_dir: str, model: str = "KittenML/kitten-tts-nano-0.8",
+                        jobs: int = 1, shard: Tuple[int, int] = (0, 1), voice: str = "expr-voice-5-m",
+                        speed: float = 1.0, sample_rate: int = 24000, clean_text: bool = True,
+                        audio_format: str = "wav", io_threads: int = 2, cache_dir: Optional[str] = None,
+                        progress: Optional[Callable[[dict], None]] = None) -> Dict[str, int]:
+    """Synthesize this shard's items of a manifest that are not done yet.
+
+    Args:
+        input_path: JSONL manifest
+        out_dir: Output directory for audio and results files
+        model: Hugging Face repository ID or local model directory
+        jobs: Worker processes, each with its own model
+        shard: (index, count) of the part of the manifest to handle
+        voice: Voice for items that do not name one
+        speed: Speed for items that do not set one
+        sample_rate: Output sample rate
+        clean_text: If true, it will cleanup the text. Eg. replace numbers with words.
+        audio_format: "wav" or "flac"
+        io_threads: Background threads writing audio files
+        cache_dir: Hugging Face cache directory
+        progress: Called with each result record as it is produced
+
+    Returns:
+        dict with total (items in the shard), skipped (already done),
+        written and failed
+    """
+    if audio_format not in AUDIO_FORMATS:
+        raise ValueError(f"Unsupported audio format '{audio_format}'")
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
+    items = [item for item in read_manifest(input_path) if shard_of(item["id"], shard[1]) == shard[0]]
+    os.makedirs(out_dir, exist_ok=True)
+    done = completed_ids(out_dir)
+    todo = [item for item in items if item["id"] not in done]
+    summary = {"total": len(items), "skipped": len(items) - len(todo), "written": 0, "failed": 0}
+    if not todo:
+        return summary
+
+    options = {"voice": voice, "speed": speed, "clean_text": clean_text, "sample_rate": sample_rate}
+    jobs = min(jobs, len(todo))
+    threads = max(1, (os.cpu_count() or 1) // jobs) if jobs > 1 else None
+    writer = _BackgroundWriter(out_dir, results_path(out_dir, shard), audio_format, sample_rate, io_threads)
+    pool = None
+    try:
+        if jobs > 1:
+            pool = multiprocessing.get_context("spawn").Pool(
+                jobs, initializer=_init_worker, initargs=(model, cache_dir, threads, options))
+            results: Iterator = pool.imap_unordered(_worker_item, todo)
+        else:
+            local_model = _load_model(model, cache_dir, threads)
+            results = (_synthesize_item(local_model, item, options) for item in todo)
+
+        for record, audio in results:
+            summary["failed" if audio is None else "written"] += 1
+            writer.submit(record, audio)
+            if progress is not None:
+                progress(record)
+    finally:
+        if pool is not None:
+            # All results are in unless we are leaving on an error.
+            pool.terminate()
+            pool.join()
+        writer.close()
+    return summary
@@ -0,0 +1,118 @@
+"""
+tokenizer.py
+Vectorized phoneme-to-token-ID conversion.
+
+Produces exactly the IDs of the original per-character tokenization (split
+on whitespace and punctuation, then one ID per known symbol), but maps whole
+strings (or batches of strings) at once through a codepoint lookup table
+instead of a per-character Python loop with a try/except per unknown
+symbol, and builds the padded ``input_ids`` directly. ``encode_batch``
+serves the batched synthesis paths (``generate_voices``, ``render_script``).
+"""
+
+import re
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+_PAD = "$"
+_PUNCTUATION = ';:,.!?¡¿—…"«»"" '
+_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+_LETTERS_IPA = "ɑɐɒæɓʙβɔɕçɗɖðʤəɘɚɛɜɝɞɟʄɡɠɢʛɦɧħɥʜɨɪʝɭɬɫɮʟɱɯɰŋɳɲɴøɵɸθœɶʘɹɺɾɻʀʁɽʂʃʈʧʉʊʋⱱʌɣɤʍχʎʏʑʐʒʔʡʕʢǀǁǂǃˈˌːˑʼʴʰʱʲʷˠˤ˞↓↑→↗↘'̩'ᵻ"
+
+SYMBOLS = [_PAD] + list(_PUNCTUATION) + list(_LETTERS) + list(_LETTERS_IPA)
+
+PAD_ID = 0
+END_ID = 10
+# IDs wrapped around every sequence: leading pad, end and trailing pad.
+FRAMING_TOKENS = 3
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def symbol_index(symbols: Sequence[str] = SYMBOLS) -> dict:
+    """Map each symbol to its ID; later duplicates win."""
+    return {symbol: index for index, symbol in enumerate(symbols)}
+
+
+class PhonemeTokenizer:
+    """Convert phoneme strings to padded ``input_ids`` arrays.
+
+    Usage:
+        tokenizer = PhonemeTokenizer()
+        input_ids = tokenizer.encode("həlˈoʊ wˈɜːld")             # shape (1, n)
+        batch, lengths = tokenizer.encode_batch(["hˈaɪ", "bˈaɪ."])  # shape (2, max n)
+    """
+
+    def __init__(self, symbols: Sequence[str] = SYMBOLS):
+        index = symbol_index(symbols)
+        # One extra slot catches every codepoint beyond the table.
+        self.table = np.full(max(ord(symbol) for symbol in index) + 2, -1, dtype=np.int64)
+        for symbol, token_id in index.items():
+            self.table[ord(symbol)] = token_id
+        self._overflow = self.table.shape[0] - 1
+
+    @staticmethod
+    def normalize(phonemes: str) -> str:
+        """Split on whitespace and punctuation and rejoin with single spaces."""
+        return " ".join(_TOKEN_RE.findall(phonemes))
+
+    def encode(self, phonemes: str, return_dropped: bool = False
+               ) -> Union[np.ndarray, Tuple[np.ndarray, int]]:
+        """Encode one phoneme string as an int64 array of shape (1, n).
+
+        The sequence is wrapped in the pad/end tokens the model expects. With
+        ``return_dropped`` the number of unknown symbols is returned as well.
+        """
+        input_ids, dropped = self._encode_one(phonemes)
+        if return_dropped:
+            return input_ids, dropped
+        return input_ids
+
+    def encode_batch(self, phonemes: Sequence[str], return_dropped: bool = False):
+        """Encode several phoneme strings into one right-padded batch.
+
+        Returns:
+            Tuple of (input_ids of shape (batch, max_len), lengths), plus the
+            per-row dropped symbol counts when ``return_dropped`` is true.
+            Rows are padded with PAD_ID.
+        """
+        input_ids, lengths, dropped = self._encode(phonemes)
+        if return_dropped:
+            return input_ids, lengths, dropped
+        return input_ids, lengths
+
+    def _lookup(self, text: str) -> np.ndarray:
+        """Token IDs of every character in ``text``; -1 for unknown symbols."""
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        return self.table[np.minimum(codes, self._overflow)]
+
+    def _encode_one(self, phonemes: str) -> Tuple[np.ndarray, int]:
+        char_ids = self._lookup(self.normalize(phonemes))
+        ids = char_ids[char_ids >= 0]
+        input_ids = np.empty((1, ids.shape[0] + 3), dtype=np.int64)
+        input_ids[0, 0] = PAD_ID
+        input_ids[0, 1:-2] = ids
+        input_ids[0, -2] = END_ID
+        input_ids[0, -1] = PAD_ID
+        return input_ids, char_ids.shape[0] - ids.shape[0]
+
+    def _encode(self, phonemes: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        texts: List[str] = [self.normalize(p) for p in phonemes]
+        batch = len(texts)
+        sizes = np.fromiter((len(t) for t in texts), dtype=np.int64, count=batch)
+        char_ids = self._lookup("".join(texts))
+        known = char_ids >= 0
+        ids = char_ids[known]
+
+        ends = np.cumsum(sizes)
+        known_before = np.concatenate(([0], np.cumsum(known, dtype=np.int64)))
+        kept = known_before[ends] - known_before[ends - sizes]
+
+        lengths = kept + 3
+        input_ids = np.full((batch, int(lengths.max()) if batch else 3), PAD_ID, dtype=np.int64)
+        rows = np.repeat(np.arange(batch), kept)
+        starts = np.repeat(np.cumsum(kept) - kept, kept)
+        input_ids[rows, np.arange(ids.shape[0]) - starts + 1] = ids
+        input_ids[np.arange(batch), kept + 1] = END_ID
+        return input_ids, lengths, sizes - kept
@@ -36,6 +36,11 @@ setup(
         "numpy",
         "huggingface_hub",
     ],
+    entry_points={
+        "console_scripts": [
+            "kittentts=kittentts.cli:main",
+        ],
+    },
     keywords="text-to-speech, tts, speech-synthesis, neural-networks, onnx",
     project_urls={
         "Bug Reports": "https://github.com/kittenml/kittentts/issues",
@@ -0,0 +1,132 @@
+"""Tiny stand-in ONNX model with the KittenTTS input/output signature.
+
+The real checkpoints live on Hugging Face; tests that exercise the inference
+pipeline build this model instead. Every input token becomes its own run of
+6000 samples (near-silent for the pad token 0), so the usual 5000-sample trim
+leaves audio proportional to the token count.
+"""
+
+import os
+
+try:
+    import numpy as np
+    import onnx
+    from onnx import TensorProto, helper
+    import onnxruntime  # noqa: F401
+    import phonemizer  # noqa: F401
+    HAVE_RUNTIME = True
+except ImportError:
+    HAVE_RUNTIME = False
+
+VOICES = [
+    "expr-voice-2-m", "expr-voice-2-f", "expr-voice-3-m", "expr-voice-3-f",
+    "expr-voice-4-m", "expr-voice-4-f", "expr-voice-5-m", "expr-voice-5-f",
+]
+VOICE_ALIASES = {
+    "Bella": "expr-voice-2-f", "Jasper": "expr-voice-2-m", "Luna": "expr-voice-3-f",
+    "Bruno": "expr-voice-3-m", "Rosie": "expr-voice-4-f", "Hugo": "expr-voice-4-m",
+    "Kiki": "expr-voice-5-f", "Leo": "expr-voice-5-m",
+}
+SAMPLES_PER_TOKEN = 6000
+
+
+def build_fake_model(directory, batch=False, embedding_mb=0):
+    """Write a fake model and voices file into ``directory``.
+
+    With ``batch`` the graph declares a dynamic batch dimension and returns a
+    (batch, samples) waveform; otherwise it is fixed to one row like the
+    released checkpoints. ``embedding_mb`` adds a token embedding of about
+    that size which is looked up on every run (its contribution to the
+    output is multiplied by zero), to give the model realistic weights.
+
+    Returns:
+        Tuple of (model_path, voices_path).
+    """
+    rows = "batch" if batch else 1
+    nodes = [
+        helper.make_node("Cast", ["input_ids"], ["ids_f"], to=TensorProto.FLOAT),
+        helper.make_node("Mul", ["ids_f", "scale"], ["ids_s"]),
+        helper.make_node("Unsqueeze", ["speed", "second_axis"], ["speed_u"]),
+        helper.make_node("Mul", ["ids_s", "speed_u"], ["ids_v"]),
+        helper.make_node("ReduceMean", ["style"], ["style_m"], axes=[1], keepdims=1),
+        helper.make_node("Mul", ["style_m", "scale"], ["style_s"]),
+        helper.make_node("Add", ["ids_v", "style_s"], ["ids_a"]),
+        helper.make_node("Unsqueeze", ["ids_a", "last_axis"], ["ids_u"]),
+        helper.make_node("Tile", ["ids_u", "repeats"], ["tiled"]),
+        helper.make_node("Reshape", ["tiled", "flat_shape"], ["waveform"]),
+    ]
+    graph = helper.make_graph(
+        nodes,
+        "fake_kitten",
+        [
+            helper.make_tensor_value_info("input_ids", TensorProto.INT64, [rows, "tokens"]),
+            helper.make_tensor_value_info("style", TensorProto.FLOAT, [rows, 256]),
+            helper.make_tensor_value_info("speed", TensorProto.FLOAT, [rows]),
+        ],
+        [helper.make_tensor_value_info(
+            "waveform", TensorProto.FLOAT, [rows, "samples"] if batch else ["samples"],
+        )],
+        initializer=[
+            helper.make_tensor("scale", TensorProto.FLOAT, [], [1e-3]),
+            helper.make_tensor("second_axis", TensorProto.INT64, [1], [1]),
+            helper.make_tensor("last_axis", TensorProto.INT64, [1], [2]),
+            helper.make_tensor("repeats", TensorProto.INT64, [3], [1, 1, SAMPLES_PER_TOKEN]),
+            helper.make_tensor("flat_shape", TensorProto.INT64, [2] if batch else [1],
+                               [0, -1] if batch else [-1]),
+        ],
+    )
+    if embedding_mb:
+        width = max(1, int(embedding_mb * 2 ** 20 / 4 / 256))
+        graph.initializer.extend([
+            helper.make_tensor("embedding", TensorProto.FLOAT, [256, width],
+                               np.full((256, width), 0.5, dtype=np.float32).tobytes(), raw=True),
+            helper.make_tensor("zero", TensorProto.FLOAT, [], [0.0]),
+        ])
+        # ids_a -> ids_a + 0 * mean(embedding[input_ids])
+        position = [node.output[0] for node in graph.node].index("ids_a")
+        graph.node[position].output[0] = "ids_plain"
+        graph.node.insert(position + 1, helper.make_node("Gather", ["embedding", "input_ids"], ["embedded"]))
+        graph.node.insert(position + 2, helper.make_node("ReduceMean", ["embedded"], ["embedded_m"], axes=[2],
+                                                         keepdims=0))
+        graph.node.insert(position + 3, helper.make_node("Mul", ["embedded_m", "zero"], ["embedded_z"]))
+        graph.node.insert(position + 4, helper.make_node("Add", ["ids_plain", "embedded_z"], ["ids_a"]))
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    model_path = os.path.join(directory, "fake_kitten.onnx")
+    onnx.save(model, model_path)
+
+    rng = np.random.default_rng(0)
+    voices_path = os.path.join(directory, "voices.npz")
+    np.savez(voices_path, **{
+        name: rng.standard_normal((400, 256)).astype(np.float32) * 0.01 for name in VOICES
+    })
+    return model_path, voices_path
+
+
+def load_fake_model(directory, batch=False, **model_kwargs):
+    """Build the fake model in ``directory`` and load it through KittenTTS_1_Onnx."""
+    from kittentts.onnx_model import KittenTTS_1_Onnx
+
+    model_path, voices_path = build_fake_model(directory, batch=batch)
+    return KittenTTS_1_Onnx(
+        model_path=model_path,
+        voices_path=voices_path,
+        voice_aliases=VOICE_ALIASES,
+        **model_kwargs,
+    )
+
+
+def write_fake_model_dir(directory, embedding_mb=0):
+    """Write the fake model as a loadable model directory with config.json."""
+    import json
+
+    model_path, voices_path = build_fake_model(directory, embedding_mb=embedding_mb)
+    config = {
+        "type": "ONNX1",
+        "model_file": os.path.basename(model_path),
+        "voices": os.path.basename(voices_path),
+        "voice_aliases": VOICE_ALIASES,
+    }
+    with open(os.path.join(directory, "config.json"), "w") as f:
+        json.dump(config, f)
+    return directory
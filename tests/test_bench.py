@@ -0,0 +1,97 @@
+import tempfile
+import unittest
+
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+
+def _result(rtf, chars_per_second, inference):
+    return {
+        "model": "m", "voice": "Jasper", "chunk_len": 400, "threads": None,
+        "load_seconds": 1.0, "rtf": rtf, "ttfa_seconds": 0.1, "peak_rss_mb": 100.0,
+        "chars_per_second": chars_per_second,
+        "stages": {"inference": inference, "chunk": 0.0001},
+    }
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class BenchTests(unittest.TestCase):
+    def test_compare_runs_reports_only_regressions(self):
+        from kittentts.bench import compare_runs
+
+        baseline = {"results": [_result(rtf=0.10, chars_per_second=1000, inference=0.5)]}
+        current = {"results": [_result(rtf=0.20, chars_per_second=1200, inference=0.52)]}
+
+        regressions = compare_runs(baseline, current, threshold=0.10)
+
+        self.assertEqual([r["metric"] for r in regressions], ["rtf"])
+        self.assertAlmostEqual(regressions[0]["change"], 1.0)
+
+    def test_compare_runs_flags_lower_throughput(self):
+        from kittentts.bench import compare_runs
+
+        baseline = {"results": [_result(rtf=0.10, chars_per_second=1000, inference=0.5)]}
+        current = {"results": [_result(rtf=0.10, chars_per_second=500, inference=0.5)]}
+
+        self.assertEqual(
+            [r["metric"] for r in compare_runs(baseline, current)],
+            ["chars_per_second"],
+        )
+
+    def test_run_benchmark_sweeps_configurations(self):
+        from kittentts.bench import STAGES, run_benchmark
+
+        with tempfile.TemporaryDirectory() as tmp:
+            results = run_benchmark(
+                models=["fake"],
+                voices=["Jasper", "Luna"],
+                chunk_lens=[40, 400],
+                threads=[1],
+                repeat=1,
+                loader=lambda name, **kwargs: load_fake_model(tmp, **kwargs),
+            )
+
+        self.assertEqual(len(results["results"]), 4)
+        for result in results["results"]:
+            self.assertGreater(result["audio_seconds"], 0)
+            self.assertGreater(result["rtf"], 0)
+            self.assertEqual(set(result["stages"]), set(STAGES))
+
+    def test_peak_rss_is_sampled_per_configuration(self):
+        from unittest import mock
+
+        from kittentts import memory
+        from kittentts.bench import benchmark_config
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            samples = iter([50.0, 80.0, 60.0])
+            with mock.patch.object(memory, "rss_mb", side_effect=lambda: next(samples)):
+                result = benchmark_config(model, "Hello there.", "Jasper", repeat=1)
+            self.assertEqual(result["peak_rss_mb"], 80.0)
+            with mock.patch.object(memory, "rss_mb", return_value=None):
+                self.assertIsNone(benchmark_config(model, "Hello there.", "Jasper", repeat=1)["peak_rss_mb"])
+            model.close()
+
+    def test_stages_time_the_configured_pipeline(self):
+        import numpy as np
+
+        from kittentts.bench import synthesize_with_stages
+        from kittentts.instrumentation import MetricsRecorder
+
+        text = "A first sentence here. A second one follows it. And then a third, to make three."
+        with tempfile.TemporaryDirectory() as tmp:
+            for kwargs in ({"token_budget": 40, "exact_tokens": True}, {"chunk_chars": 30, "parallel": (2, 1)}):
+                with self.subTest(**kwargs):
+                    metrics = MetricsRecorder()
+                    model = load_fake_model(tmp, instrumentation=metrics, **kwargs)
+                    self.addCleanup(model.close)
+                    audio, stages = synthesize_with_stages(model, text, "Luna")
+                    np.testing.assert_array_equal(audio, model.generate(text, voice="Luna"))
+                    self.assertGreater(stages["inference"], 0)
+                    self.assertGreater(len(model._split(model.preprocessor(text))), 1)
+                    # The timed run reports to the benchmark's own recorder, not the model's.
+                    self.assertEqual(metrics.counters["requests"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import tempfile
+import time
+import unittest
+
+from kittentts.cancellation import CancellationToken, SynthesisCancelled, as_token
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+TEXT = " ".join(f"This is sentence number {n} of a longer text." for n in range(30))
+
+
+class CancellationTokenTests(unittest.TestCase):
+    def test_cancel_terminates_registered_run_options(self):
+        token = CancellationToken()
+        with token.run_options() as run_options:
+            self.assertFalse(run_options.terminate)
+            token.cancel()
+            self.assertTrue(run_options.terminate)
+        with self.assertRaises(SynthesisCancelled) as caught:
+            token.check()
+        self.assertEqual(caught.exception.reason, "cancelled")
+
+    def test_deadline(self):
+        token = CancellationToken(timeout=0.0)
+        time.sleep(0.01)
+        self.assertTrue(token.cancelled)
+        self.assertEqual(token.reason, "deadline")
+
+    def test_timeout_links_to_the_callers_token(self):
+        parent = CancellationToken()
+        token, owned = as_token(parent, timeout=60)
+        self.assertTrue(owned)
+        parent.cancel()
+        self.assertTrue(token.cancelled)
+        token.close()
+        self.assertEqual(as_token(parent, None), (parent, False))
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class CancelGenerateTests(unittest.TestCase):
+    def _cancel_after(self, model, chunks):
+        """Cancel the token once ``chunks`` inferences have finished."""
+        token = CancellationToken()
+        original = model._trim
+        done = []
+
+        def trim(outputs):
+            done.append(1)
+            if len(done) == chunks:
+                token.cancel()
+            return original(outputs)
+
+        model._trim = trim
+        return token
+
+    def test_generate_reports_partial_audio(self):
+        import numpy as np
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            expected = list(model.generate_stream(TEXT, voice="Luna"))
+            token = self._cancel_after(model, 2)
+            with self.assertRaises(SynthesisCancelled) as caught:
+                model.generate(TEXT, voice="Luna", cancel=token)
+
+        error = caught.exception
+        self.assertEqual(error.chunks, 2)
+        np.testing.assert_array_equal(error.audio, np.concatenate(expected[:2], axis=-1))
+        self.assertAlmostEqual(error.audio_seconds, error.audio.shape[-1] / 24000)
+
+    def test_stream_stops_between_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            token = CancellationToken()
+            received = []
+            with self.assertRaises(SynthesisCancelled) as caught:
+                for audio in model.generate_stream(TEXT, voice="Luna", cancel=token):
+                    received.append(audio)
+                    token.cancel()
+        self.assertEqual(caught.exception.chunks, len(received))
+        self.assertEqual(len(received), 1)
+        self.assertIsNone(caught.exception.audio)
+
+    def test_running_inference_is_terminated(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for kwargs in ({}, {"io_binding": True}):
+                with self.subTest(**kwargs):
+                    model = load_fake_model(tmp, **kwargs)
+                    token = CancellationToken()
+                    run = model._run
+
+                    def cancel_then_run(feeds, run_options=None):
+                        token.cancel()
+                        return run(feeds, run_options)
+
+                    model._run = cancel_then_run
+                    with self.assertRaises(SynthesisCancelled) as caught:
+                        model.generate(TEXT, voice="Luna", cancel=token)
+                    self.assertEqual(caught.exception.chunks, 0)
+                    self.assertIsNone(caught.exception.audio)
+
+    def test_expired_deadline_writes_nothing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            path = os.path.join(tmp, "out.wav")
+            with self.assertRaises(SynthesisCancelled) as caught:
+                model.generate_to_file(TEXT, path, voice="Luna", timeout=0.0)
+            self.assertEqual(caught.exception.reason, "deadline")
+            self.assertFalse(os.path.exists(path))
+
+    def test_wrapper_forwards_cancel_and_timeout_for_phonemes_and_tokens(self):
+        from kittentts import KittenTTS
+        from tests.fake_model import write_fake_model_dir
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model = KittenTTS(write_fake_model_dir(tmp))
+            phonemes = model.model._phonemize("Hello there.")
+            input_ids = model.model._tokenize(phonemes)
+            token = CancellationToken()
+            token.cancel()
+            with self.assertRaises(SynthesisCancelled):
+                model.generate_from_phonemes(phonemes, voice="Luna", cancel=token)
+            with self.assertRaises(SynthesisCancelled) as caught:
+                model.generate_from_tokens(input_ids, voice="Luna", timeout=0.0)
+            self.assertEqual(caught.exception.reason, "deadline")
+            self.assertGreater(model.generate_from_tokens(input_ids, voice="Luna", timeout=60).size, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import tempfile
+import unittest
+
+from kittentts.preprocess import (MIN_TOKEN_BUDGET, TextPreprocessor, chunk_by_tokens, chunk_text, estimate_tokens,
+                                 split_sentences)
+from kittentts.textbench import corpus_text
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+
+def words(text):
+    """Token counter for tests: one token per word."""
+    return len(text.split())
+
+
+class TokenChunkingTests(unittest.TestCase):
+    def test_short_sentences_are_packed_up_to_the_budget(self):
+        text = "One two three. Four five. Six seven eight nine. Ten."
+        # 4 framing/closing tokens plus room for 6 words and a joining space.
+        self.assertEqual(chunk_by_tokens(text, 11, words),
+                         ["One two three. Four five.", "Six seven eight nine. Ten."])
+
+    def test_oversized_sentences_split_at_clauses_before_words(self):
+        text = "alpha beta gamma, delta epsilon; zeta eta theta iota kappa lambda mu."
+        chunks = chunk_by_tokens(text, 8, words)
+        # The first clause stays whole; the oversized last one is split between words.
+        self.assertEqual(chunks,
+                         ["alpha beta gamma,", "delta epsilon; zeta,", "eta theta,", "iota kappa,", "lambda mu."])
+
+    def test_a_single_overlong_word_is_cut(self):
+        chunks = chunk_by_tokens("x" * 50, 14, len)
+        self.assertEqual("".join(chunk.rstrip(",") for chunk in chunks), "x" * 50)
+        self.assertTrue(all(len(chunk.rstrip(",")) <= 10 for chunk in chunks))
+
+    def test_cut_words_are_recounted(self):
+        def digits_cost_more(text):
+            return sum(5 if char.isdigit() else 1 for char in text)
+
+        chunks = chunk_by_tokens("abcdefgh12345678", 14, digits_cost_more)
+        self.assertEqual("".join(chunk.rstrip(",").replace(" ", "") for chunk in chunks), "abcdefgh12345678")
+        self.assertTrue(all(digits_cost_more(chunk.rstrip(",")) <= 10 for chunk in chunks))
+
+    def test_strict_splits_chunks_that_count_over_budget_once_joined(self):
+        def joined(text):
+            # Texts of three or more words cost three tokens more than their words.
+            return words(text) + 3 * (words(text) > 2)
+
+        text = "One two. Three four. Five six."
+        self.assertEqual(chunk_by_tokens(text, 9, joined), ["One two. Three four.", "Five six."])
+        self.assertEqual(chunk_by_tokens(text, 9, joined, strict=True), ["One two.", "Three four.", "Five six."])
+
+    def test_budget_must_leave_room_for_phonemes(self):
+        with self.assertRaises(ValueError):
+            chunk_by_tokens("Hello.", 4)
+
+    def test_sentence_splitting_on_long_documents(self):
+        text = TextPreprocessor(remove_punctuation=False)(corpus_text(4000)).rstrip(",.") + "."
+        self.assertEqual(len(split_sentences(" ".join([text] * 50))), 50 * len(split_sentences(text)))
+        self.assertEqual(chunk_text("Dr. Rivera left at 3 p.m. Then it rained."),
+                         ["Dr. Rivera left at 3 p.m.", "Then it rained."])
+
+
+    def test_abbreviations_far_into_the_text(self):
+        # The word before a period and the text after it are read in full,
+        # however far into the document the period is.
+        self.assertEqual(split_sentences("x" * 70 + " Dr. Smith arrived. He sat down."),
+                         ["x" * 70 + " Dr. Smith arrived.", "He sat down."])
+        self.assertEqual(split_sentences("y" * 63 + " see p. 12 and fig. 3. Done."),
+                         ["y" * 63 + " see p. 12 and fig. 3.", "Done."])
+        self.assertEqual(split_sentences("a" * 70 + "dr. Next one."), ["a" * 70 + "dr.", "Next one."])
+
+    def test_initials_far_into_the_text(self):
+        # Single-letter initials other than "p" end a sentence, as they always have.
+        self.assertEqual(split_sentences("y" * 60 + " J. R. R. Tolkien wrote them."),
+                         ["y" * 60 + " J.", "R.", "R.", "Tolkien wrote them."])
+
+    def test_meridiem_looks_past_long_whitespace(self):
+        gap = " " * 70
+        self.assertEqual(split_sentences(f"Opens at 9 a.m.{gap}and closes late."),
+                         [f"Opens at 9 a.m.{gap}and closes late."])
+        self.assertEqual(split_sentences(f"Opens at 9 a.m.{gap}Then it rains."), ["Opens at 9 a.m.", "Then it rains."])
+        self.assertEqual(split_sentences("Shuts at 9 p.m.\n" + "\t" * 80 + "then sleeps."),
+                         ["Shuts at 9 p.m.\n" + "\t" * 80 + "then sleeps."])
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class TokenBudgetModelTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.model = load_fake_model(cls._tmp.name, token_budget=200, exact_tokens=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def test_estimates_track_espeak(self):
+        sentences = split_sentences(self.model.preprocessor(corpus_text(3000)))
+        estimated = sum(estimate_tokens(sentence) for sentence in sentences)
+        exact = sum(self.model._count_tokens(sentence) for sentence in sentences)
+        self.assertLess(abs(estimated - exact) / exact, 0.15)
+
+    def test_chunks_are_fewer_and_within_the_budget(self):
+        text = self.model.preprocessor(corpus_text(3000, ["chat"]))
+        chunks = self.model._split(text)
+        self.assertLess(len(chunks), len(chunk_text(text)) / 2)
+        self.assertLessEqual(max(self.model._encode_chunk(chunk).shape[-1] for chunk in chunks), 200)
+        self.assertGreater(self.model.generate(corpus_text(600, ["chat"]), voice="Luna").size, 0)
+
+    def test_small_caps_are_met_without_errors(self):
+        text = self.model.preprocessor(corpus_text(3000))
+        for cap in (MIN_TOKEN_BUDGET, 23, 28):
+            with self.subTest(cap=cap):
+                model = load_fake_model(self._tmp.name, max_tokens_per_run=cap)
+                chunks = model._split(text)
+                self.assertLessEqual(max(model._encode_chunk(chunk).shape[-1] for chunk in chunks), cap)
+
+    def test_budgets_below_the_minimum_are_rejected(self):
+        for name in ("token_budget", "max_tokens_per_run"):
+            with self.subTest(name=name), self.assertRaisesRegex(ValueError, f"{name} must be at least"):
+                load_fake_model(self._tmp.name, **{name: MIN_TOKEN_BUDGET - 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
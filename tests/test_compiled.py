@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+TEXTS = [
+    "Hello there, this is the first text.",
+    "The second one costs $3.50. " * 20,
+    "",
+]
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class CompiledScriptTests(unittest.TestCase):
+    def test_compiled_script_matches_generate(self):
+        import numpy as np
+
+        from kittentts.compiled import CompiledScript, compile_script, synthesize_compiled
+
+        voices = ["Jasper", "Luna", "Bruno"]
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            path = os.path.join(tmp, "corpus.npz")
+            chunks = compile_script(model, TEXTS, path, voices=voices, speeds=[1.0, 1.2, 1.0])
+            script = CompiledScript(path)
+
+            # Serving needs no espeak: a compiled script never phonemizes.
+            model._phonemize = None
+            audio = list(synthesize_compiled(model, path))
+            self.assertEqual(len(script), 3)
+            self.assertEqual(chunks, len(script.chunks(0)) + len(script.chunks(1)))
+            self.assertEqual(script.voices, voices)
+
+            del model._phonemize
+            np.testing.assert_array_equal(audio[0], model.generate(TEXTS[0], voice="Jasper"))
+            np.testing.assert_array_equal(audio[1], model.generate(TEXTS[1], voice="Luna", speed=1.2))
+            self.assertEqual(audio[2].shape, (0,))
+
+    def test_phoneme_and_token_inputs(self):
+        import numpy as np
+
+        text = "Hello world."
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            phonemes = model._phonemize(text)
+            input_ids = model._tokenize(phonemes)
+            expected = model.generate(text, voice="Luna", clean_text=False)
+
+            np.testing.assert_array_equal(
+                model.generate_from_phonemes(phonemes, voice="Luna", text_lengths=[len(text)]), expected)
+            np.testing.assert_array_equal(
+                model.generate_from_tokens(input_ids[0], voice="Luna", text_lengths=[len(text)]), expected)
+            both = model.generate_from_tokens([input_ids, input_ids], voice="Luna")
+            self.assertEqual(both.shape[-1], 2 * expected.shape[-1])
+            with self.assertRaises(ValueError):
+                model.generate_from_tokens([input_ids], voice="Luna", text_lengths=[1, 2])
+
+    def test_rejects_unknown_voices_at_compile_time(self):
+        from kittentts.compiled import compile_script
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            with self.assertRaises(ValueError):
+                compile_script(model, ["Hi."], os.path.join(tmp, "x.npz"), voices="Nobody")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from kittentts.cost import CostModel, fit_cost_model
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+
+def sample(chunks, tokens, request=0.01, per_chunk=0.002, per_token=0.0005):
+    return {"chars": tokens - 3 * chunks, "chunks": chunks, "tokens": tokens,
+            "seconds": request + per_chunk * chunks + per_token * tokens,
+            "audio_seconds": 0.08 * tokens - 0.2 * chunks}
+
+
+class CostModelTests(unittest.TestCase):
+    def test_fit_recovers_linear_costs(self):
+        samples = [sample(1, 20), sample(1, 150), sample(3, 340), sample(8, 900), sample(20, 2100)]
+        cost_model = fit_cost_model(samples, model_bytes=1000)
+        self.assertAlmostEqual(cost_model.request_seconds, 0.01)
+        self.assertAlmostEqual(cost_model.chunk_seconds, 0.002)
+        self.assertAlmostEqual(cost_model.token_seconds, 0.0005)
+        self.assertAlmostEqual(cost_model.tokens_per_char, 1.0)
+        estimate = cost_model.estimate(["x" * 97] * 2, speed=2.0)
+        self.assertEqual(estimate["tokens"], 200)
+        self.assertAlmostEqual(estimate["seconds"], 0.01 + 0.004 + 0.1)
+        self.assertAlmostEqual(estimate["audio_seconds"], (16 - 0.4) / 2)
+
+    def test_negative_coefficients_are_dropped(self):
+        samples = [sample(1, 20, request=0.0), sample(2, 150, request=0.0), sample(4, 340, request=0.0)]
+        samples[0]["seconds"] = 0.0
+        cost_model = fit_cost_model(samples)
+        self.assertGreaterEqual(min(cost_model.request_seconds, cost_model.chunk_seconds,
+                                    cost_model.token_seconds), 0.0)
+
+    def test_scaling_and_round_trip(self):
+        cost_model = CostModel(request_seconds=0.01, chunk_seconds=0.002, token_seconds=0.001, model_bytes=100)
+        larger = cost_model.scaled_to(300)
+        self.assertAlmostEqual(larger.token_seconds, 0.003)
+        self.assertEqual(larger.request_seconds, 0.01)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cost.json")
+            larger.save(path)
+            self.assertEqual(CostModel.load(path), larger)
+        with self.assertRaises(ValueError):
+            CostModel().scaled_to(300)
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class CalibrationTests(unittest.TestCase):
+    def test_calibrated_estimates_track_generate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            text = "Invoice 1042 is due on Mar. 3rd. Please pay $250 by then, or call us."
+            with self.assertRaisesRegex(ValueError, "calibrate"):
+                model.estimate(text, voice="Luna")
+            model.calibrate(voice="Luna")
+            estimate = model.estimate(text, voice="Luna", exact=True)
+            audio = model.generate(text, voice="Luna")
+            self.assertEqual(model.cost_model.model_bytes, os.path.getsize(model.model_path))
+        # The fake model's output length is exactly linear in tokens and chunks.
+        self.assertAlmostEqual(estimate["audio_seconds"], audio.shape[-1] / 24000, places=3)
+        self.assertGreater(estimate["seconds"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
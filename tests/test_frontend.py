@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+TEXT = " ".join(f"Sentence {n} costs ${n}.50, said Dr. Smith." for n in range(10))
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class FrontendPoolTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from kittentts.frontend import FrontendPool
+
+        cls.pool = FrontendPool(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_workers_match_the_in_process_front_end(self):
+        import numpy as np
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+        chunks = model._chunks(TEXT, clean_text=True)
+        self.assertEqual(self.pool.chunks(TEXT), chunks)
+
+        expected = [model._encode_chunk(chunk) for chunk in chunks]
+        together, dropped = self.pool.encode(chunks)
+        ordered = [ids for ids, _ in self.pool.encode_ordered(chunks)]
+        for ids in (together, ordered):
+            self.assertEqual(len(ids), len(expected))
+            for got, want in zip(ids, expected):
+                np.testing.assert_array_equal(got, want)
+        self.assertEqual(dropped, 0)
+
+    def test_shared_memory_blocks_are_freed(self):
+        from kittentts import frontend
+
+        names = []
+        collect = frontend._collect
+
+        def recording_collect(name, sizes):
+            names.append(name)
+            return collect(name, sizes)
+
+        frontend._collect = recording_collect
+        try:
+            stream = self.pool.encode_ordered(["one.", "two.", "three.", "four.", "five."])
+            next(stream)
+            stream.close()
+        finally:
+            frontend._collect = collect
+        self.assertGreater(len(names), 1)
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                frontend.shared_memory.SharedMemory(name=name)
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class FrontendWorkersGenerateTests(unittest.TestCase):
+    def test_output_matches_in_process_front_end(self):
+        import numpy as np
+
+        with tempfile.TemporaryDirectory() as tmp:
+            expected = load_fake_model(tmp).generate(TEXT, voice="Luna")
+            model = load_fake_model(tmp, frontend_workers=2)
+            try:
+                audio = model.generate(TEXT, voice="Luna")
+                streamed = list(model.generate_stream(TEXT, voice="Luna"))
+            finally:
+                model.close()
+        np.testing.assert_array_equal(audio, expected)
+        np.testing.assert_array_equal(np.concatenate(streamed, axis=-1), expected)
+
+    def test_warmup_starts_and_warms_every_worker(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp, frontend_workers=2)
+            try:
+                report = model.warmup(token_lengths=[16])
+                processes = list(model._frontend._executor._processes.values())
+                self.assertEqual(report["frontend_workers"], 2)
+                self.assertEqual(len(processes), 2)
+                self.assertTrue(all(process.is_alive() for process in processes))
+                self.assertEqual(len(set(model._frontend.warmup("Again."))), 2)
+            finally:
+                model.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
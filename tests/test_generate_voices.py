@@ -0,0 +1,50 @@
+import tempfile
+import unittest
+
+from kittentts.instrumentation import MetricsRecorder
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+TEXT = "Hello there. This sentence is rendered in several voices."
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class GenerateVoicesTests(unittest.TestCase):
+    def _check_matches_generate(self, batch):
+        import numpy as np
+
+        voices = ["Jasper", "Luna", "Bruno"]
+        speeds = [1.0, 1.0, 1.2]
+        metrics = MetricsRecorder()
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp, batch=batch)
+            expected = {
+                voice: model.generate(TEXT, voice=voice, speed=speed)
+                for voice, speed in zip(voices, speeds)
+            }
+            model.instrumentation = metrics
+            result = model.generate_voices(TEXT, voices=voices, speeds=speeds)
+
+        self.assertEqual(list(result), voices)
+        for voice in voices:
+            np.testing.assert_allclose(np.ravel(result[voice]), np.ravel(expected[voice]), rtol=1e-6)
+        stages = metrics.snapshot()["stages"]
+        # Both chunks go through espeak and the tokenizer in one batch.
+        self.assertEqual((stages["phonemize"]["count"], stages["tokenize"]["count"]), (1, 1))
+        return stages["inference"]["count"]
+
+    def test_front_end_runs_once_per_chunk(self):
+        self.assertEqual(self._check_matches_generate(batch=False), 6)
+
+    def test_voices_sharing_a_speed_are_batched(self):
+        # Jasper and Luna share speed 1.0 and run together; Bruno runs alone.
+        self.assertEqual(self._check_matches_generate(batch=True), 4)
+
+    def test_speeds_must_match_voices(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            with self.assertRaises(ValueError):
+                model.generate_voices(TEXT, voices=["Jasper", "Luna"], speeds=[1.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import logging
+import tempfile
+import unittest
+
+from kittentts.instrumentation import (
+    NULL_INSTRUMENTATION,
+    MetricsRecorder,
+    StructuredLogInstrumentation,
+)
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+
+class InstrumentationTests(unittest.TestCase):
+    def test_disabled_instrumentation_shares_a_null_span(self):
+        self.assertIs(NULL_INSTRUMENTATION.span("a"), NULL_INSTRUMENTATION.span("b"))
+        with NULL_INSTRUMENTATION.span("inference"):
+            pass
+
+    def test_prometheus_export(self):
+        metrics = MetricsRecorder(buckets=(0.01, 0.1))
+        metrics.count("chunks", 2)
+        metrics.count("audio_seconds", 1.5)
+        metrics.on_stage("inference", 0.05)
+        metrics.on_stage("inference", 0.5)
+
+        text = metrics.to_prometheus()
+
+        self.assertIn("# TYPE kittentts_chunks_total counter", text)
+        self.assertIn("kittentts_chunks_total 2\n", text)
+        self.assertIn("kittentts_audio_seconds_total 1.5\n", text)
+        self.assertIn('kittentts_stage_seconds_bucket{stage="inference",le="0.01"} 0', text)
+        self.assertIn('kittentts_stage_seconds_bucket{stage="inference",le="0.1"} 1', text)
+        self.assertIn('kittentts_stage_seconds_bucket{stage="inference",le="+Inf"} 2', text)
+        self.assertIn('kittentts_stage_seconds_count{stage="inference"} 2', text)
+
+    def test_structured_logs(self):
+        instrumentation = StructuredLogInstrumentation(level=logging.INFO)
+        with self.assertLogs("kittentts.metrics", level="INFO") as logs:
+            with instrumentation.span("phonemize"):
+                pass
+            instrumentation.count("tokens", 12)
+
+        self.assertIn('"stage": "phonemize"', logs.output[0])
+        self.assertIn('"name": "tokens", "value": 12', logs.output[1])
+
+    @unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+    def test_pipeline_reports_stages_and_counters(self):
+        metrics = MetricsRecorder()
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp, instrumentation=metrics)
+            audio = model.generate("Hello there. How are you today?", voice="Jasper")
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(
+            set(snapshot["stages"]),
+            {"preprocess", "chunk", "phonemize", "tokenize", "inference", "trim", "concat"},
+        )
+        self.assertEqual(snapshot["counters"]["requests"], 1)
+        self.assertEqual(snapshot["counters"]["chunks"], 2)
+        self.assertAlmostEqual(snapshot["counters"]["audio_seconds"], audio.shape[-1] / 24000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class IOBindingTests(unittest.TestCase):
+    def test_bucket_length(self):
+        from kittentts.io_binding import bucket_length
+
+        self.assertEqual(bucket_length(10, (32, 64)), 32)
+        self.assertEqual(bucket_length(64, (32, 64)), 64)
+        self.assertEqual(bucket_length(70, (32, 64)), 70)
+        self.assertEqual(bucket_length(70, None), 70)
+
+    def test_io_binding_matches_session_run(self):
+        import numpy as np
+
+        texts = ["Hello there.", "How are you doing today, my friend?", "Hi."]
+        with tempfile.TemporaryDirectory() as tmp:
+            plain = load_fake_model(tmp)
+            bound = load_fake_model(tmp, io_binding=True)
+            bucketed = load_fake_model(tmp, token_buckets=[32, 64])
+
+            for text in texts:
+                with self.subTest(text=text):
+                    expected = plain.generate(text, voice="Jasper")
+                    np.testing.assert_array_equal(bound.generate(text, voice="Jasper"), expected)
+
+                    padded = bucketed.generate(text, voice="Jasper")
+                    self.assertLessEqual(abs(padded.shape[-1] - expected.shape[-1]), 6000)
+                    n = min(padded.shape[-1], expected.shape[-1])
+                    np.testing.assert_allclose(padded[:n], expected[:n])
+
+        self.assertEqual(set(bucketed._runner._bindings), {32, 64})
+
+    def test_compare_bucketing_reports_each_text(self):
+        from kittentts.io_binding import compare_bucketing
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            rows = compare_bucketing(model, ["Hello there.", "Hi."], voice="Jasper", token_buckets=[32, 64])
+        self.assertEqual([row["bucket"] for row in rows], [32, 32])
+        self.assertIsNone(model._runner)
+        for row in rows:
+            self.assertLess(row["tokens"], row["bucket"])
+            # The fake model's audio for a token does not depend on the tokens after it.
+            self.assertAlmostEqual(row["correlation"], 1.0, places=5)
+            self.assertLessEqual(abs(row["padded_seconds"] - row["seconds"]), 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+from kittentts.lexicon import Lexicon, split_segments
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+CORPUS = [
+    "one day, a little girl named lily found a needle in her room.",
+    "she knew it was difficult to play with it because it was sharp.",
+    "lily wanted to use the needle to sew a button on her shirt.",
+    "she went to her mom and said, \"mom, i found this needle.\"",
+    "her mom smiled and said, \"yes, lily, we can share the needle and fix your shirt.\"",
+    "the meeting on may fifth starts at ten thirty a m and costs twelve dollars.",
+    "a little girl found her mom in the room.",
+    "she said it was sharp, and her mom smiled.",
+]
+
+
+class SplitSegmentsTests(unittest.TestCase):
+    def test_marks_are_split_off(self):
+        self.assertEqual(split_segments('she said, "hi there!"'),
+                         [("she said", ', "'), ("hi there", '!"')])
+        self.assertEqual(split_segments("no marks"), [("no marks", "")])
+
+    def test_segments_match_phonemizer(self):
+        from phonemizer.punctuation import Punctuation
+
+        punctuation = Punctuation(Punctuation.default_marks())
+        for text in ['she said, "hi there!"', "it costs 19,99 euro. ok", "3.5 and x. y", "wait... what?! (really)",
+                     "1, 2, 3. go", "«bonjour» ¿qué? ¡sí!"]:
+            with self.subTest(text=text):
+                segments = [segment for segment, _ in split_segments(text) if segment]
+                self.assertEqual(segments, punctuation.preserve(text)[0])
+
+    def test_save_and_load(self):
+        lexicon = Lexicon({"cat": "kˈæt"}, isolated={"cat": "kˈæt"}, merged=["on the"])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lexicon.json")
+            lexicon.save(path)
+            loaded = Lexicon.load(path)
+        self.assertEqual((loaded.entries, loaded.isolated, loaded.merged),
+                         (lexicon.entries, lexicon.isolated, lexicon.merged))
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class LexiconFidelityTests(unittest.TestCase):
+    def setUp(self):
+        from kittentts.lexicon import build_lexicon
+        from kittentts.onnx_model import espeak_backend
+
+        self.backend = espeak_backend()
+        self.lexicon = build_lexicon(CORPUS, self.backend.phonemize, min_count=1)
+
+    def test_matches_espeak_on_the_corpus(self):
+        from kittentts.lexicon import lexicon_fidelity
+
+        fidelity = lexicon_fidelity(CORPUS, self.lexicon, self.backend)
+        self.assertEqual(fidelity["exact_rate"], 1.0)
+        self.assertGreater(fidelity["hit_rate"], 0.5)
+        self.assertIn("in the", self.lexicon.merged)
+
+    def test_unknown_words_and_symbols_go_to_espeak(self):
+        from kittentts.lexicon import LexiconPhonemizer
+
+        from kittentts.tokenizer import PhonemeTokenizer
+
+        fast = LexiconPhonemizer(self.lexicon, self.backend)
+        texts = ["her mom found a zebra.", "she paid 12 dollars for well-known NASA gear."]
+        normalize = PhonemeTokenizer.normalize
+        self.assertEqual([normalize(p) for p in fast.phonemize(texts)],
+                         [normalize(self.backend.phonemize([text])[0]) for text in texts])
+        self.assertEqual(fast.hits, 0)
+
+    def test_model_output_is_unchanged(self):
+        import numpy as np
+
+        text = CORPUS[2] + " " + CORPUS[4]
+        with tempfile.TemporaryDirectory() as tmp:
+            expected = load_fake_model(tmp).generate(text, voice="Luna")
+            model = load_fake_model(tmp, lexicon=self.lexicon)
+            audio = model.generate(text, voice="Luna")
+        np.testing.assert_array_equal(audio, expected)
+        self.assertGreater(model.phonemizer.hits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+
+from kittentts.longform import iter_blocks
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+PARAGRAPH = "It was a bright cold day in April. The clocks were striking thirteen. "
+
+
+class IterBlocksTests(unittest.TestCase):
+    def test_blocks_cover_the_input_and_end_at_boundaries(self):
+        data = ("Première phrase. Deuxième phrase.\n\nÉté " * 20).encode("utf-8")
+        blocks = list(iter_blocks(data, block_bytes=50))
+        self.assertEqual("".join(text for _, _, text in blocks), data.decode("utf-8"))
+        self.assertEqual([start for start, _, _ in blocks[1:]], [end for _, end, _ in blocks[:-1]])
+        for _, end, text in blocks[:-1]:
+            self.assertTrue(text.endswith((" ", "\n")), text)
+
+    def test_cut_without_boundaries_keeps_characters_whole(self):
+        data = ("é" * 40).encode("utf-8")
+        blocks = list(iter_blocks(data, block_bytes=7))
+        self.assertEqual("".join(text for _, _, text in blocks), "é" * 40)
+
+    def test_start_offset(self):
+        data = b"one. two. three."
+        self.assertEqual(list(iter_blocks(data, start=5))[0][2], "two. three.")
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class RenderLongTests(unittest.TestCase):
+    def test_resume_after_interruption_matches_full_render(self):
+        import numpy as np
+        import soundfile as sf
+
+        from kittentts.longform import render_long
+
+        class Interrupted(Exception):
+            pass
+
+        def interrupt_after(chunks):
+            def progress(info):
+                if info["chunks"] == chunks:
+                    raise Interrupted()
+            return progress
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            text_path = os.path.join(tmp, "book.txt")
+            with open(text_path, "w", encoding="utf-8") as f:
+                f.write((PARAGRAPH * 3 + "\n\n") * 6)
+
+            full_path = os.path.join(tmp, "full.wav")
+            full = render_long(model, text_path, full_path, voice="Jasper", block_bytes=300)
+            self.assertGreater(full["chunks"], 4)
+
+            path = os.path.join(tmp, "resumed.wav")
+            with self.assertRaises(Interrupted):
+                render_long(model, text_path, path, voice="Jasper", block_bytes=300, progress=interrupt_after(3))
+            updates = []
+            resumed = render_long(model, text_path, path, voice="Jasper", block_bytes=300, progress=updates.append)
+            again = render_long(model, text_path, path, voice="Jasper", block_bytes=300)
+
+            self.assertEqual(resumed["resumed_chunks"], 3)
+            self.assertEqual(resumed["chunks"], full["chunks"])
+            self.assertEqual(again["resumed_chunks"], full["chunks"])
+            self.assertEqual(updates[-1]["bytes_done"], os.path.getsize(text_path))
+            self.assertEqual(updates[-1]["eta_seconds"], 0)
+            np.testing.assert_array_equal(sf.read(path)[0], sf.read(full_path)[0])
+
+            with self.assertRaises(ValueError):
+                render_long(model, text_path, path, voice="Luna", block_bytes=300)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+
+from kittentts.textbench import corpus_text
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+from tests.test_prefork import in_child
+
+
+@unittest.skipUnless(HAVE_RUNTIME and hasattr(os, "fork") and os.path.exists("/proc/self/statm"),
+                     "fork, /proc and numpy, onnx, onnxruntime and phonemizer are required")
+class MemoryTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def retained_mb(self, **kwargs):
+        """RSS a long single-chunk request leaves behind once short requests follow it."""
+        def child():
+            from kittentts.memory import rss_mb
+
+            model = load_fake_model(self._tmp.name, **kwargs)
+            model.generate("Hello there.", voice="Luna")
+            before = rss_mb()
+            model.generate(corpus_text(1500), voice="Luna")
+            for _ in range(5):
+                model.generate("Short reply.", voice="Luna")
+            return rss_mb() - before
+
+        return in_child(child)
+
+    def test_arena_shrinkage_releases_a_long_run(self):
+        self.assertGreater(self.retained_mb(token_budget=4000), 60)
+        self.assertLess(self.retained_mb(token_budget=4000, arena_shrinkage=True), 20)
+
+    def test_max_tokens_per_run_caps_every_chunk(self):
+        model = load_fake_model(self._tmp.name, token_budget=4000, max_tokens_per_run=150)
+        self.assertEqual((model.token_budget, model.exact_tokens), (150, True))
+        chunks = model._split(model.preprocessor(corpus_text(1500)))
+        self.assertLessEqual(max(model._encode_chunk(chunk).shape[-1] for chunk in chunks), 150)
+
+    def test_arena_cap_fails_runs_over_it(self):
+        def child():
+            from onnxruntime.capi.onnxruntime_pybind11_state import Fail
+
+            from kittentts.memory import register_arena
+
+            model = load_fake_model(self._tmp.name, token_budget=4000, arena_max_mb=64)
+            short = model.generate("Short reply.", voice="Luna").size
+            try:
+                model.generate(corpus_text(1500), voice="Luna")
+                long_error = None
+            except Fail as error:
+                long_error = str(error)
+            try:
+                register_arena(128)
+                changed = True
+            except ValueError:
+                changed = False
+            return {"short": short, "long_error": long_error, "changed": changed}
+
+        result = in_child(child)
+        self.assertGreater(result["short"], 0)
+        self.assertIn("BFCArena", result["long_error"] or "")
+        self.assertFalse(result["changed"])
+
+    def test_soak_reports_rss_samples(self):
+        from kittentts.memory import soak
+
+        model = load_fake_model(self._tmp.name)
+        results = soak(model, requests=12, voice="Luna", sizes=(20, 60), weights=(1, 1), sample_every=5)
+        self.assertEqual([index for index, _ in results["samples"]], [5, 10, 12])
+        self.assertGreaterEqual(results["peak_rss_mb"], results["steady_rss_mb"])
+        self.assertIsNotNone(results["growth_mb"])
+
+    def test_soak_logs_without_rss(self):
+        from unittest import mock
+
+        from kittentts import memory
+
+        model = load_fake_model(self._tmp.name)
+        lines = []
+        with mock.patch.object(memory, "rss_mb", return_value=None):
+            results = memory.soak(model, requests=2, voice="Luna", sizes=(20,), weights=(1,), sample_every=1,
+                                  log=lines.append)
+        self.assertEqual(lines, ["1/2 requests: rss=unavailable", "2/2 requests: rss=unavailable"])
+        self.assertIsNone(results["peak_rss_mb"])
+
+
+if __name__ == "__main__":
+    unittest.main()
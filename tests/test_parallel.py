@@ -0,0 +1,45 @@
+import tempfile
+import unittest
+
+from kittentts.parallel import plan_lanes
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+TEXT = " ".join(f"This is sentence number {n} of a longer text." for n in range(12))
+
+
+class PlanLanesTests(unittest.TestCase):
+    def test_default_plan_fits_the_cores(self):
+        self.assertEqual(plan_lanes(cores=1), (1, 1))
+        self.assertEqual(plan_lanes(cores=3), (3, 1))
+        self.assertEqual(plan_lanes(cores=8), (4, 2))
+
+    def test_plan_follows_benchmark_throughput(self):
+        # One thread is fastest per core: 8 lanes x rtf 0.2 beats 4 x 0.12.
+        results = [{"threads": 1, "rtf": 0.2}, {"threads": 2, "rtf": 0.12}, {"threads": 4, "rtf": 0.1}]
+        self.assertEqual(plan_lanes(cores=8, results=results), (8, 1))
+        results = [{"threads": 1, "rtf": 0.4}, {"threads": 2, "rtf": 0.12}]
+        self.assertEqual(plan_lanes(cores=8, results=results), (4, 2))
+
+    def test_thread_counts_beyond_the_cores_are_ignored(self):
+        self.assertEqual(plan_lanes(cores=2, results=[{"threads": 4, "rtf": 0.01}]), (2, 1))
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class ParallelGenerateTests(unittest.TestCase):
+    def test_parallel_output_matches_sequential(self):
+        import numpy as np
+
+        with tempfile.TemporaryDirectory() as tmp:
+            sequential = load_fake_model(tmp).generate(TEXT, voice="Luna")
+            model = load_fake_model(tmp, parallel=(3, 1))
+            parallel = model.generate(TEXT, voice="Luna")
+            streamed = list(model.generate_stream(TEXT, voice="Luna"))
+            self.assertEqual(model._lanes.lanes, 3)
+            model._lanes.close()
+
+        np.testing.assert_array_equal(parallel, sequential)
+        np.testing.assert_array_equal(np.concatenate(streamed, axis=-1), sequential)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+import unittest
+
+from tests.fake_model import HAVE_RUNTIME, write_fake_model_dir
+
+WEIGHTS_MB = 64
+TEXT = "Workers share one copy of the weights."
+
+
+def private_mb():
+    """Memory private to this process (not shared with the parent or page cache)."""
+    private = 0
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            name, value = line.split(":")
+            if name in ("Private_Clean", "Private_Dirty"):
+                private += int(value.split()[0])
+    return private / 1024
+
+
+def in_child(func):
+    """Run ``func`` in a forked child and return its JSON result."""
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        try:
+            result = json.dumps(func())
+        except BaseException as exc:
+            result = json.dumps({"error": repr(exc)})
+        os.write(write_end, result.encode())
+        os._exit(0)
+    os.close(write_end)
+    with os.fdopen(read_end) as f:
+        data = f.read()
+    os.waitpid(pid, 0)
+    return json.loads(data)
+
+
+@unittest.skipUnless(HAVE_RUNTIME and hasattr(os, "fork") and os.path.exists("/proc/self/smaps_rollup"),
+                     "fork, /proc and numpy, onnx, onnxruntime and phonemizer are required")
+class PreforkTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.model_dir = write_fake_model_dir(cls._tmp.name, embedding_mb=WEIGHTS_MB)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def measure(self, **kwargs):
+        from kittentts import KittenTTS
+
+        def child():
+            before = private_mb()
+            model = KittenTTS(self.model_dir, cache_dir=self._tmp.name, **kwargs)
+            audio = model.generate(TEXT, voice="Luna")
+            return {"private_mb": private_mb() - before, "samples": int(audio.shape[-1]),
+                    "checksum": float(abs(audio).sum())}
+
+        return in_child(child)
+
+    def test_forked_workers_share_the_weights(self):
+        from kittentts import KittenTTS
+
+        full = self.measure()
+        self.assertNotIn("error", full)
+        # Parent loads once, including a session that must not leak into the children.
+        model = KittenTTS(self.model_dir, cache_dir=self._tmp.name, prefork=True)
+        model.generate(TEXT, voice="Luna")
+        try:
+            workers = [in_child(lambda: {"private_mb": private_mb(),
+                                         "samples": int(model.generate(TEXT, voice="Luna").shape[-1])})
+                       for _ in range(2)]
+        finally:
+            model.close()
+
+        for worker in workers:
+            self.assertNotIn("error", worker)
+            self.assertEqual(worker["samples"], full["samples"])
+            # A full load costs at least the weights; a worker stays far below.
+            self.assertGreater(full["private_mb"], WEIGHTS_MB)
+            self.assertLess(worker["private_mb"], full["private_mb"] / 2)
+
+    def test_metadata_does_not_create_the_engine(self):
+        from kittentts import KittenTTS
+        from kittentts.instrumentation import MetricsRecorder
+
+        model = KittenTTS(self.model_dir, cache_dir=self._tmp.name, prefork=True)
+        self.addCleanup(model.close)
+        self.assertFalse(model.is_ready)
+        self.assertIsNone(model.warmup_seconds)
+        self.assertEqual(model.available_voices, ["Bella", "Jasper", "Luna", "Bruno", "Rosie", "Hugo", "Kiki", "Leo"])
+        self.assertEqual(model.model.voice_aliases["Luna"], "expr-voice-3-f")
+        metrics = MetricsRecorder()
+        model.instrumentation = metrics
+        self.assertIsNone(model.model._engine)
+
+        model.generate(TEXT, voice="Luna")
+        self.assertEqual(metrics.counters["requests"], 1)
+
+    def test_session_config_is_merged(self):
+        from kittentts import KittenTTS
+
+        model = KittenTTS(self.model_dir, cache_dir=self._tmp.name, prefork=True,
+                          session_config={"session.intra_op.allow_spinning": "0"})
+        self.addCleanup(model.close)
+        options = model.model.session.get_session_options()
+        self.assertEqual(options.get_session_config_entry("session.disable_prepacking"), "1")
+        self.assertEqual(options.get_session_config_entry("session.intra_op.allow_spinning"), "0")
+
+    def test_output_matches_a_regular_load(self):
+        self.assertEqual(self.measure(prefork=True)["checksum"], self.measure()["checksum"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+
+from kittentts.profiling import format_profile_table, summarize_profile
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+
+def _node(name, op_type, dur):
+    return {"cat": "Node", "name": f"{name}_kernel_time", "dur": dur,
+            "args": {"op_name": op_type, "provider": "CPUExecutionProvider"}}
+
+
+class ProfilingTests(unittest.TestCase):
+    def test_summarize_groups_by_node_op_type_and_scope(self):
+        events = [
+            {"cat": "Session", "name": "model_run", "dur": 400},
+            _node("/decoder/conv1/Conv", "Conv", 200),
+            _node("/decoder/conv2/Conv", "Conv", 100),
+            _node("/encoder/MatMul", "MatMul", 100),
+            {"cat": "Node", "name": "/decoder/conv1/Conv_fence_before", "dur": 0, "args": {}},
+        ]
+
+        summary = summarize_profile(events)
+
+        self.assertEqual(summary["runs"], 1)
+        self.assertEqual(summary["total_us"], 400)
+        self.assertEqual(
+            [(row["name"], row["calls"], row["share"]) for row in summary["op_types"]],
+            [("Conv", 2, 0.75), ("MatMul", 1, 0.25)],
+        )
+        self.assertEqual([row["name"] for row in summary["scopes"]], ["decoder", "encoder"])
+        self.assertEqual(summary["nodes"][0]["name"], "/decoder/conv1/Conv")
+        self.assertIn("Conv", format_profile_table(summary))
+
+    @unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+    def test_profiling_flag_writes_a_trace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(
+                tmp, enable_profiling=True, session_options={"profile_file_prefix": f"{tmp}/trace"},
+            )
+            model.generate("Hello there.", voice="Jasper")
+            summary = summarize_profile(model.end_profiling())
+
+        self.assertEqual(summary["runs"], 1)
+        self.assertIn("Tile", [row["name"] for row in summary["op_types"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
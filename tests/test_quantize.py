@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+
+from tests.fake_model import HAVE_RUNTIME, write_fake_model_dir
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class QuantizeTests(unittest.TestCase):
+    def test_distances_are_zero_for_identical_audio(self):
+        import numpy as np
+
+        from kittentts.quantize import log_spectral_distance, waveform_distance
+
+        audio = np.sin(np.linspace(0, 200, 24000)).astype(np.float32)
+
+        self.assertEqual(waveform_distance(audio, audio), 0.0)
+        self.assertAlmostEqual(log_spectral_distance(audio, audio), 0.0)
+        self.assertGreater(log_spectral_distance(audio, audio * 0.5), 1.0)
+
+    def test_quantize_and_validate_dynamic_variant(self):
+        from kittentts.quantize import quantize_model, validate_variants
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "source")
+            os.makedirs(source)
+            directories = quantize_model(write_fake_model_dir(source), os.path.join(tmp, "out"),
+                                         variants=["dynamic"])
+            rows = validate_variants(directories, texts=["Hello there."], repeat=1)
+
+        self.assertEqual(set(directories), {"fp32", "dynamic"})
+        self.assertEqual([row["variant"] for row in rows], ["fp32", "dynamic"])
+        self.assertEqual(rows[0]["waveform_distance"], 0.0)
+        self.assertAlmostEqual(rows[1]["duration_ratio"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from kittentts.registry import ModelRegistry, default_registry, registry_key
+from tests.fake_model import HAVE_RUNTIME, write_fake_model_dir
+
+
+class RegistryKeyTests(unittest.TestCase):
+    def test_option_order_and_containers_do_not_matter(self):
+        a = registry_key("KittenML/kitten-tts-nano-0.8", None, "cpu",
+                         {"intra_op_num_threads": 2, "inter_op_num_threads": 1}, token_buckets=[32, 64])
+        b = registry_key("KittenML/kitten-tts-nano-0.8", None, "cpu",
+                         {"inter_op_num_threads": 1, "intra_op_num_threads": 2}, token_buckets=(32, 64))
+        self.assertEqual(a, b)
+
+    def test_revision_and_options_are_part_of_the_key(self):
+        base = registry_key("KittenML/kitten-tts-nano-0.8")
+        self.assertNotEqual(base, registry_key("KittenML/kitten-tts-nano-0.8", revision="v1"))
+        self.assertNotEqual(base, registry_key("KittenML/kitten-tts-nano-0.8", backend="cpu"))
+        self.assertNotEqual(base, registry_key("KittenML/kitten-tts-nano-0.8", io_binding=True))
+
+    def test_instrumentation_is_not_part_of_the_key(self):
+        with self.assertRaises(ValueError):
+            registry_key("KittenML/kitten-tts-nano-0.8", instrumentation=object())
+
+
+class _FakeModel:
+    def close(self):
+        pass
+
+
+class RegistryLoadingTests(unittest.TestCase):
+    def test_unrelated_models_load_concurrently(self):
+        started = {"a": threading.Event(), "b": threading.Event()}
+
+        def load(repo_id, **kwargs):
+            started[repo_id].set()
+            # Each load waits for the other one to start, which deadlocks if loading holds the lock.
+            if not started["b" if repo_id == "a" else "a"].wait(5):
+                raise TimeoutError(repo_id)
+            return _FakeModel()
+
+        registry = ModelRegistry()
+        results = {}
+        with mock.patch("kittentts.get_model.download_from_huggingface", load):
+            threads = [threading.Thread(target=lambda r=repo: results.update({r: registry.acquire(r)}))
+                       for repo in ("a", "b")]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(sorted(results), ["a", "b"])
+
+    def test_concurrent_users_of_one_key_share_one_load(self):
+        release = threading.Event()
+        loads = []
+
+        def load(repo_id, **kwargs):
+            loads.append(repo_id)
+            release.wait(5)
+            return _FakeModel()
+
+        registry = ModelRegistry()
+        results = []
+        with mock.patch("kittentts.get_model.download_from_huggingface", load):
+            threads = [threading.Thread(target=lambda: results.append(registry.acquire("a")[1])) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            release.set()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(loads, ["a"])
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(model is results[0] for model in results))
+
+    def test_a_failed_load_is_not_cached(self):
+        registry = ModelRegistry()
+        with mock.patch("kittentts.get_model.download_from_huggingface", side_effect=OSError("offline")):
+            with self.assertRaises(OSError):
+                registry.acquire("a")
+        self.assertEqual(len(registry), 0)
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class ModelRegistryTests(unittest.TestCase):
+    def test_acquire_shares_and_release_unloads(self):
+        registry = ModelRegistry()
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = write_fake_model_dir(tmp)
+            key, first = registry.acquire(directory)
+            same_key, second = registry.acquire(directory)
+            _, other = registry.acquire(directory, session_options={"intra_op_num_threads": 1})
+            self.assertIs(first, second)
+            self.assertIsNot(first, other)
+            self.assertEqual(registry.refcount(key), 2)
+
+            registry.release(key)
+            self.assertEqual(registry.refcount(key), 1)
+            registry.release(same_key)
+            self.assertEqual(registry.refcount(key), 0)
+            self.assertEqual(len(registry), 1)
+            with self.assertRaises(ValueError):
+                registry.release(key)
+
+    def test_shared_handles(self):
+        from kittentts import KittenTTS
+
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = write_fake_model_dir(tmp)
+            first = KittenTTS(directory, shared=True)
+            with KittenTTS(directory, shared=True) as second:
+                self.assertIs(first.model, second.model)
+                self.assertEqual(len(second.generate("Hello.", voice="Jasper").shape), 1)
+            self.assertIsNone(second.model)
+            self.assertEqual(default_registry.refcount(first._registry_key), 1)
+
+            key = first._registry_key
+            first.close()
+            first.close()
+            self.assertEqual(default_registry.refcount(key), 0)
+            self.assertIsNot(KittenTTS(directory).model, KittenTTS(directory).model)
+
+    def test_shared_handles_keep_their_own_instrumentation(self):
+        from kittentts import KittenTTS
+        from kittentts.instrumentation import MetricsRecorder
+
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = write_fake_model_dir(tmp)
+            first_metrics, second_metrics = MetricsRecorder(), MetricsRecorder()
+            with KittenTTS(directory, shared=True, instrumentation=first_metrics) as first, \
+                    KittenTTS(directory, shared=True, instrumentation=second_metrics) as second:
+                self.assertIs(first.model, second.model)
+                first.generate("Hello.", voice="Jasper")
+                first.generate("Hello again.", voice="Jasper")
+                list(second.generate_stream("Hi.", voice="Jasper"))
+                second.instrumentation = None
+                second.generate("Unrecorded.", voice="Jasper")
+                self.assertIs(first.instrumentation, first_metrics)
+        self.assertEqual(first_metrics.snapshot()["counters"]["requests"], 2)
+        self.assertEqual(second_metrics.snapshot()["counters"]["requests"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from kittentts.instrumentation import MetricsRecorder
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+SCRIPT = [
+    ("Jasper", "Hello there. How are you?"),
+    ("Luna", "I am fine, thanks.", 1.1),
+    ("Jasper", "Good to hear."),
+]
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class RenderScriptTests(unittest.TestCase):
+    def _expected(self, model, pause_samples):
+        import numpy as np
+
+        pieces = []
+        for index, line in enumerate(SCRIPT):
+            voice, text = line[:2]
+            speed = line[2] if len(line) == 3 else 1.0
+            if index:
+                pieces.append(np.zeros(pause_samples, dtype=np.float32))
+            pieces.append(np.ravel(model.generate(text, voice=voice, speed=speed)))
+        return np.concatenate(pieces)
+
+    def test_matches_line_by_line_generation(self):
+        import numpy as np
+
+        for batch in (False, True):
+            with self.subTest(batch=batch), tempfile.TemporaryDirectory() as tmp:
+                model = load_fake_model(tmp, batch=batch)
+                expected = self._expected(model, 2400)
+                audio = model.render_script(SCRIPT, pause=0.1, window=2)
+                np.testing.assert_allclose(np.ravel(audio), expected, rtol=1e-6)
+
+    def test_lines_are_batched_across_voices(self):
+        metrics = MetricsRecorder()
+        script = [("Jasper", "Same words."), ("Luna", "Same words."), ("Bruno", "Same words.")]
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp, batch=True, instrumentation=metrics)
+            model.render_script(script)
+        self.assertEqual(metrics.snapshot()["stages"]["inference"]["count"], 1)
+
+    def test_streams_to_file(self):
+        import numpy as np
+        import soundfile as sf
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            expected = self._expected(model, 0)
+            path = os.path.join(tmp, "script.wav")
+            self.assertIsNone(model.render_script(SCRIPT, pause=0.0, output_path=path, window=1))
+            written, sample_rate = sf.read(path, dtype="float32")
+        self.assertEqual(sample_rate, 24000)
+        np.testing.assert_allclose(written, expected, atol=1e-4)
+
+    def test_rejects_malformed_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            with self.assertRaises(ValueError):
+                model.render_script([("Jasper",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from kittentts.resample import Resampler, resample
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+
+def tone(frequency, rate, seconds=0.5):
+    return np.sin(2 * np.pi * frequency * np.arange(int(rate * seconds)) / rate).astype(np.float32)
+
+
+class ResamplerTests(unittest.TestCase):
+    def test_tones_keep_their_pitch(self):
+        for target in (8000, 16000, 22050, 48000):
+            with self.subTest(target=target):
+                out = resample(tone(440, 24000), 24000, target)
+                self.assertEqual(out.size, target // 2)
+                error = np.abs(out - tone(440, target))[100:-100]
+                self.assertLess(error.max(), 1e-3)
+
+    def test_content_above_the_new_nyquist_is_removed(self):
+        out = resample(tone(6000, 24000), 24000, 8000)
+        self.assertLess(np.abs(out[100:-100]).max(), 1e-3)
+
+    def test_streaming_matches_one_shot(self):
+        signal = np.random.default_rng(0).standard_normal(24000).astype(np.float32)
+        for target in (8000, 16000, 44100):
+            with self.subTest(target=target):
+                resampler = Resampler(24000, target)
+                pieces = [resampler.process(piece) for piece in np.split(signal, [1, 7, 5000, 5001, 17000])]
+                pieces.append(resampler.flush())
+                np.testing.assert_allclose(np.concatenate(pieces), resample(signal, 24000, target), atol=1e-6)
+
+    def test_same_rate_is_a_no_op(self):
+        signal = tone(440, 24000)
+        self.assertIs(resample(signal, 24000, 24000), signal)
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class ModelSampleRateTests(unittest.TestCase):
+    TEXT = "The first sentence is short. The second one is a little longer than that."
+
+    def test_generate_stream_and_file_resample(self):
+        import soundfile as sf
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            native = model.generate(self.TEXT, voice="Luna")
+            expected = resample(native, 24000, 8000)
+            np.testing.assert_array_equal(model.generate(self.TEXT, voice="Luna", sample_rate=8000), expected)
+            streamed = np.concatenate(list(model.generate_stream(self.TEXT, voice="Luna", sample_rate=8000)))
+            np.testing.assert_allclose(streamed, expected, atol=1e-6)
+
+            path = os.path.join(tmp, "out.wav")
+            model.generate_to_file(self.TEXT, path, voice="Luna", sample_rate=16000)
+            written, rate = sf.read(path, dtype="float32")
+        self.assertEqual(rate, 16000)
+        self.assertEqual(written.size, -(-native.size * 2 // 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
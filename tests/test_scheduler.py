@@ -0,0 +1,135 @@
+import tempfile
+import threading
+import unittest
+
+from kittentts.cost import CostModel
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class SchedulerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.model = load_fake_model(cls._tmp.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def setUp(self):
+        # Every request is predicted to take one second, plus a little per token.
+        self.model.cost_model = CostModel(request_seconds=1.0, token_seconds=1e-4, tokens_per_char=1.0)
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        synthesize = type(self.model)._synthesize_chunks
+
+        def gated(model, chunks, *args, **kwargs):
+            self.started.set()
+            self.gate.wait()
+            return synthesize(model, chunks, *args, **kwargs)
+
+        self.model._synthesize_chunks = gated.__get__(self.model)
+        self.addCleanup(lambda: delattr(self.model, "_synthesize_chunks"))
+
+    def scheduler(self, **kwargs):
+        from kittentts.scheduler import Scheduler
+
+        scheduler = Scheduler(self.model, **kwargs)
+        self.addCleanup(scheduler.close)
+        self.addCleanup(self.gate.set)
+        # Occupies the dispatcher until the gate opens.
+        scheduler.submit("Hold.", voice="Luna")
+        self.started.wait()
+        return scheduler
+
+    def test_shortest_job_runs_first(self):
+        scheduler = self.scheduler(policy="sjf")
+        done = []
+        for text in ["This one is a much longer request with many more words in it.", "Short."]:
+            scheduler.submit(text, voice="Luna").add_done_callback(lambda future, text=text: done.append(text))
+        self.gate.set()
+        scheduler.close()
+        self.assertEqual(done, ["Short.", "This one is a much longer request with many more words in it."])
+
+    def test_deadline_admission(self):
+        from kittentts.scheduler import RequestRejected
+
+        scheduler = self.scheduler(policy="edf")
+        accepted = scheduler.submit("First.", voice="Luna", deadline=2.5)
+        with self.assertRaisesRegex(RequestRejected, "miss its deadline"):
+            scheduler.submit("Too late.", voice="Luna", deadline=2.5)
+        with self.assertRaisesRegex(RequestRejected, "miss its deadline"):
+            scheduler.submit("Impossible.", voice="Luna", deadline=1.5)
+        with self.assertRaisesRegex(RequestRejected, "push a queued request"):
+            scheduler.submit("Urgent.", voice="Luna", deadline=2.2)
+        relaxed = scheduler.submit("Whenever.", voice="Luna")
+        self.gate.set()
+        self.assertGreater(accepted.result().size, 0)
+        self.assertGreater(relaxed.result().size, 0)
+
+    def test_backlog_limit(self):
+        from kittentts.scheduler import RequestRejected
+
+        scheduler = self.scheduler(policy="fifo", max_queue_seconds=2.5)
+        scheduler.submit("Fits.", voice="Luna")
+        with self.assertRaises(RequestRejected) as raised:
+            scheduler.submit("Overflows.", voice="Luna")
+        self.assertGreater(raised.exception.finish_seconds, 2.5)
+        self.assertGreater(scheduler.queued_seconds, 1.5)
+
+    def test_only_admitted_requests_are_counted(self):
+        from kittentts.instrumentation import MetricsRecorder
+        from kittentts.scheduler import RequestRejected
+
+        metrics = MetricsRecorder()
+        self.model.instrumentation = metrics
+        self.addCleanup(setattr, self.model, "instrumentation", None)
+        scheduler = self.scheduler(policy="fifo", max_queue_seconds=2.5)
+        scheduler.submit("Fits.", voice="Luna")
+        with self.assertRaises(RequestRejected):
+            scheduler.submit("Overflows.", voice="Luna")
+        self.gate.set()
+        scheduler.close()
+        self.assertEqual(metrics.counters["requests"], 2)
+
+    def test_exact_chunking_stays_on_the_dispatcher(self):
+        from kittentts.preprocess import DEFAULT_TOKEN_BUDGET
+
+        for name, value in [("token_budget", DEFAULT_TOKEN_BUDGET), ("exact_tokens", True)]:
+            self.addCleanup(setattr, self.model, name, getattr(self.model, name))
+            setattr(self.model, name, value)
+        threads = []
+        count_tokens = type(self.model)._count_tokens
+
+        def counting(model, text):
+            threads.append(threading.current_thread().name)
+            return count_tokens(model, text)
+
+        self.model._count_tokens = counting.__get__(self.model)
+        self.addCleanup(lambda: delattr(self.model, "_count_tokens"))
+        scheduler = self.scheduler(policy="fifo")
+        future = scheduler.submit("Counted on the dispatcher, not here.", voice="Luna")
+        self.assertNotIn(threading.current_thread().name, threads)
+        self.gate.set()
+        self.assertGreater(future.result().size, 0)
+        self.assertEqual(set(threads), {"kittentts-scheduler"})
+
+    def test_requires_a_cost_model(self):
+        from kittentts.scheduler import Scheduler
+
+        self.model.cost_model = None
+        with self.assertRaisesRegex(ValueError, "calibrate"):
+            Scheduler(self.model)
+
+    def test_unknown_policy_and_voice(self):
+        from kittentts.scheduler import Scheduler
+
+        with self.assertRaises(ValueError):
+            Scheduler(self.model, policy="random")
+        with self.assertRaises(ValueError):
+            self.scheduler().submit("Hello.", voice="nobody")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+TURNS = ["Hello there! It is 3 p.m. on Mar. 3rd.", "Let me check that for you.", "Hello there! How can I help?"]
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class SynthesisSessionTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.model = load_fake_model(cls._tmp.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def test_turns_match_generate(self):
+        session = self.model.synthesis_session("Luna", speed=1.2)
+        for _ in range(2):
+            for text in TURNS:
+                np.testing.assert_array_equal(session.say(text), self.model.generate(text, voice="Luna", speed=1.2))
+
+    def test_repeated_text_and_sentences_hit_the_caches(self):
+        session = self.model.synthesis_session("Luna")
+        for text in TURNS + TURNS:
+            session.say(text)
+        info = session.cache_info()
+        self.assertEqual(info["text"], {"hits": 3, "misses": 3, "entries": 3})
+        # "Hello there!" is encoded once although it opens two different turns.
+        self.assertGreater(info["tokens"]["hits"], info["tokens"]["misses"])
+        session.clear()
+        self.assertEqual(session.cache_info()["tokens"]["entries"], 0)
+
+    def test_stream_matches_say(self):
+        session = self.model.synthesis_session("Luna", sample_rate=16000)
+        for text in TURNS[:2] * 2:
+            np.testing.assert_allclose(np.concatenate(list(session.say_stream(text))), session.say(text),
+                                       atol=1e-6)
+
+    def test_unknown_voice_fails_when_the_session_opens(self):
+        with self.assertRaises(ValueError):
+            self.model.synthesis_session("nobody")
+
+    def test_cache_is_bounded(self):
+        session = self.model.synthesis_session("Luna", cache_size=2)
+        for text in ["One.", "Two.", "Three.", "One."]:
+            session.say(text)
+        self.assertEqual(session.cache_info()["text"]["hits"], 0)
+        self.assertEqual(session.cache_info()["text"]["entries"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
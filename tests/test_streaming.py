@@ -0,0 +1,152 @@
+import gc
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from kittentts.instrumentation import MetricsRecorder
+from kittentts.streaming import PacedStream
+from tests.fake_model import HAVE_RUNTIME, load_fake_model
+
+RATE = 100
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.001)
+
+
+class PacedStreamTests(unittest.TestCase):
+    def test_producer_stays_within_lookahead(self):
+        pulls = []
+
+        def source():
+            for index in range(10):
+                pulls.append(index)
+                yield np.zeros(RATE, dtype=np.float32)  # one second each
+
+        clock = FakeClock()
+        with PacedStream(source(), lookahead=2.0, sample_rate=RATE, clock=clock) as stream:
+            wait_until(lambda: len(pulls) == 2)
+            next(stream)
+            time.sleep(0.05)
+            # Nothing has been played yet, so nothing more is synthesized.
+            self.assertEqual(len(pulls), 2)
+
+            clock.now = 1.0
+            wait_until(lambda: len(pulls) == 3)
+            time.sleep(0.05)
+            self.assertEqual(len(pulls), 3)
+            self.assertLessEqual(stream.stats["max_buffered_seconds"], 2.0)
+
+            remaining = []
+            for audio in stream:
+                remaining.append(audio)
+                clock.now += 1.0
+        self.assertEqual(len(remaining), 9)
+        self.assertEqual(stream.stats["underruns"], 0)
+
+    def test_underruns_are_reported(self):
+        release = threading.Event()
+
+        def source():
+            yield np.zeros(RATE, dtype=np.float32)
+            release.wait(2.0)
+            yield np.zeros(RATE, dtype=np.float32)
+
+        clock = FakeClock()
+        metrics = MetricsRecorder()
+        with PacedStream(source(), lookahead=5.0, sample_rate=RATE, clock=clock, instrumentation=metrics) as stream:
+            next(stream)
+            clock.now = 3.0
+            release.set()
+            next(stream)
+            # Playback restarted at 3.0, so a read before 3.0 + 1.0 is in time.
+            clock.now = 3.5
+            self.assertEqual(list(stream), [])
+
+        self.assertEqual(stream.stats["underruns"], 1)
+        self.assertAlmostEqual(stream.stats["underrun_seconds"], 2.0)
+        self.assertEqual(metrics.snapshot()["counters"]["underruns"], 1)
+
+    def test_source_errors_reach_the_consumer(self):
+        def source():
+            yield np.zeros(RATE, dtype=np.float32)
+            raise ValueError("boom")
+
+        with PacedStream(source(), lookahead=10.0, sample_rate=RATE) as stream:
+            next(stream)
+            with self.assertRaises(ValueError):
+                next(stream)
+
+    def test_dropped_stream_stops_its_producer_and_cancels(self):
+        from kittentts.cancellation import CancellationToken
+
+        closed = threading.Event()
+        token = CancellationToken()
+
+        def source():
+            try:
+                while True:
+                    yield np.zeros(RATE, dtype=np.float32)
+            finally:
+                closed.set()
+
+        stream = PacedStream(source(), lookahead=2.0, sample_rate=RATE, clock=FakeClock(), cancel=token)
+        thread = stream._thread
+        wait_until(lambda: stream.stats["produced_seconds"] >= 2.0)
+        del stream
+        gc.collect()
+        self.assertTrue(closed.wait(2.0))
+        thread.join(2.0)
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(token.cancelled)
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class GeneratePacedTests(unittest.TestCase):
+    def test_paced_output_matches_generate(self):
+        text = "First sentence here. " * 30
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            expected = model.generate(text, voice="Jasper")
+            with model.generate_paced(text, voice="Jasper", lookahead=1000.0) as stream:
+                chunks = list(stream)
+        np.testing.assert_array_equal(np.concatenate(chunks, axis=-1), expected)
+
+    def test_close_terminates_the_running_inference(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp)
+            started, stopped = threading.Event(), threading.Event()
+            run = model._run
+
+            def slow_run(feeds, run_options=None):
+                started.set()
+                # Stands in for a long inference: returns once the stream's token terminates it.
+                while not run_options.terminate:
+                    time.sleep(0.001)
+                stopped.set()
+                return run(feeds, run_options)
+
+            model._run = slow_run
+            stream = model.generate_paced("One. Two. Three.", voice="Jasper", lookahead=10.0)
+            self.assertTrue(started.wait(2.0))
+            stream.close()
+            self.assertTrue(stopped.is_set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+
+from kittentts.synth import parse_shard, read_manifest, shard_of
+from tests.fake_model import HAVE_RUNTIME, write_fake_model_dir
+
+
+def write_manifest(path, items):
+    with open(path, "w", encoding="utf-8") as f:
+        for item in items:
+            f.write(json.dumps(item) + "\n")
+
+
+def read_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class ManifestTests(unittest.TestCase):
+    def test_shards_partition_the_items(self):
+        ids = [f"utt{n}" for n in range(100)]
+        shards = [[item_id for item_id in ids if shard_of(item_id, 4) == index] for index in range(4)]
+        self.assertEqual(sorted(sum(shards, [])), sorted(ids))
+        self.assertTrue(all(shards))
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("4/4", "1", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_manifest_ids_default_to_line_numbers_and_must_be_unique(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "manifest.jsonl")
+            write_manifest(path, [{"text": "a"}, {"id": "b", "text": "b"}])
+            self.assertEqual([item["id"] for item in read_manifest(path)], ["00000001", "b"])
+            for bad in ([{"id": "x", "text": "a"}, {"id": "x", "text": "b"}], [{"id": "../x", "text": "a"}],
+                        [{"id": "x"}]):
+                write_manifest(path, bad)
+                with self.assertRaises(ValueError):
+                    read_manifest(path)
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class SynthesizeManifestTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.model_dir = write_fake_model_dir(self.tmp)
+        self.manifest = os.path.join(self.tmp, "manifest.jsonl")
+        self.out = os.path.join(self.tmp, "out")
+        write_manifest(self.manifest, [{"id": f"utt{n}", "text": f"Line number {n}.", "voice": "Luna"}
+                                       for n in range(6)])
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_writes_results_and_resumes(self):
+        import soundfile as sf
+
+        from kittentts.synth import synthesize_manifest
+
+        summary = synthesize_manifest(self.manifest, self.out, model=self.model_dir, sample_rate=16000)
+        self.assertEqual(summary, {"total": 6, "skipped": 0, "written": 6, "failed": 0})
+        records = read_results(os.path.join(self.out, "results.jsonl"))
+        self.assertEqual(sorted(record["id"] for record in records), [f"utt{n}" for n in range(6)])
+        audio, rate = sf.read(os.path.join(self.out, records[0]["path"]))
+        self.assertEqual(rate, 16000)
+        self.assertAlmostEqual(records[0]["audio_seconds"], audio.shape[0] / 16000)
+
+        # A lost file is redone, everything else is skipped.
+        os.remove(os.path.join(self.out, "utt3.wav"))
+        summary = synthesize_manifest(self.manifest, self.out, model=self.model_dir, sample_rate=16000)
+        self.assertEqual(summary, {"total": 6, "skipped": 5, "written": 1, "failed": 0})
+
+    def test_sharded_worker_processes(self):
+        from kittentts.synth import results_path, synthesize_manifest
+
+        summaries = [synthesize_manifest(self.manifest, self.out, model=self.model_dir, jobs=2, shard=(index, 2),
+                                         audio_format="flac") for index in range(2)]
+        self.assertEqual(sum(summary["written"] for summary in summaries), 6)
+        written = [record["id"] for index in range(2) for record in read_results(results_path(self.out, (index, 2)))]
+        self.assertEqual(sorted(written), [f"utt{n}" for n in range(6)])
+        self.assertTrue(os.path.exists(os.path.join(self.out, "utt0.flac")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from kittentts.textbench import (CORPUS, compare_text_runs, corpus_text, run_text_benchmark,
+                                 scaling_exponent)
+
+
+class TextBenchTests(unittest.TestCase):
+    def test_corpus_documents_have_the_requested_size_and_all_styles(self):
+        text = corpus_text(5000)
+        self.assertEqual(len(text), 5000)
+        for paragraphs in CORPUS.values():
+            self.assertIn(paragraphs[0][:40], text)
+        self.assertNotIn(CORPUS["chat"][0][:40], corpus_text(5000, ["finance"]))
+
+    def test_run_reports_throughput_and_scaling(self):
+        results = run_text_benchmark(sizes=[500, 2000], functions=["normalize_text", "number_to_words"],
+                                     repeat=1, min_time=0.0)
+        by_corpus = {(r["function"], r["corpus"], r["size"]) for r in results["results"]}
+        self.assertIn(("normalize_text", "mixed", 2000), by_corpus)
+        self.assertIn(("normalize_text", "finance", 16000), by_corpus)
+        self.assertIn(("number_to_words", "numbers", 15), by_corpus)
+        self.assertTrue(all(r["per_second"] > 0 for r in results["results"]))
+        self.assertIsNotNone(results["scaling"]["normalize_text"])
+        self.assertEqual(results["meta"]["suite"], "text")
+
+    def test_slow_sizes_end_the_sweep(self):
+        results = run_text_benchmark(sizes=[500, 2000], functions=["chunk_text"], repeat=1, max_seconds=0.0)
+        mixed = [r for r in results["results"] if r["corpus"] == "mixed"]
+        self.assertEqual([r["size"] for r in mixed], [500])
+        self.assertTrue(mixed[0]["stopped"])
+
+    def test_scaling_exponent(self):
+        self.assertAlmostEqual(scaling_exponent([(1000, 0.001), (10000, 0.01)]), 1.0)
+        self.assertAlmostEqual(scaling_exponent([(1000, 0.001), (10000, 0.1)]), 2.0)
+
+    def test_compare_flags_throughput_drops_and_worse_scaling(self):
+        def run(per_second, exponent):
+            return {"results": [{"function": "chunk_text", "corpus": "mixed", "size": 1000,
+                                 "per_second": per_second}], "scaling": {"chunk_text": exponent}}
+
+        self.assertEqual(compare_text_runs(run(1000, 1.0), run(950, 1.1)), [])
+        metrics = [r["metric"] for r in compare_text_runs(run(1000, 1.0), run(500, 2.0))]
+        self.assertEqual(metrics, ["per_second", "scaling"])
+        [scaling] = compare_text_runs(run(1000, 0.0), run(1000, 1.0))
+        self.assertEqual((scaling["metric"], scaling["change"]), ("scaling", None))
+
+
+if __name__ == "__main__":
+    unittest.main()
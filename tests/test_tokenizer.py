@@ -0,0 +1,58 @@
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _reference_ids(phonemes):
+    """Token IDs as the original per-character tokenization produced them."""
+    import re
+
+    from kittentts.tokenizer import symbol_index
+
+    index = symbol_index()
+    joined = " ".join(re.findall(r"\w+|[^\w\s]", phonemes))
+    return [0] + [index[char] for char in joined if char in index] + [10, 0]
+
+
+CASES = [
+    "həlˈoʊ wˈɜːld, ðɪs ɪz ɐ tˈɛst. ",
+    "dˈɑːktɚ ɹɪvˈɛɹə pˈeɪd twˈɛlv dˈɑːlɚz!",
+    "“quoted” text with ✓ unknown symbols and émoji 🐱",
+    "",
+    "   ",
+    "ʃˈʊd wiː ɡˈoʊ? jˈɛs—nˈaʊ…",
+]
+
+
+@unittest.skipUnless(np is not None, "numpy is required")
+class PhonemeTokenizerTests(unittest.TestCase):
+    def test_encode_matches_reference_tokenization(self):
+        from kittentts.tokenizer import PhonemeTokenizer
+
+        tokenizer = PhonemeTokenizer()
+        for phonemes in CASES:
+            with self.subTest(phonemes=phonemes):
+                input_ids = tokenizer.encode(phonemes)
+                self.assertEqual(input_ids.dtype, np.int64)
+                self.assertEqual(input_ids.tolist(), [_reference_ids(phonemes)])
+
+    def test_encode_batch_pads_rows_and_counts_dropped_symbols(self):
+        from kittentts.tokenizer import PAD_ID, PhonemeTokenizer
+
+        input_ids, lengths, dropped = PhonemeTokenizer().encode_batch(CASES, return_dropped=True)
+
+        self.assertEqual(input_ids.shape, (len(CASES), max(lengths)))
+        for row, phonemes in enumerate(CASES):
+            expected = _reference_ids(phonemes)
+            self.assertEqual(lengths[row], len(expected))
+            self.assertEqual(input_ids[row, :lengths[row]].tolist(), expected)
+            self.assertTrue((input_ids[row, lengths[row]:] == PAD_ID).all())
+        self.assertEqual(dropped[0], 0)
+        self.assertEqual(dropped[2], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import tempfile
+import unittest
+
+from kittentts.instrumentation import MetricsRecorder
+from tests.fake_model import HAVE_RUNTIME, VOICE_ALIASES, load_fake_model
+
+
+@unittest.skipUnless(HAVE_RUNTIME, "numpy, onnx, onnxruntime and phonemizer are required")
+class WarmupTests(unittest.TestCase):
+    def test_warmup_covers_lengths_and_voices(self):
+        metrics = MetricsRecorder()
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp, instrumentation=metrics)
+            self.assertFalse(model.is_ready)
+            self.assertIsNone(model.warmup_seconds)
+            report = model.warmup(token_lengths=[64, 16])
+
+        self.assertTrue(model.is_ready)
+        self.assertEqual(report["token_lengths"], [16, 64])
+        self.assertEqual(report["runs"], len(VOICE_ALIASES) + 1)
+        self.assertEqual(report["seconds"], model.warmup_seconds)
+        self.assertEqual(metrics.snapshot()["stages"], {})
+
+    def test_closed_handle_reports_not_ready(self):
+        from kittentts.get_model import KittenTTS
+        from tests.fake_model import write_fake_model_dir
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model = KittenTTS(write_fake_model_dir(tmp), warmup=True)
+            self.assertIsNotNone(model.warmup_seconds)
+            model.close()
+        self.assertFalse(model.is_ready)
+        self.assertIsNone(model.warmup_seconds)
+
+    def test_warmup_uses_token_buckets(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp, token_buckets=[32, 64], warmup=True)
+            self.assertTrue(model.is_ready)
+            self.assertEqual(sorted(model._runner._bindings), [32, 64])
+
+    def test_warmup_runs_every_lane_in_parallel_mode(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model = load_fake_model(tmp, parallel=(3, 1))
+            try:
+                report = model.warmup(token_lengths=[16, 32])
+                self.assertIsNotNone(model._lanes)
+                self.assertEqual(report["runs"], len(VOICE_ALIASES) + 1 + 3 * 2)
+            finally:
+                model.close()
+
+
+if __name__ == "__main__":
+    unittest.main()